@@ -1,6 +1,5 @@
 import os
 import json
-import torch
 import dotenv
 import uvicorn
 import asyncio
@@ -14,14 +13,17 @@ from starlette.responses import RedirectResponse
 
 from typing import Dict, List
 from contextlib import asynccontextmanager
-from sentence_transformers import SentenceTransformer
 
 from mongodb.collections.mongo_leaf_act_collection import MongoLeafActCollection
+from mongodb.change_watcher import MongoChangeWatcher
+from mongodb.leaf_act_cache import LeafActCache
 from qdrantdb.collections.qdrant_question_collection import QdrantQuestionCollection
-from qdrantdb.collections.qdrant_act_collection import QdrantActCollection
+from vectorstore.routed_act_collection import RoutedActCollection
+from resilience.circuit_breaker import get_resilience_metrics
+from modelregistry.model_registry import ModelRegistry
 
 from models.datamodels.question import Question
-from models.datamodels.act_vector import ActVector
+from models.datamodels.act_vector import ActVectorPayload
 from models.datamodels.leaf_act import LeafAct
 from models.api_models import  Query , QuestionQuery
 
@@ -38,8 +40,8 @@ def get_tokens_from_json(json_output: dict) -> int:
     logging.info(f"Total tokens: {get_openai_tokens(json_str)}")
     return get_openai_tokens(json_str)
 
-async def get_qdrant_act_collection():
-    act_collection = await QdrantActCollection.create()
+async def get_act_vector_store():
+    act_collection = await RoutedActCollection.create()
     return act_collection
 
 async def get_qdrant_question_collection():
@@ -51,9 +53,7 @@ async def get_mongo_leaf_act_collection():
     return act_collection
 
 async def get_model():
-    model = SentenceTransformer("sdadas/mmlw-retrieval-roberta-large")
-    model = model.to("cuda" if torch.cuda.is_available() else "cpu")
-    return model
+    return ModelRegistry().get_model()
 
 functions = {}
 
@@ -61,11 +61,21 @@ functions = {}
 async def lifespan(app: FastAPI):
     functions['model'] = await get_model()
     functions['qdrant_question_collection']   = await get_qdrant_question_collection()
-    functions['qdrant_act_collection']  = await get_qdrant_act_collection()
+    functions['act_vector_store']  = await get_act_vector_store()
     functions['mongo_leaf_act_collection']  = await get_mongo_leaf_act_collection()
 
+    watcher_enabled = functions['mongo_leaf_act_collection'].change_watcher_config['enabled']
+    functions['leaf_act_cache'] = LeafActCache(functions['mongo_leaf_act_collection'], enabled=watcher_enabled)
+
+    watcher = None
+    if watcher_enabled:
+        watcher = MongoChangeWatcher({'leaf_acts': functions['leaf_act_cache'].invalidate}, on_stop=functions['leaf_act_cache'].disable)
+        watcher.start()
+
     yield
 
+    if watcher is not None:
+        await watcher.stop()
     functions.clear()
 
 app = FastAPI(lifespan=lifespan)
@@ -143,13 +153,13 @@ async def retrieve_act_parts(queries: Dict[str,List[Query]], valid: bool = Depen
 
         search_tasks = []
         for vector, nro in zip(vectors, nros_in_order):
-            search_tasks.append(functions["qdrant_act_collection"].search_acts_filtered(limit=limit_per_query, act_nros=[nro], vector=vector))
+            search_tasks.append(functions["act_vector_store"].search_acts_filtered(limit=limit_per_query, act_nros=[nro], vector=vector))
 
         # Get act parts for each query
         act_parts = await asyncio.gather(*search_tasks)
 
         # Retrieve the leaf acts for each 
-        leaf_acts = await functions['mongo_leaf_act_collection'].get_leaf_acts(nros=nros_in_order)
+        leaf_acts = await functions['leaf_act_cache'].get_leaf_acts(nros=nros_in_order)
 
         # Map nros to leaf acts
         leaf_act_map : Dict[int, LeafAct] = {}
@@ -162,7 +172,7 @@ async def retrieve_act_parts(queries: Dict[str,List[Query]], valid: bool = Depen
             curr_elements = set()
             
             for act in act_parts:
-                act = ActVector(**act.payload)
+                act = ActVectorPayload(**act.payload)
                 if act.parent_id not in curr_elements:
                     curr_elements.add(act.parent_id)
                 if act.reconstruct_id not in curr_elements:
@@ -203,8 +213,8 @@ async def get_legal_information(query: str, valid: bool = Depends(validate_api_k
             for related_act in question.relatedActs:
                 acts.add(related_act.nro)
         
-        act_parts = await functions['qdrant_act_collection'].search_acts_filtered(limit=100, act_nros=list(acts), vector=vector)
-        leaf_acts = await functions['mongo_leaf_act_collection'].get_leaf_acts(nros=list(acts))
+        act_parts = await functions['act_vector_store'].search_acts_filtered(limit=100, act_nros=list(acts), vector=vector)
+        leaf_acts = await functions['leaf_act_cache'].get_leaf_acts(nros=list(acts))
 
         
         id_set = set()
@@ -217,7 +227,7 @@ async def get_legal_information(query: str, valid: bool = Depends(validate_api_k
 
         found_nros = set()    
         for act in act_parts:
-            act = ActVector(**act.payload)
+            act = ActVectorPayload(**act.payload)
             found_nros.add(act.act_nro)
             if (act.act_nro, act.parent_id) not in id_set:
                 id_set.add((act.act_nro, act.parent_id))
@@ -252,6 +262,13 @@ async def get_legal_information(query: str, valid: bool = Depends(validate_api_k
     else:
         return {"error": "Invalid API Key"}
     
+@app.get("/metrics/resilience")
+async def get_resilience_state(valid: bool = Depends(validate_api_key)) -> Dict[str, Dict]:
+    if valid:
+        return get_resilience_metrics()
+    else:
+        return {"error": "Invalid API Key"}
+
 @app.get("/privacy", response_class=HTMLResponse)
 async def privacy_policy(request: Request):
     return templates.TemplateResponse("privacy_policy.html", {"request": request})
@@ -0,0 +1,70 @@
+import json
+import time
+import asyncio
+import logging
+import argparse
+
+from embed.encoder_pool import EncoderPool
+from mongodb.collections.mongo_act_vector_collection import MongoVectorActCollection
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+with open('embed/config.json') as f:
+    config = json.load(f)
+
+
+async def load_sample_texts(samples: int) -> list[str]:
+    mongo_act_vector_collection = await MongoVectorActCollection.create()
+    texts = []
+    async for batch in mongo_act_vector_collection.scroll_all(batch_size=1000, projection={'text': 1}):
+        texts.extend(act_vector['text'] for act_vector in batch)
+        if len(texts) >= samples:
+            break
+    return texts[:samples]
+
+
+async def benchmark(texts: list[str], workers: int, batch_size: int) -> float:
+    '''
+    Encode texts with a fresh pool of the given size and return docs/sec, model loading excluded.
+    '''
+    pool = EncoderPool(workers, config['model_name'], config['length_bucketing'], config['encoder_pool']['threads_per_worker'])
+    try:
+        pool.warm_up()
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            loop.run_in_executor(pool.executor, pool.encode, texts[i:i+batch_size])
+            for i in range(0, len(texts), batch_size)
+        ])
+        return len(texts) / (time.perf_counter() - start)
+    finally:
+        pool.shutdown()
+
+
+async def main(worker_counts: list[int], samples: int, batch_size: int) -> None:
+    texts = await load_sample_texts(samples)
+    logger.info(f"Benchmarking on {len(texts)} act vector texts in batches of {batch_size}")
+
+    results = {}
+    for workers in worker_counts:
+        results[workers] = await benchmark(texts, workers, batch_size)
+        logger.info(f"{workers} workers: {results[workers]:.1f} docs/sec")
+
+    baseline_workers = worker_counts[0]
+    print(f"{'workers':>8} {'docs/sec':>10} {'per worker':>11} {'speedup':>8} {'efficiency':>11}")
+    for workers, docs_per_second in results.items():
+        speedup = docs_per_second / results[baseline_workers]
+        efficiency = speedup / (workers / baseline_workers)
+        print(f"{workers:>8} {docs_per_second:>10.1f} {docs_per_second / workers:>11.1f} {speedup:>8.2f} {efficiency:>10.0%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure encoder pool throughput for several worker counts.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--samples', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.workers, args.samples, args.batch_size))
@@ -1,58 +1,78 @@
-import torch
+import json
 import logging
 
 from tqdm.asyncio import tqdm
-from transformers import AutoTokenizer
-from sentence_transformers import SentenceTransformer
 
 from models.datamodels.act_vector import ActVector
 from mongodb.collections.mongo_act_vector_collection import MongoVectorActCollection
 from qdrantdb.collections.qdrant_act_collection import QdrantActCollection
+from embed.embedding_pipeline import EmbeddingPipeline
+from embed.embedding_checkpoint import EmbeddingCheckpoint
+from embed.embed_base import EmbedBase
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-BATCH_SIZE = 100
+with open('embed/config.json') as f:
+    config = json.load(f)
 
-class EmbedActs():
-    def __init__(self) -> None:
+class EmbedActs(EmbedBase):
+    def __init__(self, workers: int = 0) -> None:
+        super().__init__(workers)
         self.mongo_act_vector_collection: MongoVectorActCollection  = None
         self.qdrant_act_collection: QdrantActCollection = None
-        
-        self.tokenizer = AutoTokenizer.from_pretrained("gpt2")
-        self.model = SentenceTransformer("sdadas/mmlw-retrieval-roberta-large")
-        self.model = self.model.to("cuda" if torch.cuda.is_available() else "cpu")
-    
+
     @classmethod
-    async def create(cls) -> 'EmbedActs':
-        instance = cls()
+    async def create(cls, workers: int = 0) -> 'EmbedActs':
+        instance = cls(workers)
         instance.mongo_act_vector_collection = await MongoVectorActCollection.create()
         instance.qdrant_act_collection = await QdrantActCollection.create()
         return instance
 
+    async def _read_act_vector_batches(self, start_after, next_point_id: int):
+        '''
+        Yield batches of (point id, act vector) pairs in _id order, starting after the checkpointed _id.
+        '''
+        async for batch in self.mongo_act_vector_collection.scroll_all(batch_size=self._read_batch_size(), start_after=start_after):
+            yield list(zip(range(next_point_id, next_point_id+len(batch)), batch))
+            next_point_id += len(batch)
+
+    def _get_act_vector_texts(self, batch: list[tuple[int, dict]]) -> list[str]:
+        return [act_vector['text'] for _, act_vector in batch]
+
     async def embed_act_vectors(self) -> None:
         total_docs = await self.mongo_act_vector_collection.get_number_of_documents()
-        already_embedded = await self.qdrant_act_collection.get_act_vector_count()
-        processed_acts = 0
-        ids = 1
-        pbar = tqdm(total=total_docs, desc="Embedding Acts")
+        checkpoint = EmbeddingCheckpoint(config['checkpoint']['path'] + 'acts.json', config['model_name'])
+        state = checkpoint.load() or {'last_key': None, 'processed': 0, 'next_point_id': 1}
+        processed = state['processed']
+        pbar = tqdm(total=total_docs, initial=processed, desc="Embedding Acts")
 
-        try:
-            async for batch in self.mongo_act_vector_collection.scroll_all(batch_size=BATCH_SIZE):
-                processed_acts += len(batch)
+        async def write(batch: list[tuple[int, dict]], vectors) -> None:
+            nonlocal processed
+            for start in range(0, len(batch), config['batch_size']):
+                chunk = batch[start:start+config['batch_size']]
+                act_vectors = [ActVector(**act_vector) for _, act_vector in chunk]
+                await self.qdrant_act_collection.upsert_batch_act_vectors(act_vectors=act_vectors, ids=[id for id, _ in chunk], vectors=vectors[start:start+config['batch_size']])
+                pbar.update(len(chunk))
 
-                if processed_acts >= already_embedded:
-                    texts = [act_vector['text'] for act_vector in batch]
-                    vectors = self.model.encode(texts, convert_to_tensor=False, show_progress_bar=False)
-                    act_vectors = [ActVector(**act_vector) for act_vector in batch]
-                    await self.qdrant_act_collection.upsert_batch_act_vectors(act_vectors=act_vectors, ids=[id for id in range(ids, ids+len(batch))], vectors=vectors)
+            processed += len(batch)
+            last_id, last_act_vector = batch[-1]
+            checkpoint.save(last_act_vector['_id'], processed, next_point_id=last_id+1)
 
-                ids += len(batch)
-                pbar.update(len(batch))
+        try:
+            pipeline = EmbeddingPipeline(
+                source=self._read_act_vector_batches(state['last_key'], state['next_point_id']),
+                get_texts=self._get_act_vector_texts,
+                write=write,
+                **self._encoder_options()
+            )
+            await pipeline.run()
         finally:
             pbar.close()
 
+        checkpoint.clear()
+
         if not await self.validate_counts():
             logging.error("Counts do not match")
             logging.info(f"Mongo count: {await self.mongo_act_vector_collection.get_number_of_documents()} Qdrant count: {await self.qdrant_act_collection.get_act_vector_count()}")
@@ -63,7 +83,7 @@ class EmbedActs():
         id = 1
         act_vector = await self.mongo_act_vector_collection.get_act_vector(act_nro , act_reconstruct_id)
         if act_vector:
-            vector = self.model.encode(act_vector['text'], convert_to_tensor=False, show_progress_bar=False)
+            vector = self._encode_texts([act_vector['text']])[0]
             act_vector = ActVector(**act_vector)
             await self.qdrant_act_collection.upsert_single_act_vector(act_vector, id, vector)
     
@@ -0,0 +1,59 @@
+import json
+
+from sentence_transformers import SentenceTransformer
+
+from modelregistry.model_registry import ModelRegistry
+from embed.encoder_pool import EncoderPool, encode_texts
+from embed.embedding_cache import EmbeddingCache
+
+
+with open('embed/config.json') as f:
+    config = json.load(f)
+
+class EmbedBase():
+    '''
+    Encoder, embedding cache and pipeline settings shared by EmbedActs and EmbedQuestions.
+    '''
+    def __init__(self, workers: int = 0) -> None:
+        self.encoder_pool: EncoderPool = None
+        self.cache: EmbeddingCache = None
+
+        if config['cache']['enabled']:
+            self.cache = EmbeddingCache(config['cache']['path'], config['model_name'])
+
+        if workers:
+            self.encoder_pool = EncoderPool(workers, config['model_name'], config['length_bucketing'], config['encoder_pool']['threads_per_worker'])
+
+    def _read_batch_size(self) -> int:
+        if config['length_bucketing']['enabled']:
+            return config['length_bucketing']['window_size']
+        return config['batch_size']
+
+    @property
+    def model(self) -> SentenceTransformer:
+        return ModelRegistry().get_model(config['model_name'])
+
+    def _encode_texts(self, texts: list[str]):
+        if self.encoder_pool is not None:
+            return self.encoder_pool.executor.submit(self.encoder_pool.encode, texts).result()
+        return encode_texts(self.model, texts, config['length_bucketing'])
+
+    def _encoder_options(self) -> dict:
+        '''
+        Pipeline encoder settings, with an encoder pool the batches are encoded in its worker processes.
+        '''
+        if self.encoder_pool is not None:
+            return {
+                'encode': self.encoder_pool.encode,
+                'executor': self.encoder_pool.executor,
+                'queue_size': config['pipeline']['queue_size'],
+                'encode_concurrency': self.encoder_pool.encode_concurrency,
+                'cache': self.cache
+            }
+        return {'encode': self._encode_texts, 'cache': self.cache, **config['pipeline']}
+
+    def close(self) -> None:
+        if self.encoder_pool is not None:
+            self.encoder_pool.shutdown()
+        if self.cache is not None:
+            self.cache.close()
@@ -1,58 +1,72 @@
-import torch
+import json
 import logging
 
 from tqdm.asyncio import tqdm
-from transformers import AutoTokenizer
-from sentence_transformers import SentenceTransformer
 
 from models.datamodels.question import Question
 from mongodb.collections.mongo_question_collection import MongoQuestionCollection
 from qdrantdb.collections.qdrant_question_collection import QdrantQuestionCollection
+from embed.embedding_pipeline import EmbeddingPipeline
+from embed.embedding_checkpoint import EmbeddingCheckpoint
+from embed.embed_base import EmbedBase
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-BATCH_SIZE = 100
+with open('embed/config.json') as f:
+    config = json.load(f)
 
-class EmbedQuestions():
-    def __init__(self) -> None:
+class EmbedQuestions(EmbedBase):
+    def __init__(self, workers: int = 0) -> None:
+        super().__init__(workers)
         self.mongo_question_collection: MongoQuestionCollection  = None
         self.question_qdrant_collection: QdrantQuestionCollection = None
-        
-        self.tokenizer = AutoTokenizer.from_pretrained("gpt2")
-        self.model = SentenceTransformer("sdadas/mmlw-retrieval-roberta-large")
-        self.model = self.model.to("cuda" if torch.cuda.is_available() else "cpu")
 
     @classmethod
-    async def create(cls) -> 'EmbedQuestions':
-        instance = cls()
+    async def create(cls, workers: int = 0) -> 'EmbedQuestions':
+        instance = cls(workers)
         instance.mongo_question_collection = await MongoQuestionCollection.create()
         instance.question_qdrant_collection = await QdrantQuestionCollection.create()
         return instance
     
+    async def _read_question_batches(self, start_after):
+        async for batch in self.mongo_question_collection.scroll_all(batch_size=self._read_batch_size(), start_after=start_after):
+            yield batch
+
+    def _get_question_titles(self, batch: list[dict]) -> list[str]:
+        return [question['title'] for question in batch]
+
     async def embed_questions(self) -> None:
         total_docs = await self.mongo_question_collection._get_number_of_documents()
-        already_embedded = await self.question_qdrant_collection.get_question_count()
-        processed_questions = 0
-
-        pbar = tqdm(total=total_docs, desc="Embedding Questions")
+        checkpoint = EmbeddingCheckpoint(config['checkpoint']['path'] + 'questions.json', config['model_name'])
+        state = checkpoint.load() or {'last_key': None, 'processed': 0}
+        processed = state['processed']
+        pbar = tqdm(total=total_docs, initial=processed, desc="Embedding Questions")
 
-        try:
-            async for batch in self.mongo_question_collection.scroll_all(batch_size=BATCH_SIZE):
-                processed_questions += len(batch)
+        async def write(batch: list[dict], vectors) -> None:
+            nonlocal processed
+            for start in range(0, len(batch), config['batch_size']):
+                questions = [Question(**question) for question in batch[start:start+config['batch_size']]]
+                await self.question_qdrant_collection.upsert_batch_questions(questions, vectors[start:start+config['batch_size']])
+                pbar.update(len(questions))
 
-                if processed_questions >= already_embedded:
-                    titles = [question['title'] for question in batch]
-                    vectors = self.model.encode(titles, convert_to_tensor=False, show_progress_bar=False)
-                    
-                    questions = [Question(**question) for question in batch]
-                    await self.question_qdrant_collection.upsert_batch_questions(questions, vectors)
+            processed += len(batch)
+            checkpoint.save(batch[-1]['_id'], processed)
 
-                pbar.update(len(batch))
+        try:
+            pipeline = EmbeddingPipeline(
+                source=self._read_question_batches(state['last_key']),
+                get_texts=self._get_question_titles,
+                write=write,
+                **self._encoder_options()
+            )
+            await pipeline.run()
         finally:
             pbar.close()
 
+        checkpoint.clear()
+
         if not await self.validate_counts():
             logging.error("Counts do not match")
             logging.info(f"Mongo count: {await self.mongo_question_collection._get_number_of_documents()} Qdrant count: {await self.question_qdrant_collection.get_question_count()}")
@@ -63,7 +77,7 @@ class EmbedQuestions():
     
     async def embed_question(self, question_nro: int) -> None:
         question = await self.mongo_question_collection.get_question(question_nro)
-        vector = self.model.encode(question['title'], convert_to_tensor=False, show_progress_bar=False)
+        vector = self._encode_texts([question['title']])[0]
         await self.question_qdrant_collection.upsert_question(Question(**question), vector)
 
     async def validate_counts(self) -> bool:
@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import hashlib
+import logging
+import numpy as np
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+#SQLite limits the number of bound parameters per statement
+LOOKUP_CHUNK_SIZE = 500
+
+
+class EmbeddingCache:
+    '''
+    Persistent cache of text embeddings keyed by (model name, sha256 of the exact input text).
+    Vectors are stored as float16 blobs in SQLite, so reruns over an unchanged corpus skip inference
+    and a refreshed corpus only pays for new or edited texts.
+    '''
+
+    def __init__(self, path: str, model_name: str) -> None:
+        self.path = path
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        #Lookups and writes run in a worker thread so they do not block the event loop, one at a time
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash BLOB NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+        ''')
+        self.connection.commit()
+
+    @staticmethod
+    def hash_text(text: str) -> bytes:
+        return hashlib.sha256(text.encode('utf-8')).digest()
+
+    def get_many(self, texts: list[str]) -> dict[int, np.ndarray]:
+        '''
+        Return the cached vectors of texts as a map from position in texts to float32 vector.
+        '''
+        positions: dict[bytes, list[int]] = {}
+        for i, text in enumerate(texts):
+            positions.setdefault(self.hash_text(text), []).append(i)
+
+        hashes = list(positions)
+        found: dict[int, np.ndarray] = {}
+        for start in range(0, len(hashes), LOOKUP_CHUNK_SIZE):
+            chunk = hashes[start:start + LOOKUP_CHUNK_SIZE]
+            rows = self.connection.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                [self.model_name, *chunk]
+            )
+            for text_hash, vector in rows:
+                vector = np.frombuffer(vector, dtype=np.float16).astype(np.float32)
+                for i in positions[text_hash]:
+                    found[i] = vector
+
+        self.hits += len(found)
+        self.misses += len(texts) - len(found)
+        return found
+
+    def put_many(self, texts: list[str], vectors) -> None:
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)',
+            [(self.model_name, self.hash_text(text), np.asarray(vector, dtype=np.float16).tobytes()) for text, vector in zip(texts, vectors)]
+        )
+        self.connection.commit()
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None
+        }
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,67 @@
+import os
+import json
+import logging
+
+from bson import ObjectId
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCheckpoint:
+    '''
+    Progress of an embedding job persisted after every batch written to Qdrant: the _id of the last
+    written Mongo document, the batch number, the model id and job specific state such as the next point id.
+    Writes go to a temporary file that atomically replaces the checkpoint, so a crash leaves either
+    the previous or the new checkpoint on disk, never a torn one.
+    '''
+
+    def __init__(self, path: str, model_name: str) -> None:
+        self.path = path
+        self.model_name = model_name
+        self.state: dict = None
+
+    def load(self) -> dict | None:
+        '''
+        Return the saved state, or None if there is none or it was written for a different model.
+        '''
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, 'r') as f:
+            state = json.load(f)
+
+        if state['model_name'] != self.model_name:
+            logger.warning(f"Ignoring checkpoint {self.path} written for model {state['model_name']}, current model is {self.model_name}")
+            return None
+
+        state['last_key'] = ObjectId(state['last_key'])
+        self.state = state
+        logger.info(f"Resuming from checkpoint {self.path} after batch {state['batch_number']} ({state['processed']} documents)")
+        return state
+
+    def save(self, last_key: ObjectId, processed: int, **extra) -> None:
+        self.state = {
+            'model_name': self.model_name,
+            'last_key': str(last_key),
+            'batch_number': (self.state or {}).get('batch_number', 0) + 1,
+            'processed': processed,
+            **extra
+        }
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        '''
+        Remove the checkpoint once the job has finished, the next run starts from the beginning.
+        '''
+        self.state = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,197 @@
+import time
+import asyncio
+import logging
+import numpy as np
+
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from embed.embedding_cache import EmbeddingCache
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+END_OF_STREAM = None
+
+
+class StageStats:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.batches = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+
+    def get_stats(self) -> dict:
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'blocked_seconds': round(self.blocked_seconds, 3),
+            'items_per_second': round(self.items / self.busy_seconds, 2) if self.busy_seconds else None
+        }
+
+
+class EmbeddingPipeline:
+    '''
+    Runs reading, encoding and writing of batches as three concurrent stages joined by bounded queues.
+
+    The source is an async iterator of batches, get_texts picks the texts of a batch, encode is a
+    blocking function run on those texts in an executor (a single worker thread by default, torch
+    releases the GIL during inference, or an EncoderPool's processes) and write is awaited with each
+    batch and its vectors. Up to encode_concurrency batches are encoded at once, they still reach
+    write in source order. A full queue blocks the stage feeding it, so neither Mongo reads nor
+    encoded vectors pile up in memory.
+
+    With a cache, texts already embedded by the same model are taken from it and only the rest
+    is sent to the encoder, newly encoded vectors are stored before the batch is written.
+    '''
+
+    def __init__(self,
+                 source: AsyncIterator[list],
+                 get_texts: Callable[[list], list[str]],
+                 encode: Callable[[list[str]], Any],
+                 write: Callable[[list, Any], Awaitable[None]],
+                 queue_size: int = 4,
+                 encode_concurrency: int = 1,
+                 executor: Executor = None,
+                 cache: EmbeddingCache = None) -> None:
+        self.source = source
+        self.get_texts = get_texts
+        self.encode = encode
+        self.write = write
+        self.encode_concurrency = encode_concurrency
+        self.executor = executor
+        self.cache = cache
+
+        self.encode_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.write_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        self.stats = {name: StageStats(name) for name in ('read', 'encode', 'write')}
+        self.wall_seconds = 0.0
+
+    async def _put(self, queue: asyncio.Queue, item, stats: StageStats) -> None:
+        start = time.perf_counter()
+        await queue.put(item)
+        stats.blocked_seconds += time.perf_counter() - start
+
+    async def _read(self) -> None:
+        stats = self.stats['read']
+        iterator = self.source.__aiter__()
+        while True:
+            start = time.perf_counter()
+            try:
+                batch = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            stats.busy_seconds += time.perf_counter() - start
+            stats.batches += 1
+            stats.items += len(batch)
+            await self._put(self.encode_queue, batch, stats)
+        await self.encode_queue.put(END_OF_STREAM)
+
+    async def _encode(self) -> None:
+        stats = self.stats['encode']
+        loop = asyncio.get_running_loop()
+        in_flight: deque[tuple[list, list[str], dict, list[int], asyncio.Future, float]] = deque()
+
+        async def emit_oldest():
+            batch, texts, cached, missing, future, started = in_flight.popleft()
+            encoded = await future if future is not None else []
+            if self.cache is not None and missing:
+                await asyncio.to_thread(self.cache.put_many, [texts[i] for i in missing], encoded)
+            vectors = self._merge_vectors(len(texts), cached, missing, encoded)
+            stats.busy_seconds += time.perf_counter() - started
+            stats.batches += 1
+            stats.items += len(batch)
+            await self._put(self.write_queue, (batch, vectors), stats)
+
+        while True:
+            batch = await self.encode_queue.get()
+            if batch is END_OF_STREAM:
+                break
+            started = time.perf_counter()
+            texts = self.get_texts(batch)
+            cached = await asyncio.to_thread(self.cache.get_many, texts) if self.cache is not None else {}
+            missing = [i for i in range(len(texts)) if i not in cached]
+            future = loop.run_in_executor(self.executor, self.encode, [texts[i] for i in missing]) if missing else None
+            in_flight.append((batch, texts, cached, missing, future, started))
+            if len(in_flight) >= self.encode_concurrency:
+                await emit_oldest()
+
+        while in_flight:
+            await emit_oldest()
+        await self.write_queue.put(END_OF_STREAM)
+
+    def _merge_vectors(self, total: int, cached: dict[int, np.ndarray], missing: list[int], encoded):
+        if not cached:
+            return encoded
+        dimension = len(next(iter(cached.values())))
+        vectors = np.zeros((total, dimension), dtype=np.float32)
+        for i, vector in cached.items():
+            vectors[i] = vector
+        for i, vector in zip(missing, encoded):
+            vectors[i] = vector
+        return vectors
+
+    async def _write(self) -> None:
+        stats = self.stats['write']
+        while True:
+            item = await self.write_queue.get()
+            if item is END_OF_STREAM:
+                break
+            batch, vectors = item
+            start = time.perf_counter()
+            await self.write(batch, vectors)
+            stats.busy_seconds += time.perf_counter() - start
+            stats.batches += 1
+            stats.items += len(batch)
+
+    async def run(self) -> dict:
+        '''
+        Run the pipeline to completion and return per-stage stats. The first stage error cancels the other stages and is raised.
+        '''
+        own_executor = self.executor is None
+        if own_executor:
+            self.executor = ThreadPoolExecutor(max_workers=self.encode_concurrency, thread_name_prefix='encoder')
+
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(stage()) for stage in (self._read, self._encode, self._write)]
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if own_executor:
+                self.executor.shutdown(wait=True)
+                self.executor = None
+            self.wall_seconds = time.perf_counter() - start
+
+        self.log_stats()
+        return self.get_stats()
+
+    def get_stats(self) -> dict:
+        stats = {
+            'wall_seconds': round(self.wall_seconds, 3),
+            'items_per_second': round(self.stats['write'].items / self.wall_seconds, 2) if self.wall_seconds else None,
+            'stages': {name: stats.get_stats() for name, stats in self.stats.items()}
+        }
+        if self.cache is not None:
+            stats['cache'] = self.cache.get_stats()
+        return stats
+
+    def log_stats(self) -> None:
+        stats = self.get_stats()
+        logger.info(f"Embedding pipeline finished in {stats['wall_seconds']}s, {stats['items_per_second']} items/s end to end")
+        for name, stage in stats['stages'].items():
+            logger.info(f"Stage {name}: {stage['items']} items in {stage['batches']} batches, busy {stage['busy_seconds']}s "
+                        f"({stage['items_per_second']} items/s), blocked on downstream {stage['blocked_seconds']}s")
+        if 'cache' in stats:
+            logger.info(f"Embedding cache: {stats['cache']['hits']} hits, {stats['cache']['misses']} misses, hit rate {stats['cache']['hit_rate']}")
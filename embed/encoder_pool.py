@@ -0,0 +1,99 @@
+import os
+import time
+import logging
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+
+from embed.length_bucketing import encode_length_bucketed
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+#Per-process state of an encoder worker, set by _init_worker
+_model = None
+_bucketing: dict = None
+
+
+def encode_texts(model, texts: list[str], bucketing: dict):
+    '''
+    Encode texts with the model, in length-sorted buckets when bucketing is enabled. Vectors come back in input order.
+    '''
+    if bucketing['enabled']:
+        return encode_length_bucketed(model, texts, bucketing['token_budget'], bucketing['max_batch_size'])
+    return model.encode(texts, convert_to_tensor=False, show_progress_bar=False)
+
+
+def _init_worker(model_name: str, threads_per_worker: int, core_queue, bucketing: dict) -> None:
+    global _model, _bucketing
+
+    cores = core_queue.get()
+    if cores and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+
+    import torch
+    from modelregistry.model_registry import ModelRegistry
+
+    torch.set_num_threads(threads_per_worker)
+    torch.set_num_interop_threads(1)
+
+    _model = ModelRegistry().get_model(model_name, device='cpu')
+    _bucketing = bucketing
+    logger.info(f"Encoder worker {os.getpid()} ready with {threads_per_worker} threads on cores {cores}")
+
+
+def _encode_in_worker(texts: list[str]):
+    return encode_texts(_model, texts, _bucketing)
+
+
+def _warm_up_worker(_) -> int:
+    encode_texts(_model, ['rozgrzewka'], _bucketing)
+    return os.getpid()
+
+
+class EncoderPool:
+    '''
+    CPU encoder processes for full-corpus embedding. Each worker loads its own copy of the model and
+    is pinned to a disjoint set of cores with a matching torch thread count, which scales better
+    than one process with many intra-op threads. Plugs into EmbeddingPipeline as its executor,
+    the pipeline keeps several batches in flight and emits them in submission order.
+    '''
+
+    def __init__(self, workers: int, model_name: str, bucketing: dict, threads_per_worker: int = None) -> None:
+        self.workers = workers
+        cpu_count = os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker or max(cpu_count // workers, 1)
+
+        context = multiprocessing.get_context('spawn')
+        core_queue = context.Queue()
+        for worker in range(workers):
+            start = worker * self.threads_per_worker
+            cores = list(range(start, start + self.threads_per_worker))
+            core_queue.put(cores if cores[-1] < cpu_count else None)
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model_name, self.threads_per_worker, core_queue, bucketing)
+        )
+        self.encode = _encode_in_worker
+
+    @property
+    def encode_concurrency(self) -> int:
+        #One batch encoding and one queued per worker keeps every worker busy between batches
+        return self.workers * 2
+
+    def warm_up(self) -> float:
+        '''
+        Start every worker and load its model, so startup is not counted as encoding time. Returns the seconds it took.
+        '''
+        start = time.perf_counter()
+        pids = set(self.executor.map(_warm_up_worker, range(self.workers * 2)))
+        elapsed = time.perf_counter() - start
+        logger.info(f"Started {len(pids)} encoder workers in {elapsed:.1f}s")
+        return elapsed
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
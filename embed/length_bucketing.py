@@ -0,0 +1,39 @@
+import numpy as np
+
+from sentence_transformers import SentenceTransformer
+
+
+def get_token_lengths(model: SentenceTransformer, texts: list[str]) -> list[int]:
+    encoded = model.tokenizer(texts, truncation=True, max_length=model.max_seq_length)
+    return [len(input_ids) for input_ids in encoded['input_ids']]
+
+
+def make_length_buckets(lengths: list[int], token_budget: int, max_batch_size: int) -> list[np.ndarray]:
+    '''
+    Sort indices by token length and cut them into batches whose padded size (batch size times longest member)
+    stays within token_budget, so short texts get large batches and long texts small ones.
+    '''
+    order = np.argsort(lengths, kind='stable')
+    buckets = []
+    start = 0
+    while start < len(order):
+        end = start + 1
+        while end < len(order) and end - start < max_batch_size and (end - start + 1) * lengths[order[end]] <= token_budget:
+            end += 1
+        buckets.append(order[start:end])
+        start = end
+    return buckets
+
+
+def encode_length_bucketed(model: SentenceTransformer, texts: list[str], token_budget: int, max_batch_size: int) -> np.ndarray:
+    '''
+    Encode texts bucket by bucket and return the vectors in the original order of texts.
+    '''
+    lengths = get_token_lengths(model, texts)
+    vectors = np.zeros((len(texts), model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    for bucket in make_length_buckets(lengths, token_budget, max_batch_size):
+        bucket_texts = [texts[i] for i in bucket]
+        vectors[bucket] = model.encode(bucket_texts, batch_size=len(bucket_texts), convert_to_tensor=False, convert_to_numpy=True, show_progress_bar=False)
+
+    return vectors
@@ -0,0 +1,30 @@
+import asyncio
+import argparse
+
+from embed.embed_acts import EmbedActs
+from embed.embed_questions import EmbedQuestions
+
+
+async def main(target: str, workers: int) -> None:
+    if target == 'acts':
+        embedder = await EmbedActs.create(workers=workers)
+        embed = embedder.embed_act_vectors
+    else:
+        embedder = await EmbedQuestions.create(workers=workers)
+        embed = embedder.embed_questions
+
+    try:
+        if embedder.encoder_pool is not None:
+            embedder.encoder_pool.warm_up()
+        await embed()
+    finally:
+        embedder.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Embed the act vector or question corpus into Qdrant.')
+    parser.add_argument('target', choices=['acts', 'questions'])
+    parser.add_argument('--workers', type=int, default=0, help='Number of CPU encoder processes, 0 encodes in-process on the default device.')
+    args = parser.parse_args()
+
+    asyncio.run(main(args.target, args.workers))
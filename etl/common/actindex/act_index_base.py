@@ -2,6 +2,8 @@ import json
 import logging
 from abc import ABC , abstractmethod
 
+from etl.common.index_store import IndexStore, get_index_store
+
 class ActIndexBase(ABC):
     def __init__(self):
         with open('etl/common/config.json') as f:
@@ -13,6 +15,17 @@ class ActIndexBase(ABC):
         self.leaf_node_acts_index_path = self.config['leaf_node_acts_index']
         self.leaf_node_acts_data_path = self.config['leaf_node_acts_data']
 
+        self.index_store: IndexStore = get_index_store(self.config['index_store'])
+
+    def _open_index(self, index_path: str) -> str:
+        '''
+        Return the name of the index in the index store, importing the JSON index file from index_path on first use.
+        '''
+        file_name = self._get_filename_index()
+        index_name = file_name.removesuffix('.json')
+        self.index_store.import_json_index(index_name, index_path+file_name)
+        return index_name
+
     def _read_json_file(self, filepath: str):
         try:
             with open(filepath, 'r') as file:
@@ -16,32 +16,12 @@ class LeafNodeActIndex(ActIndexBase):
         return str(act_nro) + '_leaf_node_act_data.json'
     
     def _find_missing_nros(self, nro_list: list[int]) -> list[int]:
-        file_name = self._get_filename_index()
-        file_path = self.tree_acts_index_path+file_name
-
-        if os.path.exists(file_path):
-            index = self._read_json_file(file_path)
-
-            missing = list(set(nro_list).difference(set(index)))
-
-            if len(missing) > 0:
-                return missing
-            else:
-                return []
-        else:
-            return nro_list
+        index_name = self._open_index(self.leaf_node_acts_index_path)
+        return self.index_store.find_missing(index_name, nro_list)
     
     def _update_act_index(self, nro_list: list[int]) -> None:
-        file_name = self._get_filename_index()
-        file_path = self.leaf_node_acts_index_path+file_name
-
-        if os.path.exists(file_path):
-            index = self._read_json_file(file_path)
-            updated_index = list(set(index + nro_list))
-            self._write_json_file(file_path, updated_index)
-        else:
-            index = nro_list
-            self._write_json_file(file_path, index)
+        index_name = self._open_index(self.leaf_node_acts_index_path)
+        self.index_store.add(index_name, [str(nro) for nro in nro_list])
     
     def _update_act_data(self, act_nro: int, act_data: dict) -> None:
         file_name = self._get_filename_data(act_nro)
@@ -53,13 +33,8 @@ class LeafNodeActIndex(ActIndexBase):
             self._write_json_file(file_path, act_data)
     
     def _get_act_nros(self)-> list[int]:
-        file_name = self._get_filename_index()
-        file_path = self.leaf_node_acts_index_path+file_name
-
-        if os.path.exists(file_path):
-            return self._read_json_file(file_path)
-        else:
-            return []
+        index_name = self._open_index(self.leaf_node_acts_index_path)
+        return [int(nro) for nro in self.index_store.keys(index_name)]
         
     def _retrieve_leaf_acts(self) -> list[dict]:
         folder_path = self.leaf_node_acts_data_path
@@ -97,11 +72,21 @@ class LeafNodeActIndex(ActIndexBase):
                 
         return act_vector_list
 
-    def _validate_act_index(self) -> bool:
-        index_file_name = self._get_filename_index()
-        index_file_path = self.leaf_node_acts_index_path+index_file_name
+    def _iter_act_vector_keys(self):
+        '''
+        Yield the (act_nro, reconstruct_id) key of every act vector in the transformed acts data, one file at a time.
+        '''
+        folder_path = self.leaf_node_acts_data_path
 
-        indexed = self._read_json_file(index_file_path)
+        for file in os.listdir(folder_path):
+            if file.endswith('.json'):
+                data = self._read_json_file(folder_path+file)
+                for element in data['elements']:
+                    for vector in data['elements'][element]:
+                        yield (data['nro'], vector['reconstruct_id'])
+
+    def _validate_act_index(self) -> bool:
+        indexed = self._get_act_nros()
 
         for index in indexed:
             data_file_name = self._get_filename_data(index)
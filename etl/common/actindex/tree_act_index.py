@@ -1,4 +1,5 @@
 import os
+import datetime
 
 from etl.common.actindex.act_index_base import ActIndexBase
 
@@ -14,33 +15,43 @@ class TreeActIndex(ActIndexBase):
     def _get_filename_data(self, act_nro: int) -> str:
         return str(act_nro) + '_tree_act_data.json'
     
-    def _find_missing_nros(self, nro_list: list[int]) -> list[int]:
-        file_name = self._get_filename_index()
-        file_path = self.tree_acts_index_path+file_name
+    def _get_filename_links(self) -> str:
+        return 'tree_act_links.json'
+
+    def _get_act_links(self) -> dict:
+        '''
+        Return the persisted act nro to cite link map with the time of its last incremental and full refresh.
+        '''
+        file_path = self.tree_acts_index_path+self._get_filename_links()
 
         if os.path.exists(file_path):
-            index = self._read_json_file(file_path)
+            return self._read_json_file(file_path)
+        else:
+            return {'last_update': None, 'last_full_update': None, 'links': {}}
 
-            missing = list(set(nro_list).difference(set(index)))
+    def _update_act_links(self, links: dict[str, str], full: bool = False) -> dict[str, str]:
+        '''
+        Merge newly crawled links into the persisted map and return the merged links.
+        '''
+        file_path = self.tree_acts_index_path+self._get_filename_links()
+        link_data = self._get_act_links()
+        now = datetime.datetime.now().isoformat()
 
-            if len(missing) > 0:
-                return missing
-            else:
-                return []
-        else:
-            return nro_list
+        link_data['links'].update(links)
+        link_data['last_update'] = now
+        if full:
+            link_data['last_full_update'] = now
+
+        self._write_json_file(file_path, link_data)
+        return link_data['links']
+
+    def _find_missing_nros(self, nro_list: list[int]) -> list[int]:
+        index_name = self._open_index(self.tree_acts_index_path)
+        return self.index_store.find_missing(index_name, nro_list)
     
     def _update_act_index(self, nro_list: list[int]) -> None:
-        file_name = self._get_filename_index()
-        file_path = self.tree_acts_index_path+file_name
-
-        if os.path.exists(file_path):
-            index = self._read_json_file(file_path)
-            updated_index = list(set(index + nro_list))
-            self._write_json_file(file_path, updated_index)
-        else:
-            index = nro_list
-            self._write_json_file(file_path, index)
+        index_name = self._open_index(self.tree_acts_index_path)
+        self.index_store.add(index_name, [str(nro) for nro in nro_list])
     
     def _update_act_data(self, act_nro: int, act_data: dict) -> None:
         file_name = self._get_filename_data(act_nro)
@@ -52,19 +63,11 @@ class TreeActIndex(ActIndexBase):
             self._write_json_file(file_path, act_data)
     
     def _get_act_nros(self)-> list[int]:
-        file_name = self._get_filename_index()
-        file_path = self.tree_acts_index_path+file_name
-
-        if os.path.exists(file_path):
-            return self._read_json_file(file_path)
-        else:
-            return []
+        index_name = self._open_index(self.tree_acts_index_path)
+        return [int(nro) for nro in self.index_store.keys(index_name)]
 
     def _validate_act_index(self) -> bool:
-        index_file_name = self._get_filename_index()
-        index_file_path = self.tree_acts_index_path+index_file_name
-
-        indexed = self._read_json_file(index_file_path)
+        indexed = self._get_act_nros()
 
         for index in indexed:
             data_file_name = self._get_filename_data(index)
@@ -0,0 +1,50 @@
+import os
+import logging
+
+from etl.common.actindex.tree_act_index import TreeActIndex
+from etl.common.actindex.leaf_node_act_index import LeafNodeActIndex
+from etl.common.questionindex.raw_question_index import RawQuestionIndex
+from etl.common.questionindex.transformed_question_index import TransformedQuestionIndex
+from etl.common.keywordindex.raw_keyword_index import RawKeywordIndex
+from etl.common.keywordindex.transformed_keyword_index import TransformedKeywordIndex
+
+logging.basicConfig(level=logging.INFO)
+
+
+def import_json_indexes() -> int:
+    '''
+    Import every JSON index file in the configured index directories into the index store, including the
+    question indexes of every domain set. Indexes are also imported lazily when first opened, this moves an
+    existing data directory over in one go. Returns the number of keys imported.
+    '''
+    tree_acts_index = TreeActIndex()
+    leaf_node_acts_index = LeafNodeActIndex()
+    raw_question_index = RawQuestionIndex()
+    transformed_question_index = TransformedQuestionIndex()
+    raw_keyword_index = RawKeywordIndex()
+    transformed_keyword_index = TransformedKeywordIndex()
+
+    sources = [
+        (tree_acts_index.tree_acts_index_path, str),
+        (leaf_node_acts_index.leaf_node_acts_index_path, str),
+        (raw_question_index.raw_questions_index_path, str),
+        (transformed_question_index.transformed_questions_index_path, str),
+        (raw_keyword_index.raw_keyword_index_path, raw_keyword_index._keyword_key),
+        (transformed_keyword_index.transformed_keyword_index_path, transformed_keyword_index._keyword_key)
+    ]
+
+    index_store = tree_acts_index.index_store
+    imported = 0
+    for index_path, key in sources:
+        if not os.path.exists(index_path):
+            continue
+        for file_name in sorted(os.listdir(index_path)):
+            if file_name.endswith('index.json'):
+                imported += index_store.import_json_index(file_name.removesuffix('.json'), index_path+file_name, key=key)
+
+    logging.info(f"Imported {imported} keys into {index_store.path}")
+    return imported
+
+
+if __name__ == '__main__':
+    import_json_indexes()
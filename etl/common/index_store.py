@@ -0,0 +1,134 @@
+import os
+import json
+import sqlite3
+import logging
+import datetime
+
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+
+#Stays below the default SQLite limit of bound parameters per statement
+MAX_VARIABLES = 900
+
+
+class IndexStore:
+    '''
+    Embedded SQLite store behind the act, question and keyword indexes. Every index is a named set of string keys
+    with a primary key lookup, so membership checks do not depend on the size of the index and updates only
+    write the new keys. The database runs in WAL mode and every update is one transaction, so an interrupted
+    run keeps everything committed before it.
+
+    The JSON index files used before are imported once, the first time their index is opened.
+    '''
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        #Transactions are opened explicitly, see transaction()
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS index_keys (
+                index_name TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (index_name, key)
+            ) WITHOUT ROWID''')
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS imported_files (
+                index_name TEXT PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                keys INTEGER NOT NULL,
+                imported_at TEXT NOT NULL
+            )''')
+
+        self._transaction_depth = 0
+        self._imported: set[str] = set(row[0] for row in self.connection.execute('SELECT index_name FROM imported_files'))
+
+    @contextmanager
+    def transaction(self):
+        '''
+        Group several updates into one transaction. Nested transactions join the outermost one.
+        '''
+        if self._transaction_depth == 0:
+            self.connection.execute('BEGIN IMMEDIATE')
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self.connection.execute('ROLLBACK')
+            raise
+        self._transaction_depth -= 1
+        if self._transaction_depth == 0:
+            self.connection.execute('COMMIT')
+
+    def contains(self, index_name: str, key: str) -> bool:
+        row = self.connection.execute('SELECT 1 FROM index_keys WHERE index_name = ? AND key = ?', (index_name, key)).fetchone()
+        return row is not None
+
+    def find_missing(self, index_name: str, items: Iterable, key: Callable = str) -> list:
+        '''
+        Return the items whose key is not in the index, without duplicates and in the order given.
+        '''
+        unique = {}
+        for item in items:
+            unique.setdefault(key(item), item)
+
+        keys = list(unique)
+        found = set()
+        for start in range(0, len(keys), MAX_VARIABLES):
+            chunk = keys[start:start + MAX_VARIABLES]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.connection.execute(f'SELECT key FROM index_keys WHERE index_name = ? AND key IN ({placeholders})', (index_name, *chunk))
+            found.update(row[0] for row in rows)
+
+        return [item for item_key, item in unique.items() if item_key not in found]
+
+    def add(self, index_name: str, keys: Iterable[str]) -> None:
+        with self.transaction():
+            self.connection.executemany('INSERT OR IGNORE INTO index_keys (index_name, key) VALUES (?, ?)', ((index_name, key) for key in keys))
+
+    def keys(self, index_name: str) -> list[str]:
+        return [row[0] for row in self.connection.execute('SELECT key FROM index_keys WHERE index_name = ?', (index_name,))]
+
+    def count(self, index_name: str) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM index_keys WHERE index_name = ?', (index_name,)).fetchone()[0]
+
+    def import_json_index(self, index_name: str, file_path: str, key: Callable = str) -> int:
+        '''
+        Import the keys of a JSON index file into the index, once. Returns the number of keys imported.
+        '''
+        if index_name in self._imported or not os.path.exists(file_path):
+            return 0
+
+        with open(file_path, 'r') as f:
+            keys = [key(entry) for entry in json.load(f)]
+
+        with self.transaction():
+            self.add(index_name, keys)
+            self.connection.execute('INSERT OR REPLACE INTO imported_files (index_name, file_path, keys, imported_at) VALUES (?, ?, ?, ?)',
+                                    (index_name, file_path, len(keys), datetime.datetime.now().isoformat()))
+        self._imported.add(index_name)
+
+        logging.info(f"Imported {len(keys)} keys of {file_path} into index {index_name}")
+        return len(keys)
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+_stores: dict[str, IndexStore] = {}
+
+
+def get_index_store(path: str) -> IndexStore:
+    '''
+    Return the process-wide store of the database at path, opening it on first use.
+    '''
+    if path not in _stores:
+        _stores[path] = IndexStore(path)
+    return _stores[path]
@@ -3,6 +3,8 @@ import logging
 
 from abc import ABC, abstractmethod
 
+from etl.common.index_store import IndexStore, get_index_store
+
 logging.basicConfig(level=logging.WARNING)
 
 
@@ -18,6 +20,23 @@ class KeywordIndexBase(ABC):
         self.transformed_keyword_index_path = self.config['transformed_keyword_index']
         self.transformed_keyword_data_path = self.config['transformed_keyword_data']
 
+        self.index_store: IndexStore = get_index_store(self.config['index_store'])
+
+    def _keyword_key(self, keyword: dict) -> str:
+        return f"{keyword['conceptId']}_{keyword['instanceOfType']}"
+
+    def _keyword_from_key(self, key: str) -> dict:
+        concept_id, instance_of_type = key.split('_')
+        return {'conceptId': int(concept_id), 'instanceOfType': int(instance_of_type)}
+
+    def _open_index(self, index_path: str) -> str:
+        '''
+        Return the name of the index in the index store, importing the JSON index file from index_path on first use.
+        '''
+        file_name = self._get_filename_index()
+        index_name = file_name.removesuffix('.json')
+        self.index_store.import_json_index(index_name, index_path+file_name, key=self._keyword_key)
+        return index_name
 
     def _read_json_file(self, filepath: str):
         try:
@@ -1,4 +1,6 @@
 import os
+import json
+import logging
 
 from etl.common.keywordindex.keyword_index_base import KeywordIndexBase
 
@@ -15,39 +17,53 @@ class RawKeywordIndex(KeywordIndexBase):
         instanceOfType = keyword['instanceOfType']
         return f'{conceptId}_({instanceOfType}).json'
     
-    def _find_missing_keywords(self, keyword_list: list[dict]) -> list[dict]:
-        file_name = self._get_filename_index()
-        file_path = self.raw_keyword_index_path+file_name
+    def _get_filename_partial(self, keyword: dict) -> str:
+        conceptId = keyword['conceptId']
+        instanceOfType = keyword['instanceOfType']
+        return f'{conceptId}_({instanceOfType}).partial.jsonl'
 
-        keyword_set = set([(keyword['conceptId'], keyword['instanceOfType']) for keyword in keyword_list])
+    def _read_partial_pages(self, keyword: dict) -> list[dict]:
+        '''
+        Return the pages of a keyword fetched so far, in the order they were fetched.
+        A line an interrupted run left half written is cut off.
+        '''
+        file_path = self.raw_keyword_data_path+self._get_filename_partial(keyword)
+        if not os.path.exists(file_path):
+            return []
 
-        if os.path.exists(file_path):
-            index = self._read_json_file(file_path)
-            index_set = set([(keyword['conceptId'], keyword['instanceOfType']) for keyword in index])
-
-            missing = list(keyword_set.difference(index_set))
-            
-            if len(missing) > 0:
-                return missing
-            else:
-                return []
-        else:
-            return list({'conceptId': keyword['conceptId'], 'instanceOfType': keyword['instanceOfType']} for keyword in keyword_list)
-        
-    def _update_keyword_index(self, keyword_list: list[dict]) -> None:
-        file_name = self._get_filename_index()
-        file_path = self.raw_keyword_index_path+file_name
+        pages = []
+        with open(file_path, 'r+b') as f:
+            offset = 0
+            for line in f:
+                try:
+                    pages.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logging.warning(f"Dropping incomplete page in {file_path}")
+                    break
+                offset += len(line)
+            f.truncate(offset)
+        return pages
 
-        if os.path.exists(file_path):
-            index = self._read_json_file(file_path)
+    def _append_partial_page(self, keyword: dict, start_from: int, batch_size: int, documents: list[dict]) -> None:
+        file_path = self.raw_keyword_data_path+self._get_filename_partial(keyword)
+        page = {'start_from': start_from, 'batch_size': batch_size, 'documents': documents}
+        with open(file_path, 'ab') as f:
+            f.write(json.dumps(page, ensure_ascii=False).encode('utf-8') + b'\n')
 
-            index_set = set([(keyword['conceptId'], keyword['instanceOfType']) for keyword in index])
-            keyword_set = set([(keyword['conceptId'], keyword['instanceOfType']) for keyword in keyword_list])
+    def _remove_partial(self, keyword: dict) -> None:
+        file_path = self.raw_keyword_data_path+self._get_filename_partial(keyword)
+        if os.path.exists(file_path):
+            os.remove(file_path)
 
-            updated_index = list(index_set.union(keyword_set))
+    def _find_missing_keywords(self, keyword_list: list[dict]) -> list[dict]:
+        index_name = self._open_index(self.raw_keyword_index_path)
+        missing = self.index_store.find_missing(index_name, keyword_list, key=self._keyword_key)
+        return [{'conceptId': keyword['conceptId'], 'instanceOfType': keyword['instanceOfType']} for keyword in missing]
 
-            to_write = list({'conceptId': keyword[0], 'instanceOfType': keyword[1]} for keyword in updated_index)
-            self._write_json_file(file_path, to_write)
-        else:
-            index = keyword_list
-            self._write_json_file(file_path, index)
\ No newline at end of file
+    def _get_keywords(self) -> list[dict]:
+        index_name = self._open_index(self.raw_keyword_index_path)
+        return [self._keyword_from_key(key) for key in self.index_store.keys(index_name)]
+        
+    def _update_keyword_index(self, keyword_list: list[dict]) -> None:
+        index_name = self._open_index(self.raw_keyword_index_path)
+        self.index_store.add(index_name, [self._keyword_key(keyword) for keyword in keyword_list])
\ No newline at end of file
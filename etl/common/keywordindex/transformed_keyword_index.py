@@ -16,23 +16,13 @@ class TransformedKeywordIndex(KeywordIndexBase):
         return f'{conceptId}_({instanceOfType}).json'
     
     def _find_missing_keywords(self, keyword_list: list[dict]) -> list[dict]:
-        file_name = self._get_filename_index()
-        file_path = self.transformed_keyword_index_path+file_name
+        index_name = self._open_index(self.transformed_keyword_index_path)
+        missing = self.index_store.find_missing(index_name, keyword_list, key=self._keyword_key)
+        return [{'conceptId': keyword['conceptId'], 'instanceOfType': keyword['instanceOfType']} for keyword in missing]
 
-        keyword_set = set([(keyword['conceptId'], keyword['instanceOfType']) for keyword in keyword_list])
-
-        if os.path.exists(file_path):
-            index = self._read_json_file(file_path)
-            index_set = set([(keyword['conceptId'], keyword['instanceOfType']) for keyword in index])
-
-            missing = list(keyword_set.difference(index_set))
-            
-            if len(missing) > 0:
-                return missing
-            else:
-                return []
-        else:
-            return list({'conceptId': keyword['conceptId'], 'instanceOfType': keyword['instanceOfType']} for keyword in keyword_list)
+    def _get_keywords(self) -> list[dict]:
+        index_name = self._open_index(self.transformed_keyword_index_path)
+        return [self._keyword_from_key(key) for key in self.index_store.keys(index_name)]
     
     def _retrieve_keywords(self) -> list[dict]:
         data_path = self.transformed_keyword_data_path
@@ -52,19 +42,5 @@ class TransformedKeywordIndex(KeywordIndexBase):
         return keywords
 
     def _update_keyword_index(self, keyword_list: list[dict]) -> None:
-        file_name = self._get_filename_index()
-        file_path = self.transformed_keyword_index_path+file_name
-
-        if os.path.exists(file_path):
-            index = self._read_json_file(file_path)
-
-            index_set = set([(keyword['conceptId'], keyword['instanceOfType']) for keyword in index])
-            keyword_set = set([(keyword['conceptId'], keyword['instanceOfType']) for keyword in keyword_list])
-
-            updated_index = list(index_set.union(keyword_set))
-
-            to_write = list({'conceptId': keyword[0], 'instanceOfType': keyword[1]} for keyword in updated_index)
-            self._write_json_file(file_path, to_write)
-        else:
-            index = keyword_list
-            self._write_json_file(file_path, index)
\ No newline at end of file
+        index_name = self._open_index(self.transformed_keyword_index_path)
+        self.index_store.add(index_name, [self._keyword_key(keyword) for keyword in keyword_list])
\ No newline at end of file
@@ -1,12 +1,17 @@
 import os
+import json
 import logging
 import datetime
 
 from etl.common.questionindex.question_index_base import QuestionIndexBase
 
 class RawQuestionIndex(QuestionIndexBase):
+    #Questions appended to the shard between two moves of the progress marker
+    PROGRESS_INTERVAL = 100
+
     def __init__(self) -> None:
         super().__init__()
+        self._unmarked: dict[str, int] = {}
     
     def _get_filename_index(self, domains: list[dict] = None) -> str:
         '''
@@ -27,46 +32,108 @@ class RawQuestionIndex(QuestionIndexBase):
             return '_'.join(str(list(d.values())[0]) for d in domains) + '_raw_data.json'
         else:
             return 'all_data.json'
-        
 
-    def _find_missing_nros(self, nro_list: list[int], batch_size: int, domains: list[dict] = None) -> list[list[int]]:
+    def _get_filename_shard(self, domains: list[dict] = None) -> str:
         '''
-        Given a list of question_nros, check if the index of raw questions exists and return only not indexed nros.
+        Given a list of domains, return the filename of the jsonl shard questions are appended to while they are extracted.
         '''
+        return self._get_filename_data(domains=domains) + 'l'
 
-        file_name = self._get_filename_index(domains=domains)
-        file_path = self.raw_questions_index_path+file_name
+    def _get_filename_progress(self, domains: list[dict] = None) -> str:
+        '''
+        Given a list of domains, return the filename of the progress marker of the shard.
+        '''
+        return self._get_filename_data(domains=domains).replace('.json', '_progress.json')
 
-        if os.path.exists(file_path):
-            index = self._read_json_file(file_path)
+    def _open_shard(self, domains: list[dict] = None) -> tuple:
+        '''
+        Open the shard for appending and return it with the nros it already holds.
+        The shard is cut back to the offset of the progress marker, dropping a line an interrupted run left half written.
+        '''
+        shard_path = self.raw_questions_data_path+self._get_filename_shard(domains=domains)
+        progress_path = self.raw_questions_data_path+self._get_filename_progress(domains=domains)
 
-            missing = list(set(nro_list).difference(set(index)))
+        offset = self._read_json_file(progress_path)['offset'] if os.path.exists(progress_path) else 0
 
-            if len(missing) > 0:
-                missing = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
-                return missing
-            else:
-                logging.info("All questions already indexed.")
-                return []
-        else:
-            return [nro_list[i:i + batch_size] for i in range(0, len(nro_list), batch_size)]
-        
-    def _update_questions_index(self, nro_list: list[int] , domains: list[dict] = None) -> None:
+        shard = open(shard_path, 'a+b')
+        shard.truncate(offset)
+        shard.seek(0)
+
+        nros = set()
+        for line in shard:
+            nros.add(str(json.loads(line)['nro']))
+
+        if nros:
+            logging.info(f"Resuming from {len(nros)} questions already in {shard_path}")
+        return shard, nros
+
+    def _append_question(self, shard, question: dict, domains: list[dict] = None) -> None:
         '''
-        Given a list of question_nros, create or update the index of raw questions.
+        Append a question to the shard and move the progress marker past it every PROGRESS_INTERVAL questions.
+        An interruption loses at most the questions appended since the last move, they are extracted again on resume.
         '''
+        shard.write(json.dumps(question, ensure_ascii=False).encode('utf-8') + b'\n')
 
-        file_name = self._get_filename_index(domains=domains)
-        file_path = self.raw_questions_index_path+file_name
+        self._unmarked[shard.name] = self._unmarked.get(shard.name, 0) + 1
+        if self._unmarked[shard.name] >= self.PROGRESS_INTERVAL:
+            self._mark_progress(shard, domains=domains)
 
-        if os.path.exists(file_path):
-            index = self._read_json_file(file_path)
+    def _mark_progress(self, shard, domains: list[dict] = None) -> None:
+        '''
+        Flush the shard and move the progress marker to its end.
+        '''
+        shard.flush()
 
-            nro_list = list(set(nro_list + index))
+        progress_path = self.raw_questions_data_path+self._get_filename_progress(domains=domains)
+        self._write_json_file(progress_path + '.tmp', {'last_update': str(datetime.datetime.now()), 'offset': shard.tell()})
+        os.replace(progress_path + '.tmp', progress_path)
+        self._unmarked[shard.name] = 0
 
-            self._write_json_file(file_path, nro_list)
+    def _close_shard(self, shard, domains: list[dict] = None) -> None:
+        '''
+        Move the progress marker past the last appended question and close the shard.
+        '''
+        if self._unmarked.get(shard.name, 0) > 0:
+            self._mark_progress(shard, domains=domains)
+        self._unmarked.pop(shard.name, None)
+        shard.close()
+
+    def _iter_questions(self, domains: list[dict] = None):
+        '''
+        Yield the raw questions of the given domains, from the data file and the shard.
+        '''
+        data_path = self.raw_questions_data_path+self._get_filename_data(domains=domains)
+        if os.path.exists(data_path):
+            yield from self._read_json_file(data_path)['questions'].values()
+
+        shard_path = self.raw_questions_data_path+self._get_filename_shard(domains=domains)
+        if os.path.exists(shard_path):
+            with open(shard_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    yield json.loads(line)
+
+
+    def _find_missing_nros(self, nro_list: list[int], batch_size: int, domains: list[dict] = None) -> list[list[int]]:
+        '''
+        Given a list of question_nros, check if the index of raw questions exists and return only not indexed nros.
+        '''
+
+        index_name = self._open_index(self.raw_questions_index_path, domains=domains)
+        missing = self.index_store.find_missing(index_name, nro_list)
+
+        if len(missing) > 0:
+            return [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
         else:
-            self._write_json_file(file_path, nro_list)
+            logging.info("All questions already indexed.")
+            return []
+        
+    def _update_questions_index(self, nro_list: list[int] , domains: list[dict] = None) -> None:
+        '''
+        Given a list of question_nros, create or update the index of raw questions.
+        '''
+
+        index_name = self._open_index(self.raw_questions_index_path, domains=domains)
+        self.index_store.add(index_name, [str(nro) for nro in nro_list])
 
     def _update_questions_data(self, questions: list[dict] , domains: list[dict] = None) -> list[str]:
         '''
@@ -102,18 +169,14 @@ class RawQuestionIndex(QuestionIndexBase):
         Given a list of domains, check if the set of question_nros in the index is equal to the set of question_nros in the data.
         '''
 
-        file_name_index = self._get_filename_index(domains=domains)
-        file_name_data = self._get_filename_data(domains=domains)
-
-        file_path_index = self.raw_questions_index_path+file_name_index
-        file_path_data = self.raw_questions_data_path+file_name_data
+        index_name = self._open_index(self.raw_questions_index_path, domains=domains)
 
-        if os.path.exists(file_path_index) and os.path.exists(file_path_data):
+        if self.index_store.count(index_name) > 0:
 
-            index_question_nros = self._read_json_file(file_path_index)
-            data_question_nros = self._read_json_file(file_path_data)
+            index_question_nros = set(self.index_store.keys(index_name))
+            data_question_nros = set(str(question['nro']) for question in self._iter_questions(domains=domains))
 
-            if set([str(index) for index in index_question_nros ]) == set(data_question_nros['questions'].keys()):
+            if index_question_nros == data_question_nros:
                 return True
             else:
                 return False
\ No newline at end of file
@@ -52,41 +52,24 @@ class TransformedQuestionIndex(QuestionIndexBase):
         Given a list of question_nros, check if the index of transformed questions exists and return only not indexed nros.
         '''
 
-        file_name = self._get_filename_index(domains=domains)
-        file_path = self.transformed_questions_index_path+file_name
-
-        if os.path.exists(file_path):
-
-            index = self._read_json_file(file_path)
-            index = [str(nro) for nro in index]
-
-            missing = list(set(nro_list).difference(set(index)))
-
-            if len(missing) > 0:
-                return missing
-            else:
-                return []
-        else:
-            return nro_list
+        index_name = self._open_index(self.transformed_questions_index_path, domains=domains)
+        return self.index_store.find_missing(index_name, nro_list)
     
     def _update_questions_index(self, nro_list: list[str] , domains: list[dict] = None) -> None:
         '''
         Given a list of question_nros, create or update the index of transformed questions.
         '''
 
-        nro_list = [int(nro) for nro in nro_list]
-        
-        file_name = self._get_filename_index(domains=domains)
-        file_path = self.transformed_questions_index_path+file_name
-
-        if os.path.exists(file_path):
-            index = self._read_json_file(file_path)
+        index_name = self._open_index(self.transformed_questions_index_path, domains=domains)
+        self.index_store.add(index_name, [str(int(nro)) for nro in nro_list])
 
-            nro_list = list(set(nro_list + index))
+    def _get_question_nros(self, domains: list[dict] = None) -> list[int]:
+        '''
+        Given a list of domains, return the question_nros in the index of transformed questions.
+        '''
 
-            self._write_json_file(file_path, nro_list)
-        else:
-            self._write_json_file(file_path, nro_list)
+        index_name = self._open_index(self.transformed_questions_index_path, domains=domains)
+        return [int(nro) for nro in self.index_store.keys(index_name)]
 
     def _update_questions_data(self, questions: list[dict] , domains: list[dict] = None) -> list[str]:
         '''
@@ -122,18 +105,16 @@ class TransformedQuestionIndex(QuestionIndexBase):
         Given a list of domains, check if the set of question_nros in the index is equal to the set of question_nros in the data.
         '''
 
-        file_name_index = self._get_filename_index(domains=domains)
+        index_name = self._open_index(self.transformed_questions_index_path, domains=domains)
         file_name_data = self._get_filename_data(domains=domains)
-
-        file_path_index = self.transformed_questions_index_path+file_name_index
         file_path_data = self.transformed_questions_data_path+file_name_data
 
-        if os.path.exists(file_path_index) and os.path.exists(file_path_data):
+        if self.index_store.count(index_name) > 0 and os.path.exists(file_path_data):
 
-            index_question_nros = self._read_json_file(file_path_index)
+            index_question_nros = self.index_store.keys(index_name)
             data_question_nros = self._read_json_file(file_path_data)
 
-            if set([str(index) for index in index_question_nros ]) == set(data_question_nros['questions'].keys()):
+            if set(index_question_nros) == set(data_question_nros['questions'].keys()):
                 return True
             else:
                 return False
@@ -8,8 +8,21 @@ from models.datamodels.tree_act import TreeAct , Element
 
 
 class ActParser:
-    def __init__(self) -> None:
-        pass
+    '''
+    Builds the unit tree of an act from its HTML in a single walk over the document.
+
+    The walk records the first div for every id, so units are looked up in O(1) instead of
+    searching the whole document per unit. Children of every node are then resolved bottom-up
+    in one reverse pass and parents with one pass over the units.
+    features selects the BeautifulSoup backend, 'html.parser' (default) or the faster 'lxml'.
+    '''
+
+    SUPPORTED_FEATURES = ('html.parser', 'lxml')
+
+    def __init__(self, features: str = 'html.parser') -> None:
+        if features not in self.SUPPORTED_FEATURES:
+            raise ValueError(f"Unsupported parser backend {features}, expected one of {self.SUPPORTED_FEATURES}")
+        self.features = features
 
     def unit_id_to_div_id(self,unit_id: str) -> str:
         return "\\\"" + unit_id + "\\\""
@@ -17,60 +30,61 @@ class ActParser:
     def div_id_to_unit_id(self,div_id: str) -> str:
         return div_id.strip("\\\"").replace(' ', '')
 
-    def find_divs_at_target_level(self, soup: BeautifulSoup, parent_id: str, target_ids: list[str]) -> list[str]:
-        target_ids_set = set(target_ids)
-        def search_divs(element) -> list[str]:
-            if element is None:
-                print(f"No div found with id: {parent_id}")
-                return []
-            result=[]
-            if element.name == 'div':
-                child_div_ids = [child.get('id') for child in element.find_all('div', recursive=False) if child.get('id')]
-                if any(id in target_ids_set for id in child_div_ids):
-                    for id in child_div_ids:
-                        if id in target_ids_set:
-                            result.append(id)
-                    return child_div_ids
-            
-            for child in element.children:
-                if isinstance(child, Tag):
-                    result = search_divs(child)
-                    if result:
-                        return result
-            return []
-        
-        if ' ' in parent_id:
-            print(f"Parent id contains space: {parent_id}")
-        parent_div = soup.find('div', id=parent_id)
-        return search_divs(parent_div)
-
-    def get_text_excluding_children(self,soup: BeautifulSoup, parent_id: str, exclude_ids: list[str]) -> str:
-        exclude_ids_set = set(exclude_ids)
-        result_text = ''
-
-        parent_div = soup.find('div', id=parent_id)
-        if not parent_div:
-            return result_text
-
-        def extract_text(element) -> None:
-            nonlocal result_text
-            for content in element.contents:
-                if isinstance(content, NavigableString):
-                    result_text += content.strip() + ' '
-                elif content.name == 'div' and content.get('id') in exclude_ids_set:
+    def _walk_tags(self, soup: BeautifulSoup) -> list[Tag]:
+        '''
+        Return every tag of the document in pre-order.
+        '''
+        tags = []
+        stack = [soup]
+        while stack:
+            tag = stack.pop()
+            tags.append(tag)
+            stack.extend(reversed([child for child in tag.contents if isinstance(child, Tag)]))
+        return tags
+
+    def _find_children(self, tags: list[Tag], target_ids: set[str]) -> dict[int, list[str]]:
+        '''
+        For every tag return the child div ids of the first div in its subtree (itself included, pre-order)
+        that directly contains a target div. Tags are visited in reverse pre-order so descendants come first.
+        '''
+        children: dict[int, list[str]] = {}
+        for tag in reversed(tags):
+            if tag.name == 'div':
+                child_div_ids = [child.get('id') for child in tag.contents if isinstance(child, Tag) and child.name == 'div' and child.get('id')]
+                if any(child_id in target_ids for child_id in child_div_ids):
+                    children[id(tag)] = child_div_ids
                     continue
-                elif hasattr(content, 'contents'):
-                    extract_text(content)
 
-        extract_text(parent_div)
-        return result_text.strip()
-    
+            for child in tag.contents:
+                if isinstance(child, Tag) and id(child) in children:
+                    children[id(tag)] = children[id(child)]
+                    break
+        return children
+
+    def _get_text_excluding_children(self, element: Tag, exclude_ids: list[str]) -> str:
+        exclude_ids_set = set(exclude_ids)
+        parts = []
+
+        stack = [iter(element.contents)]
+        while stack:
+            content = next(stack[-1], None)
+            if content is None:
+                stack.pop()
+            elif isinstance(content, NavigableString):
+                parts.append(content.strip() + ' ')
+            elif content.name == 'div' and content.get('id') in exclude_ids_set:
+                continue
+            elif hasattr(content, 'contents'):
+                stack.append(iter(content.contents))
+
+        return ''.join(parts).strip()
+
     def parse_single_act(self, html_content, tree_act: TreeAct, data: dict):
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, self.features)
         if data.get('units') is None:
             logging.error(f"Could not find units for act with id: {tree_act.nro}")
             return None
-        
+
         clean_units = []
         for unit in data['units']:
             if ' ' in unit.get('unitId'):
@@ -79,31 +93,46 @@ class ActParser:
                 clean_units.append(unit)
 
         div_ids = [self.unit_id_to_div_id(unit['unitId']) for unit in clean_units]
+
+        tags = self._walk_tags(soup)
+        divs_by_id: Dict[str, Tag] = {}
+        for tag in tags:
+            if tag.name == 'div' and tag.get('id'):
+                divs_by_id.setdefault(tag.get('id'), tag)
+
+        children = self._find_children(tags, set(div_ids))
+
         elements_dict: Dict[str, Element] = {}
-        for id in div_ids:
-            elements_dict[id] = Element(
-            children=self.find_divs_at_target_level(soup, id, div_ids),
+        for div_id in div_ids:
+            div = divs_by_id.get(div_id)
+            if div is None:
+                logging.warning(f"No div found with id: {div_id}")
+            elements_dict[div_id] = Element(
+            children=list(children.get(id(div), [])) if div is not None else [],
             parent=None,
             text="",
             keywords=[]
         )
-            
-        # Set parents and update text
-        for id in div_ids:
-            elements_dict[id].parent = None
-            for child_id in div_ids:
-                if id in elements_dict[child_id].children:
-                    elements_dict[id].parent = child_id
-                    break
-            elements_dict[id].text = self.get_text_excluding_children(soup, id, elements_dict[id].children)
+
+        #A unit's parent is the first unit, in unit order, listing it as a child
+        parents: Dict[str, str] = {}
+        for div_id in elements_dict:
+            for child_id in elements_dict[div_id].children:
+                parents.setdefault(child_id, div_id)
+
+        for div_id in elements_dict:
+            elements_dict[div_id].parent = parents.get(div_id)
+            div = divs_by_id.get(div_id)
+            if div is not None:
+                elements_dict[div_id].text = self._get_text_excluding_children(div, elements_dict[div_id].children)
 
         # Clean and fix the data
-        for id in div_ids:
-            elements_dict[id].children = [self.div_id_to_unit_id(child) for child in elements_dict[id].children]
-            if elements_dict[id].parent is not None:
-                elements_dict[id].parent = self.div_id_to_unit_id(elements_dict[id].parent)
-            elements_dict[id].text = elements_dict[id].text.replace('\\\"', '').replace('  ', ' ').replace('\u00A0', '')
-        
+        for div_id in div_ids:
+            elements_dict[div_id].children = [self.div_id_to_unit_id(child) for child in elements_dict[div_id].children]
+            if elements_dict[div_id].parent is not None:
+                elements_dict[div_id].parent = self.div_id_to_unit_id(elements_dict[div_id].parent)
+            elements_dict[div_id].text = elements_dict[div_id].text.replace('\\\"', '').replace('  ', ' ').replace('\u00A0', '')
+
         clean_dict = {}
         for key in elements_dict.keys():
             clean_dict[self.div_id_to_unit_id(key)] = elements_dict[key]
@@ -112,7 +141,7 @@ class ActParser:
             tree_act.title  = tree_act.title .replace('\\\"', '').replace('  ', ' ').replace('\u00A0', '')
         if tree_act.shortQuote  is not None:
             tree_act.shortQuote = tree_act.shortQuote.replace('\\\"', '').replace('  ', ' ').replace('\u00A0', '')
-        
+
         tree_act.elements = clean_dict
 
-        return tree_act
\ No newline at end of file
+        return tree_act
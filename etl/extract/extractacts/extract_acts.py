@@ -1,21 +1,20 @@
 import os
+import json
 import tqdm
 import dotenv
-import aiohttp
 import asyncio
 import logging
 import datetime
-import requests
 
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type,wait_exponential
 from bs4 import BeautifulSoup
 
 from sessionmanager.session_manager import SessionManager
+from httpclient.http_client import HttpClient, get_http_client
 from models.datamodels.tree_act import TreeAct, RelatedKeyword
 from etl.common.actindex.tree_act_index import TreeActIndex
 from etl.common.questionindex.transformed_question_index import TransformedQuestionIndex
 from etl.extract.extractacts.act_payloads import ActPayloads
-from etl.extract.extractacts.act_parser import ActParser
+from etl.extract.parser_pool import ParserPool, get_parser_pool
 
 dotenv.load_dotenv()
 GET_ACT_KEYWORDS_URL = os.getenv('GET_ACT_KEYWORDS_URL')
@@ -27,12 +26,10 @@ GET_CITE_BASE_URL = os.getenv('GET_CITE_BASE_URL')
 
 logging.basicConfig(level=logging.WARNING)
 
-MAX_RETRIES = 3
-RETRY_WAIT_SECONDS = 2
-
-class RetryableHTTPError(Exception):
-        """Custom exception class for retryable HTTP errors."""
-        pass
+MAX_ACTS_IN_PROGRESS = 50
+LINK_PAGES_PER_BATCH = 5
+LINK_MAP_MAX_AGE_DAYS = 7
+INDEX_BATCH_SIZE = 100
 
 class ExtractActs():
     
@@ -41,134 +38,166 @@ class ExtractActs():
         self.tree_acts_index = TreeActIndex()
         self.transformed_question_index = TransformedQuestionIndex()
         self.payloads = ActPayloads()
-        self.parser = ActParser()
+        self.parser_pool: ParserPool = get_parser_pool()
+        self.http_client: HttpClient = get_http_client()
 
     def _find_not_indexed_acts(self, act_nros: list[int]) -> list[int]:
         '''
-        Given a list of act_nros, check if the index of transformed acts exists and return only not transformed nros.
+        Given a list of act_nros, return only the nros not in the index of extracted acts.
         '''
-        file_name = self.tree_acts_index._get_filename_index()
-        file_path = self.tree_acts_index.tree_acts_index_path+file_name
-
-        if os.path.exists(file_path):
-            return self.tree_acts_index._find_missing_nros(nro_list=act_nros)
-        else:
-            return act_nros
+        return self.tree_acts_index._find_missing_nros(nro_list=act_nros)
     
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type(Exception)))
-    def _get_act_keywords(self, act_id: int) -> list[dict]:
+    async def _get_act_keywords(self, act_id: int) -> list[dict]:
         '''
         Return keywords for any legal act based on its id
         '''
         request_url = GET_ACT_KEYWORDS_URL
         payload = self.payloads.get_act_keywords_payload(act_id)
-        try:
-            response = requests.post(request_url,
-                                    headers=self.sessionManager.get_headers(),
-                                    cookies=self.sessionManager.get_cookies(),
-                                    json=payload)
-        except Exception as e:
-            logging.error(f"Exception: {e}, {act_id}")
+
+        response = await self.http_client.post(request_url, json_payload=payload, session=self.sessionManager)
         data = response.json()
+
         if 'keywords' not in data.keys():
             logging.warning(f"Could not find keywords for act with id: {act_id}")
             return []
         return data['keywords']
 
-    @retry(retry=retry_if_exception_type(RetryableHTTPError), wait=wait_exponential(min=1, max=60))
-    async def get_pagination_results(self, session, url, class_name):
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    spans_result = [span.text for div in soup.find_all('div', class_=class_name) for span in div.find_all('span')]
-                    return int(spans_result[-2])
-                else:
-                    return f"Failed with status code: {response.status}"
-        except aiohttp.ClientResponseError as e:
-            if e.status == 500:
-                logging.error(f"HTTP 500 error for URL: {url}. Retrying...")
-                raise RetryableHTTPError(f"HTTP 500 error for URL: {url}")
-            else:
-                logging.error(f"HTTP error {e.status} for URL: {url}")
-                return f"Failed with status code: {e.status}"
-        except Exception as e:
-            logging.error(f"Error in get_pagination_results: {e}")
-            raise
+    async def get_pagination_results(self, url, class_name):
+        response = await self.http_client.get(url)
+        if response.status != 200:
+            logging.error(f"HTTP error {response.status} for URL: {url}")
+            return f"Failed with status code: {response.status}"
 
+        soup = BeautifulSoup(response.text, 'html.parser')
+        spans_result = [span.text for div in soup.find_all('div', class_=class_name) for span in div.find_all('span')]
+        return int(spans_result[-2])
 
-    @retry(retry=retry_if_exception_type(RetryableHTTPError), wait=wait_exponential(min=1, max=60))
-    async def get_links_with_exact_class(self,session,url, class_name):
+    async def get_links_with_exact_class(self, url, class_name):
+        '''
+        Return the nro to cite link map of a listing page, None if the page could not be fetched.
+        '''
         try:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                content = await response.text()
-                soup = BeautifulSoup(content, 'html.parser')
-                links = soup.find_all('a', class_=class_name)
-
-                nro_to_link = {}
-                for link in links:
-                    if link.get('href') and GET_LINK_TO_AVOID not in link.get('href'):
-                        nro = link.get('href').split('-')[-1]
-                        if nro not in nro_to_link: 
-                            nro_to_link[nro] = GET_LINK_BASE_URL + link.get('href') + '/'
-
-                return nro_to_link
-            
-        except aiohttp.ClientResponseError as e:
-            if e.status == 500:
-                logging.error(f"HTTP 500 error for URL: {url}. Retrying...")
-                raise RetryableHTTPError(f"HTTP 500 error for URL: {url}")
-            else:
-                logging.error(f"HTTP error {e.status} for URL: {url}")
-                return {}  
+            response = await self.http_client.get(url)
+            response.raise_for_status()
         except Exception as e:
             logging.error(f"Error in get_links_with_exact_class: {e}")
-            return {}  
+            return None
+
+        soup = BeautifulSoup(response.text, 'html.parser')
+        links = soup.find_all('a', class_=class_name)
+
+        nro_to_link = {}
+        for link in links:
+            if link.get('href') and GET_LINK_TO_AVOID not in link.get('href'):
+                nro = link.get('href').split('-')[-1]
+                if nro not in nro_to_link: 
+                    nro_to_link[nro] = GET_LINK_BASE_URL + link.get('href') + '/'
 
-    async def get_all_links(self , base_url):
-        async with aiohttp.ClientSession() as session:
-            pagination_class_name = "pagination-results"
-            total_acts_count = await self.get_pagination_results(session, base_url + '1', pagination_class_name)
-            logging.info(f'Total acts: {total_acts_count}')
+        return nro_to_link
 
-            per_page = 90
-            pages_count = (total_acts_count + per_page - 1) // per_page
+    async def get_all_links(self , base_url) -> tuple[dict[str, str], bool]:
+        '''
+        Crawl every listing page and return the links found and whether every page was fetched.
+        '''
+        pagination_class_name = "pagination-results"
+        total_acts_count = await self.get_pagination_results(base_url + '1', pagination_class_name)
+        logging.info(f'Total acts: {total_acts_count}')
 
-            batch_size = 25
-            all_dicts = {}
+        per_page = 90
+        pages_count = (total_acts_count + per_page - 1) // per_page
 
-            for i in tqdm.tqdm(range(1, pages_count + 1, batch_size)):
-                end = min(i + batch_size, pages_count + 1)
-                batched_tasks = [self.get_links_with_exact_class(session, base_url + str(page), "wk-link") for page in range(i, end)]
-                results = await asyncio.gather(*batched_tasks)
-                for result in results:
-                    all_dicts.update(result)
+        all_dicts = {}
+        failed_pages = 0
+        tasks = [self.get_links_with_exact_class(base_url + str(page), "wk-link") for page in range(1, pages_count + 1)]
+        for task in tqdm.tqdm(asyncio.as_completed(tasks), total=len(tasks)):
+            page_links = await task
+            if page_links is None:
+                failed_pages += 1
+            else:
+                all_dicts.update(page_links)
 
-            return all_dicts
-        
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type(Exception)))
-    async def get_act(self, act_nro: int , link: str) -> TreeAct:
+        if failed_pages > 0:
+            logging.warning(f'{failed_pages} of {pages_count} listing pages failed, the full crawl is incomplete')
+        return all_dicts, failed_pages == 0
+
+    async def get_new_links(self, base_url: str, known_nros: set[str]) -> dict[str, str]:
         '''
-        Return any legal act based on its id
+        Crawl the listing from its first page in batches of LINK_PAGES_PER_BATCH pages
+        and stop after the batch in which an already known act appears.
         '''
+        pagination_class_name = "pagination-results"
+        total_acts_count = await self.get_pagination_results(base_url + '1', pagination_class_name)
+
+        per_page = 90
+        pages_count = (total_acts_count + per_page - 1) // per_page
+
+        new_links = {}
+        crawled_pages = 0
+        for start in range(1, pages_count + 1, LINK_PAGES_PER_BATCH):
+            pages = range(start, min(start + LINK_PAGES_PER_BATCH, pages_count + 1))
+            results = await asyncio.gather(*[self.get_links_with_exact_class(base_url + str(page), "wk-link") for page in pages])
+            crawled_pages += len(pages)
+
+            reached_known = False
+            for page_links in results:
+                if page_links is None:
+                    continue
+                new_links.update(page_links)
+                if not known_nros.isdisjoint(page_links):
+                    reached_known = True
+            if reached_known:
+                break
+
+        logging.info(f'Crawled {crawled_pages} of {pages_count} listing pages, found {len(set(new_links) - known_nros)} new links')
+        return new_links
+
+    def _is_full_crawl_stale(self, last_full_update: str) -> bool:
+        if last_full_update is None:
+            return True
+        age = datetime.datetime.now() - datetime.datetime.fromisoformat(last_full_update)
+        return age > datetime.timedelta(days=LINK_MAP_MAX_AGE_DAYS)
+
+    async def get_links(self, base_url: str, act_nros: list[int]) -> dict[str, str]:
+        '''
+        Return the persisted nro to cite link map, refreshed only as far as needed to cover act_nros.
+        Known acts need no requests. Otherwise the newest listing pages are crawled until known links appear,
+        and the whole listing is crawled again only when acts are still missing and the last full crawl
+        is older than LINK_MAP_MAX_AGE_DAYS.
+        '''
+        link_data = self.tree_acts_index._get_act_links()
+        links = link_data['links']
+        wanted = set(str(act_nro) for act_nro in act_nros)
+
+        if wanted.issubset(links):
+            logging.info(f"All {len(wanted)} act links are known.")
+            return links
+
+        if links:
+            logging.info("Refreshing act links...")
+            links = self.tree_acts_index._update_act_links(await self.get_new_links(base_url, set(links)))
 
+        if not wanted.issubset(links) and self._is_full_crawl_stale(link_data['last_full_update']):
+            logging.info("Extracting all links...")
+            all_links, complete = await self.get_all_links(base_url)
+            #Only a crawl of every page counts as full, otherwise the next run tries again
+            links = self.tree_acts_index._update_act_links(all_links, full=complete)
+
+        return links
+
+    async def _fetch_act(self, act_nro: int) -> str:
         date = str(datetime.datetime.now()).split()[0] 
         request_url = f'{GET_ACT_BASE_URL}?nro={act_nro}&pointInTime={date}'
-        try:
-            response = requests.get(request_url,
-                                    headers=self.sessionManager.get_headers(),
-                                    cookies=self.sessionManager.get_cookies())
-        except Exception as e:
-            logging.error(f"Exception: {e}, {act_nro}")
-        data = response.json()
+
+        response = await self.http_client.get(request_url, session=self.sessionManager)
+        response.raise_for_status()
+        return response.text
+
+    async def _get_act_data(self, act_nro: int, link: str) -> tuple[str, dict]:
+        '''
+        Download an act and return its raw content with the data dict the parser expects.
+        '''
+        content = await self._fetch_act(act_nro)
+        data = json.loads(content)
 
         if 'actLawType' not in data.keys():
             data['actLawType'] = None
@@ -181,7 +210,7 @@ class ExtractActs():
 
         id = data['id']
 
-        keywords = self._get_act_keywords(id)
+        keywords = await self._get_act_keywords(id)
         keywords_models = []
 
         for keyword in keywords:
@@ -192,11 +221,45 @@ class ExtractActs():
 
         
         data['citeLink'] = link
-        return self.parser.parse_single_act(html_content=response.text, tree_act=TreeAct(**data), data=data)
-    
+
+        return content, data
+
+    async def get_act(self, act_nro: int , link: str) -> TreeAct:
+        '''
+        Return any legal act based on its id
+        '''
+        content, data = await self._get_act_data(act_nro=act_nro, link=link)
+        return await self.parser_pool.parse_act(content, data)
+
+    async def _extract_act(self, act_nro: int, link: str, semaphore: asyncio.Semaphore) -> tuple[int, TreeAct]:
+        try:
+            #The download slot is held until the act is queued for parsing, so downloads pause while the parsers are behind
+            async with semaphore:
+                content, data = await self._get_act_data(act_nro=act_nro, link=link)
+                parsed = await self.parser_pool.submit_act(content, data)
+            return act_nro, await parsed
+        except Exception as e:
+            logging.error(f"Failed to extract act with id: {act_nro}, {e}")
+            return act_nro, None
+
+    def _save_act(self, act_nro: int, tree_act: TreeAct) -> None:
+        '''
+        Write the act data file. The act is indexed by the caller, in batches.
+        '''
+        file_name = self.tree_acts_index._get_filename_data(act_nro)
+        file_path = self.tree_acts_index.tree_acts_data_path+file_name
+
+        if os.path.exists(file_path):
+            logging.warning(f"Act with id {act_nro} already exists.")
+        else:
+            self.tree_acts_index._write_json_file(file_path, tree_act.model_dump())
+
     async def get_acts(self, act_nros: list[int]) -> None:
         '''
         Extract all acts from the list of act_nros and save them to the index.
+        Acts are downloaded concurrently through the shared HTTP client, parsed in the parser pool
+        and each is saved as soon as it is parsed. Saved acts are indexed in batches of INDEX_BATCH_SIZE,
+        an interrupted run re-downloads at most the last unindexed batch.
         '''
         not_indexed_acts = self._find_not_indexed_acts(act_nros=act_nros)
         
@@ -204,24 +267,32 @@ class ExtractActs():
             logging.info("All acts are already indexed.")
             return None
         
-        logging.info("Extracting links...")
-        links = await self.get_all_links(base_url=GET_CITE_BASE_URL)
+        links = await self.get_links(base_url=GET_CITE_BASE_URL, act_nros=not_indexed_acts)
         
         logging.info("Extracting acts...")
-        for act_nro in tqdm.tqdm(not_indexed_acts):
-            tree_act = await self.get_act(act_nro=act_nro, link=links[str(act_nro)])
+        semaphore = asyncio.Semaphore(MAX_ACTS_IN_PROGRESS)
+        tasks = []
+        for act_nro in not_indexed_acts:
+            if str(act_nro) not in links:
+                logging.warning(f"Could not find link for act with id: {act_nro}")
+                continue
+            tasks.append(self._extract_act(act_nro, links[str(act_nro)], semaphore))
+
+        saved_nros = []
+        for task in tqdm.tqdm(asyncio.as_completed(tasks), total=len(tasks)):
+            act_nro, tree_act = await task
             if tree_act is None:
                 logging.warning(f"Could not extract act with id: {act_nro}")
                 continue
-            
-            file_name = self.tree_acts_index._get_filename_data(act_nro)
-            file_path = self.tree_acts_index.tree_acts_data_path+file_name
+            self._save_act(act_nro, tree_act)
 
-            if os.path.exists(file_path):
-                logging.warning(f"Act with id {act_nro} already exists.")
-                continue
-            else:
-                self.tree_acts_index._write_json_file(file_path, tree_act.model_dump())
-                self.tree_acts_index._update_act_index([act_nro])
-        
-        
\ No newline at end of file
+            saved_nros.append(act_nro)
+            if len(saved_nros) >= INDEX_BATCH_SIZE:
+                self.tree_acts_index._update_act_index(saved_nros)
+                saved_nros = []
+
+        if saved_nros:
+            self.tree_acts_index._update_act_index(saved_nros)
+
+        self.http_client.log_metrics()
+        self.parser_pool.log_metrics()
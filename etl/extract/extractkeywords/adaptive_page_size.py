@@ -0,0 +1,51 @@
+import time
+
+
+class AdaptivePageSize:
+    '''
+    Page size of paginated keyword requests, adapted to how well the upstream copes with it.
+    A page answered within target_latency_seconds grows the size by grow_step, a slower or failed page
+    multiplies it by decrease_factor, so large pages are used while they are cheap and the size backs off
+    as soon as the upstream slows down or errors.
+
+    Many pages are in flight at once, so decreases are applied at most once per decrease_interval_seconds
+    (target_latency_seconds by default). A burst of slow pages sized before the last decrease halves the size once.
+    '''
+
+    def __init__(self, initial: int, min_size: int, max_size: int, target_latency_seconds: float, grow_step: int = 5, decrease_factor: float = 0.5,
+                 decrease_interval_seconds: float = None) -> None:
+        self.current = float(initial)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_latency_seconds = target_latency_seconds
+        self.grow_step = grow_step
+        self.decrease_factor = decrease_factor
+        self.decrease_interval_seconds = target_latency_seconds if decrease_interval_seconds is None else decrease_interval_seconds
+        self.last_decrease = 0.0
+        self.metrics = {'pages': 0, 'failed_pages': 0, 'slow_pages': 0}
+
+    @property
+    def size(self) -> int:
+        return int(self.current)
+
+    def record(self, latency: float = None, failed: bool = False) -> None:
+        '''
+        Record a page. latency is its network time, None when unknown, such as for a cached response.
+        '''
+        slow = latency is not None and latency > self.target_latency_seconds
+        self.metrics['pages'] += 1
+        if failed:
+            self.metrics['failed_pages'] += 1
+        elif slow:
+            self.metrics['slow_pages'] += 1
+
+        if failed or slow:
+            now = time.monotonic()
+            if now - self.last_decrease >= self.decrease_interval_seconds:
+                self.current = max(self.min_size, self.current * self.decrease_factor)
+                self.last_decrease = now
+        else:
+            self.current = min(self.max_size, self.current + self.grow_step)
+
+    def get_metrics(self) -> dict:
+        return {'page_size': self.size, **self.metrics}
@@ -1,14 +1,14 @@
 import os
 import tqdm
 import json
-import aiohttp
 import asyncio
 import logging
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
 
 from sessionmanager.session_manager import SessionManager
+from httpclient.http_client import HttpClient, get_http_client
 from etl.extract.extractkeywords.keyword_payloads import KeywordPayloads
+from etl.extract.extractkeywords.adaptive_page_size import AdaptivePageSize
 from etl.common.questionindex.transformed_question_index import TransformedQuestionIndex
 from etl.common.keywordindex.raw_keyword_index import RawKeywordIndex
 
@@ -17,8 +17,12 @@ load_dotenv()
 
 GET_KEYWORD_URL = os.getenv('GET_KEYWORD_URL')
 BATCH_SIZE = 25
-MAX_RETRIES = 3
-RETRY_WAIT_SECONDS = 2
+MIN_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+TARGET_PAGE_LATENCY_SECONDS = 2.0
+PAGES_IN_PROGRESS_PER_KEYWORD = 8
+#Bounds how many keywords are fetched at once, request concurrency is up to the HTTP client
+MAX_KEYWORDS_IN_PROGRESS = 50
 
 class ExtractKeywords:
     def __init__(self, session_manager: SessionManager):
@@ -26,19 +30,12 @@ class ExtractKeywords:
         self.transformed_question_index = TransformedQuestionIndex()
         self.raw_keyword_index = RawKeywordIndex()
         self.keyword_payloads = KeywordPayloads()
-        self.timeout = aiohttp.ClientTimeout(total=20) 
+        self.http_client: HttpClient = get_http_client()
+        self.page_size = AdaptivePageSize(BATCH_SIZE, MIN_PAGE_SIZE, MAX_PAGE_SIZE, TARGET_PAGE_LATENCY_SECONDS)
 
     def _find_missing_keywords(self, keywords: list[dict]) -> list[dict]:
         return self.raw_keyword_index._find_missing_keywords(keywords)
     
-    def _create_session(self) -> aiohttp.ClientSession:
-        return aiohttp.ClientSession(
-            headers=self.session_manager.get_headers(),
-            cookies=self.session_manager.get_cookies(),
-            connector=aiohttp.TCPConnector(limit=25,ssl=False),
-            timeout=self.timeout
-        )
-
     def _parse_single_keyword(self, data: dict) -> list[dict]:
         document_list = data.get('documentList', [])
         if not document_list:
@@ -56,48 +53,49 @@ class ExtractKeywords:
         ]
 
 
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type(asyncio.TimeoutError)))
+    async def _post(self, payload: dict) -> dict:
+        response = await self.http_client.post(GET_KEYWORD_URL, json_payload=payload, session=self.session_manager)
+        return response.json()
+
     async def _get_max_hits(self, keyword_id:int , ui_concept_id:int=-1) -> int:
         '''
         Return the total number of related data for a given keyword_id and ui_concept_id.
         '''
         payload = self.keyword_payloads._get_keyword_payload(keyword_id=keyword_id,ui_concept_id=ui_concept_id)
         
-        async with self._create_session() as session:
-            try:
-                response = await session.post(GET_KEYWORD_URL, json=payload ,timeout=self.timeout)
-            except asyncio.TimeoutError:
-                logging.warning(f"Request {keyword_id} timed out. Continuing with the next request.")
-                return None
-            data = await response.json()
-
-            if data.get('availableHitCount') is None:
-                logging.warning('No availableHitCount in response. Continuing with the next request.')
-                logging.debug(data)
-                return None
-            else:
-                return data['availableHitCount']
-
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type(asyncio.TimeoutError)))
-    async def _get_keyword_part(self, keyword_id: int, start_from: int = 0, batch_size: int = BATCH_SIZE, ui_concept_id: int = -1) -> list[dict]:
+        try:
+            data = await self._post(payload)
+        except asyncio.TimeoutError:
+            logging.warning(f"Request {keyword_id} timed out. Continuing with the next request.")
+            return None
+        except Exception as e:
+            logging.error(f"Could not get max hits for keyword {keyword_id}: {e}")
+            return None
+
+        if data.get('availableHitCount') is None:
+            logging.warning('No availableHitCount in response. Continuing with the next request.')
+            logging.debug(data)
+            return None
+        else:
+            return data['availableHitCount']
+
+    async def _get_keyword_part(self, keyword_id: int, start_from: int = 0, batch_size: int = BATCH_SIZE, ui_concept_id: int = -1) -> list[dict] | None:
+        '''
+        Return the documents of one page of a keyword, None if the page could not be fetched.
+        '''
         payload = self.keyword_payloads._get_keyword_payload(keyword_id=keyword_id,ui_concept_id=ui_concept_id, start_from=start_from, batch_size=batch_size)
         try:
-            async with self._create_session() as session:
-                async with session.post(url=GET_KEYWORD_URL, json=payload) as response:
-                    data = await response.json()
-                    return self._parse_single_keyword(data=data)
+            #Only the network time of the page counts, waits in the HTTP client's own queue say nothing about the page size
+            response = await self.http_client.post(GET_KEYWORD_URL, json_payload=payload, session=self.session_manager)
+            documents = self._parse_single_keyword(data=response.json())
+            self.page_size.record(response.latency)
+            return documents
         except asyncio.TimeoutError:
             logging.warning(f"Request {keyword_id} timed out. Continuing with the next request.")
         except Exception as e:
             logging.error(f"Exception occurred: {e}", exc_info=True)
-        return []
-
+        self.page_size.record(failed=True)
+        return None
 
     def _concatenate_results(self, results: list) -> dict:
         if not results:
@@ -109,77 +107,113 @@ class ExtractKeywords:
             json.dump(data, f, indent=4, ensure_ascii=False)
             f.close()
 
-    def _create_tasks(self, keyword_id: int, max_hits: int, ui_concept_id: int) -> list:
-        tasks = []
-        total_calls = (max_hits + BATCH_SIZE - 1) // BATCH_SIZE  # Calculate total calls including possible remainder
-
-        for i in range(total_calls):
-            batch_size = BATCH_SIZE if i < total_calls - 1 else max_hits % BATCH_SIZE or BATCH_SIZE
-            tasks.append(self._get_keyword_part(keyword_id=keyword_id, start_from=i * BATCH_SIZE, batch_size=batch_size, ui_concept_id=ui_concept_id))
-
-        return tasks
-
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type(asyncio.TimeoutError)))
-    async def _wrapped_task(self, task, pbar) -> dict[str, dict]:
-        result = await task
-        pbar.update(1)
-        return result
+    def _find_missing_ranges(self, pages: list[dict], max_hits: int) -> list[tuple[int, int]]:
+        '''
+        Return the [start, end) hit ranges of a keyword not covered by the pages fetched so far.
+        '''
+        missing = []
+        position = 0
+        for page in sorted(pages, key=lambda page: page['start_from']):
+            if page['start_from'] > position:
+                missing.append((position, min(page['start_from'], max_hits)))
+            position = max(position, page['start_from'] + page['batch_size'])
+            if position >= max_hits:
+                break
+        if position < max_hits:
+            missing.append((position, max_hits))
+        return [(start, end) for start, end in missing if start < end]
+
+    def _iter_pages(self, missing_ranges: list[tuple[int, int]]):
+        '''
+        Yield (start_from, batch_size) pages covering the missing ranges, sized by the adaptive page size at the time each page is taken.
+        '''
+        for start, end in missing_ranges:
+            while start < end:
+                batch_size = min(self.page_size.size, end - start)
+                yield start, batch_size
+                start += batch_size
 
-    async def _run_tasks(self, keywords) -> None:
-        semaphore = asyncio.Semaphore(25)
-
-        async def process_batch(batch):
-            tasks = []
-            for keyword in batch:
-                task = self._get_keyword(keyword_data=keyword, semaphore=semaphore)
-                wrapped = self._wrapped_task(task, pbar)
-                tasks.append(wrapped)
-            await asyncio.gather(*tasks)
+    async def _page_worker(self, keyword_data: dict, pages) -> bool:
+        '''
+        Fetch pages until none are left, appending each to the partial file of the keyword. Returns False if any page failed.
+        '''
+        complete = True
+        for start_from, batch_size in pages:
+            documents = await self._get_keyword_part(keyword_id=keyword_data['conceptId'], start_from=start_from, batch_size=batch_size, ui_concept_id=keyword_data['instanceOfType'])
+            if documents is None:
+                complete = False
+                continue
+            self.raw_keyword_index._append_partial_page(keyword_data, start_from, batch_size, documents)
+        return complete
+
+    def _assemble_keyword(self, keyword_data: dict) -> None:
+        '''
+        Turn the partial file of a fully fetched keyword into its data file and index it.
+        '''
+        pages = sorted(self.raw_keyword_index._read_partial_pages(keyword_data), key=lambda page: page['start_from'])
+        concatenated_results = self._concatenate_results([page['documents'] for page in pages])
 
-        with tqdm.tqdm(total=len(keywords)) as pbar:
-            for i in range(0, len(keywords), BATCH_SIZE):
-                batch = keywords[i:i + BATCH_SIZE]
-                await process_batch(batch)
+        if not concatenated_results:
+            logging.warning(f"Could not find keyword with id: {keyword_data['conceptId']}")
 
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type(asyncio.TimeoutError)))
-    async def _get_keyword(self, keyword_data: dict , semaphore: asyncio.Semaphore) -> None:
+        folder_path = self.raw_keyword_index.raw_keyword_data_path
+        self._write_json_to_file(folder_path + self.raw_keyword_index._get_filename_data(keyword_data), concatenated_results)
+        self.raw_keyword_index._update_keyword_index([keyword_data])
+        self.raw_keyword_index._remove_partial(keyword_data)
 
-        keyword_id = keyword_data['conceptId']
-        ui_concept_id = keyword_data['instanceOfType']
+    async def _get_keyword(self, keyword_data: dict, max_hits: int, semaphore: asyncio.Semaphore) -> None:
+        '''
+        Fetch the pages of a keyword missing from its partial file. The keyword is assembled once every page is there,
+        otherwise the fetched pages are kept and the next run only requests the rest.
+        '''
+        async with semaphore:
+            pages = self.raw_keyword_index._read_partial_pages(keyword_data)
+            missing_ranges = self._find_missing_ranges(pages, max_hits)
 
-        max_hits = await self._get_max_hits(keyword_id=keyword_id, ui_concept_id=ui_concept_id)
+            if missing_ranges:
+                page_iterator = self._iter_pages(missing_ranges)
+                workers = [self._page_worker(keyword_data, page_iterator) for _ in range(PAGES_IN_PROGRESS_PER_KEYWORD)]
+                if not all(await asyncio.gather(*workers)):
+                    logging.warning(f"Keyword {keyword_data['conceptId']} is incomplete, fetched pages are kept for the next run.")
+                    return
 
-        if max_hits == 0:
-            folder_path = self.raw_keyword_index.raw_keyword_data_path
-            self._write_json_to_file(f"{folder_path}/{keyword_id}_({ui_concept_id}).json", [])
-            self.raw_keyword_index._update_keyword_index([keyword_data])
-            return
+            self._assemble_keyword(keyword_data)
 
-        tasks = self._create_tasks(keyword_id, max_hits, ui_concept_id)
+    async def _get_keyword_max_hits(self, keyword_data: dict, semaphore: asyncio.Semaphore) -> int:
+        async with semaphore:
+            return await self._get_max_hits(keyword_id=keyword_data['conceptId'], ui_concept_id=keyword_data['instanceOfType'])
 
-        try:
-            async with semaphore:
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                concatenated_results = self._concatenate_results(results)
+    async def _wrapped_task(self, task, pbar) -> dict[str, dict]:
+        result = await task
+        pbar.update(1)
+        return result
 
-                if not concatenated_results:
-                    logging.warning(f"Could not find keyword with id: {keyword_id}")
+    async def _run_tasks(self, keywords) -> None:
+        '''
+        Look up the size of every keyword first and fetch the largest ones first,
+        so the biggest keywords do not end up alone in the tail of the run.
+        '''
+        semaphore = asyncio.Semaphore(MAX_KEYWORDS_IN_PROGRESS)
+        max_hits = await asyncio.gather(*[self._get_keyword_max_hits(keyword, semaphore) for keyword in keywords])
 
+        scheduled = []
+        for keyword, hits in zip(keywords, max_hits):
+            if hits == 0:
                 folder_path = self.raw_keyword_index.raw_keyword_data_path
-                self._write_json_to_file(f"{folder_path}/{keyword_id}_({ui_concept_id}).json", concatenated_results)
+                self._write_json_to_file(folder_path + self.raw_keyword_index._get_filename_data(keyword), [])
+                self.raw_keyword_index._update_keyword_index([keyword])
+            elif hits is not None:
+                scheduled.append((keyword, hits))
+        scheduled.sort(key=lambda item: item[1], reverse=True)
+
+        #Semaphore waiters are served in order, so keywords start largest first
+        with tqdm.tqdm(total=len(scheduled)) as pbar:
+            tasks = [self._wrapped_task(self._get_keyword(keyword_data=keyword, max_hits=hits, semaphore=semaphore), pbar) for keyword, hits in scheduled]
+            await asyncio.gather(*tasks)
 
-                self.raw_keyword_index._update_keyword_index([keyword_data])
-                
-        except Exception as e:
-            logging.error(f"Error gathering keyword parts: {e}", exc_info=True)
+        logging.info(f"Keyword page size: {self.page_size.get_metrics()}")
+        self.http_client.log_metrics()
 
     async def get_keywords(self, keywords: list[dict]) -> None:
         keywords = self._find_missing_keywords(keywords)
         await self._run_tasks(keywords)
-    
@@ -1,13 +1,11 @@
 import os
 import dotenv
-import aiohttp
 import asyncio
 
 from abc import ABC , abstractmethod
-from aiohttp import ClientTimeout
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
 
 from sessionmanager.session_manager import SessionManager
+from httpclient.http_client import HttpClient, get_http_client
 from etl.extract.extractquestions.question_payloads import QuestionPayloads
 
 dotenv.load_dotenv()
@@ -15,22 +13,18 @@ GET_QUESTION_URL = os.getenv('GET_QUESTION_URL')
 GET_QUESTION_ACTS_URL = os.getenv('GET_QUESTION_ACTS_URL')
 GET_QUESTION_KEYWORDS_URL = os.getenv('GET_QUESTION_KEYWORDS_URL')
 
-MAX_RETRIES = 3
-RETRY_WAIT_SECONDS = 2
-
 
 class ExtractQuestionsBase(ABC):
 
     def __init__(self, sessionManager: SessionManager):
-        self.TIMEOUT = ClientTimeout(total=25)
-
         self.sessionManager = sessionManager
         self.payloads = QuestionPayloads()
+        self.http_client: HttpClient = get_http_client()
             
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type((Exception,asyncio.TimeoutError))))
+    async def _post(self, url: str, payload: dict) -> dict:
+        response = await self.http_client.post(url, json_payload=payload, session=self.sessionManager)
+        return response.json()
+
     async def get_question(self, question_nro: int) -> dict:
         '''
         For a given question_nro, returns the question data.
@@ -40,19 +34,11 @@ class ExtractQuestionsBase(ABC):
         request_url = GET_QUESTION_URL
         
         try:
-            async with aiohttp.ClientSession(headers=self.sessionManager.get_headers(), cookies=self.sessionManager.get_cookies(), connector=aiohttp.TCPConnector(ssl=False), timeout=self.TIMEOUT) as session:
-                async with session.post(request_url, json=qa_payload) as response:
-                    data = await response.json()
-            return data
-        
+            return await self._post(request_url, qa_payload)
         except asyncio.TimeoutError:
             print(f"Request {question_nro} timed out.")
             return None
 
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type((Exception,asyncio.TimeoutError))))
     async def get_question_acts(self, question_nro: int) -> dict:
         '''
         For a given question_nro, returns the acts associated with the question.
@@ -61,26 +47,16 @@ class ExtractQuestionsBase(ABC):
         url = GET_QUESTION_ACTS_URL
         payload = self.payloads._get_question_acts_payload(question_nro)
 
-        async with aiohttp.ClientSession(headers=self.sessionManager.get_headers(), cookies=self.sessionManager.get_cookies(), connector=aiohttp.TCPConnector(ssl=False), timeout=self.TIMEOUT) as session:
-            try:
-                try:
-                    async with session.post(url, json=payload) as response:
-                        data = await response.json()
-
-                except asyncio.TimeoutError:
-                    print(
-                        f"Request {question_nro} timed out. Continuing with the next request.")
-                    return None
-                return data
-            
-            except Exception as e:
-                print(f"Exception: {e}")
-                return None    
+        try:
+            return await self._post(url, payload)
+        except asyncio.TimeoutError:
+            print(
+                f"Request {question_nro} timed out. Continuing with the next request.")
+            return None
+        except Exception as e:
+            print(f"Exception: {e}")
+            return None    
             
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type((Exception,asyncio.TimeoutError))))
     async def get_question_keywords(self, question_id: int) -> dict:
         '''
         For a given question_id, returns the keywords associated with the question.
@@ -89,21 +65,15 @@ class ExtractQuestionsBase(ABC):
         payload = self.payloads._get_question_keywords_payload(question_id)
         url = GET_QUESTION_KEYWORDS_URL
 
-        async with aiohttp.ClientSession(headers=self.sessionManager.get_headers(), cookies=self.sessionManager.get_cookies(), connector=aiohttp.TCPConnector(ssl=False), timeout=self.TIMEOUT) as session:
-            try:
-                try:
-                    async with session.post(url, json=payload) as response:
-                        data = await response.json()
-
-                except asyncio.TimeoutError:
-                    print(
-                        f"Request {question_id} timed out. Continuing with the next request.")
-                    return None
-                return data
-            
-            except Exception as e:
-                print(f"Exception: {e}")
-                return None
+        try:
+            return await self._post(url, payload)
+        except asyncio.TimeoutError:
+            print(
+                f"Request {question_id} timed out. Continuing with the next request.")
+            return None
+        except Exception as e:
+            print(f"Exception: {e}")
+            return None
     
     @abstractmethod
     async def get_complete_question(self, question_nro: int) -> dict:
@@ -0,0 +1,132 @@
+import os
+import asyncio
+import logging
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+
+from models.datamodels.tree_act import TreeAct
+from etl.extract.extractacts.act_parser import ActParser
+from etl.extract.extractquestions.question_parser import QuestionParser
+
+
+#Per-process parsers of a pool worker, set by _init_worker
+_act_parser: ActParser = None
+_question_parser: QuestionParser = None
+
+
+def _init_worker(features: str) -> None:
+    global _act_parser, _question_parser
+    _act_parser = ActParser(features=features)
+    _question_parser = QuestionParser()
+
+
+def _parse_act(content: str, data: dict) -> TreeAct:
+    return _act_parser.parse_single_act(html_content=content, tree_act=TreeAct(**data), data=data)
+
+
+def _parse_question(question_data: dict, act_data: dict, keyword_data: dict) -> dict:
+    return _question_parser.parse_question_data(question_data, act_data, keyword_data)
+
+
+class ParserPool:
+    '''
+    Worker processes running the CPU-bound BeautifulSoup parsers, so parsing uses every core
+    while the event loop keeps fetching.
+
+    Raw responses wait in a bounded queue until a worker is free. submit() blocks while the queue
+    is full, which holds back callers that fetch faster than the workers parse.
+    '''
+
+    def __init__(self, workers: int = None, queue_size: int = None, features: str = 'html.parser') -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size or self.workers * 2
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(features,)
+        )
+        self.queue: asyncio.Queue = None
+        self.dispatchers: list[asyncio.Task] = []
+        self.metrics = {'submitted': 0, 'parsed': 0, 'failed': 0, 'queue_full_waits': 0}
+
+    def _start(self) -> None:
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+            self.dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def _dispatch(self) -> None:
+        '''
+        Move jobs from the queue to the process pool, one job per worker at a time.
+        '''
+        loop = asyncio.get_running_loop()
+        while True:
+            func, args, future = await self.queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                result = await loop.run_in_executor(self.executor, func, *args)
+                self.metrics['parsed'] += 1
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                self.metrics['failed'] += 1
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def submit(self, func, *args) -> asyncio.Future:
+        '''
+        Queue func(*args) for a worker and return a future for its result. Waits while the queue is full.
+        '''
+        self._start()
+        if self.queue.full():
+            self.metrics['queue_full_waits'] += 1
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((func, args, future))
+        self.metrics['submitted'] += 1
+        return future
+
+    async def submit_act(self, content: str, data: dict) -> asyncio.Future:
+        return await self.submit(_parse_act, content, data)
+
+    async def submit_question(self, question_data: dict, act_data: dict, keyword_data: dict) -> asyncio.Future:
+        return await self.submit(_parse_question, question_data, act_data, keyword_data)
+
+    async def parse_act(self, content: str, data: dict) -> TreeAct:
+        return await (await self.submit_act(content, data))
+
+    async def parse_question(self, question_data: dict, act_data: dict, keyword_data: dict) -> dict:
+        return await (await self.submit_question(question_data, act_data, keyword_data))
+
+    def get_metrics(self) -> dict:
+        return {'workers': self.workers, 'queue_size': self.queue_size, **self.metrics}
+
+    def log_metrics(self) -> None:
+        logging.info(f"Parser pool: {self.get_metrics()}")
+
+    async def close(self) -> None:
+        for dispatcher in self.dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        self.dispatchers = []
+        self.queue = None
+        await asyncio.to_thread(self.executor.shutdown, wait=True)
+
+
+_pool: ParserPool = None
+
+
+def get_parser_pool() -> ParserPool:
+    '''
+    Return the process-wide parser pool, creating it on first use.
+    '''
+    global _pool
+    if _pool is None:
+        _pool = ParserPool()
+    return _pool
@@ -0,0 +1,21 @@
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def report_key_diff(name: str, expected: set, existing: set) -> bool:
+    '''
+    Log every expected key missing from the database and every database key not present in the transformed data.
+    Return True if nothing is missing.
+    '''
+    missing = expected.difference(existing)
+    extra = existing.difference(expected)
+
+    for key in sorted(missing, key=str):
+        logger.info(f"{name} {key} not found in database.")
+    for key in sorted(extra, key=str):
+        logger.warning(f"{name} {key} found in database but not in transformed data.")
+
+    logger.info(f"{name}: {len(expected)} expected, {len(existing)} in database, {len(missing)} missing, {len(extra)} extra.")
+    return len(missing) == 0
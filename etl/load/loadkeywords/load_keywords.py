@@ -1,9 +1,9 @@
-import tqdm
 import logging
 
 from mongodb.base_database import BaseDatabase
 from mongodb.collections.mongo_keyword_collection import MongoKeywordCollection
 from etl.common.keywordindex.transformed_keyword_index import TransformedKeywordIndex
+from etl.load.load_validation import report_key_diff
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,16 +22,11 @@ class LoadKeywords(BaseDatabase):
         instance.collection = await MongoKeywordCollection.create()
         return instance
     
-    async def load_keywords(self) -> None:
-        await self.collection.add_keywords(keywords = self.keyword_index._retrieve_keywords())
+    async def load_keywords(self) -> dict:
+        return await self.collection.add_keywords(keywords = self.keyword_index._retrieve_keywords())
 
     async def validate_loaded_data(self) -> bool:
-        index = self.keyword_index._get_filename_index()
-        index = self.keyword_index._read_json_file(self.keyword_index.transformed_keyword_index_path+index)
+        index = self.keyword_index._get_keywords()
 
-        for keyword in tqdm.tqdm(index):
-            keyword = await self.collection.get_keyword(keyword['conceptId'], keyword['instanceOfType'])
-            if keyword is None:
-                logger.info(f"Keyword {keyword} not found in database.")
-                return False
-        return True
\ No newline at end of file
+        expected = set((keyword['conceptId'], keyword['instanceOfType']) for keyword in index)
+        return report_key_diff('Keyword', expected=expected, existing=await self.collection.get_keyword_ids())
\ No newline at end of file
@@ -1,10 +1,10 @@
 import os
-import tqdm
 import logging
 
 from mongodb.base_database import BaseDatabase
 from mongodb.collections.mongo_leaf_act_collection import MongoLeafActCollection
 from etl.common.actindex.leaf_node_act_index import LeafNodeActIndex
+from etl.load.load_validation import report_key_diff
 
 
 logging.basicConfig(level=logging.INFO)
@@ -22,21 +22,11 @@ class LoadLeafActs(BaseDatabase):
         instance.collection = await MongoLeafActCollection.create()
         return instance
 
-    async def load_leaf_acts(self) -> None:
-        await self.collection.add_leaf_acts(leaf_acts=self.leaf_act_index._retrieve_leaf_acts())
+    async def load_leaf_acts(self) -> dict:
+        return await self.collection.add_leaf_acts(leaf_acts=self.leaf_act_index._retrieve_leaf_acts())
 
     async def validate_loaded_data(self) -> bool:
         index = self.leaf_act_index.leaf_node_acts_data_path
 
-        for leaf_act in tqdm.tqdm(os.listdir(index)):
-            if leaf_act.endswith('.json'):
-                nro = int(leaf_act.split('_')[0])
-                leaf_act = await self.collection.get_leaf_act(nro)
-                if leaf_act is None:
-                    logger.info(f"Leaf act {leaf_act} not found in database.")
-                    return False
-        return True
-
-
-
-    
+        expected = set(int(leaf_act.split('_')[0]) for leaf_act in os.listdir(index) if leaf_act.endswith('.json'))
+        return report_key_diff('Leaf act', expected=expected, existing=await self.collection.get_leaf_act_nros())
@@ -1,8 +1,8 @@
-import tqdm
 import logging
 
 from mongodb.collections.mongo_question_collection import MongoQuestionCollection
 from etl.common.questionindex.transformed_question_index import TransformedQuestionIndex
+from etl.load.load_validation import report_key_diff
 
 
 logging.basicConfig(level=logging.INFO)
@@ -20,16 +20,10 @@ class LoadQuestions():
         instance.collection = await MongoQuestionCollection.create()
         return instance
     
-    async def load_questions(self) -> None:
-        await self.collection.add_questions(self.question_index._retrieve_questions(self.domains))
+    async def load_questions(self) -> dict:
+        return await self.collection.add_questions(self.question_index._retrieve_questions(self.domains))
 
     async def validate_loaded_data(self) -> bool:
-        index = self.question_index._get_filename_index(self.domains)
-        index = self.question_index._read_json_file(self.question_index.transformed_questions_index_path+index)
+        index = self.question_index._get_question_nros(self.domains)
 
-        for nro in tqdm.tqdm(index):
-            question = await self.collection.get_question(nro)
-            if question is None:
-                logger.info(f"Question {nro} not found in database.")
-                return False
-        return True
+        return report_key_diff('Question', expected=set(index), existing=await self.collection.get_question_nros())
\ No newline at end of file
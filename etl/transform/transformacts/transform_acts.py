@@ -38,24 +38,10 @@ class TransformActs():
         
 
     def _get_raw_index_acts(self) -> list[int]:
-
-        raw_index_file_name = self.raw_acts_index._get_filename_index()
-        raw_index_file_path = self.raw_acts_index.tree_acts_index_path + raw_index_file_name
-
-        if os.path.exists(raw_index_file_path):
-            return self.raw_acts_index._read_json_file(raw_index_file_path)
-        else:
-            return []
+        return self.raw_acts_index._get_act_nros()
 
     def _get_transformed_index_acts(self) -> list[int]:
-
-        transformed_index_file_name = self.transformed_acts_index._get_filename_index()
-        transformed_index_file_path = self.transformed_acts_index.leaf_node_acts_index_path + transformed_index_file_name
-
-        if os.path.exists(transformed_index_file_path):
-                return self.transformed_acts_index._read_json_file(transformed_index_file_path)
-        else:
-            return []
+        return self.transformed_acts_index._get_act_nros()
 
     def _find_not_indexed_in_questions_acts(self) -> list[int]:
         '''
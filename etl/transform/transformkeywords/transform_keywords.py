@@ -16,22 +16,10 @@ class TransformKeywords():
         self.tree_index = TreeActIndex()
     
     def _get_raw_index_keywords(self) -> list[dict]:
-        raw_index_file_name = self.raw_index._get_filename_index()
-        raw_index_file_path = self.raw_index.raw_keyword_index_path+raw_index_file_name
-
-        if os.path.exists(raw_index_file_path):
-            return self.raw_index._read_json_file(raw_index_file_path)
-        else:
-            return []
+        return self.raw_index._get_keywords()
 
     def _get_transformed_index_keywords(self) -> list[dict]:
-        transformed_index_file_name = self.transformed_index._get_filename_index()
-        transformed_index_file_path = self.transformed_index.transformed_keyword_index_path+transformed_index_file_name
-
-        if os.path.exists(transformed_index_file_path):
-            return self.transformed_index._read_json_file(transformed_index_file_path)
-        else:
-            return []
+        return self.transformed_index._get_keywords()
         
     def _find_not_indexed_keywords(self) -> list[dict]:
         
@@ -2,13 +2,11 @@ import os
 import json
 import dotenv
 import asyncio
-import aiohttp
 import logging
 import datetime
 
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
-
 from sessionmanager.session_manager import SessionManager
+from httpclient.http_client import HttpClient, get_http_client
 from etl.common.questionindex.transformed_question_index import TransformedQuestionIndex
 from etl.common.questionindex.raw_question_index import RawQuestionIndex
 from models.datamodels.question import Question
@@ -18,15 +16,13 @@ dotenv.load_dotenv()
 
 UNITS_BASE_URL= os.getenv('UNITS_BASE_URL')
 
-MAX_RETRIES = 3
-RETRY_WAIT_SECONDS = 2
-
 class TransformQuestions():
     '''
     Class for transforming raw question data.
     '''
     def __init__(self , sessionManager: SessionManager):
         self.sessionManager = sessionManager
+        self.http_client: HttpClient = get_http_client()
 
         self.transformed_index = TransformedQuestionIndex()
         self.raw_index = RawQuestionIndex()
@@ -53,17 +49,15 @@ class TransformQuestions():
         '''
         Given a list of question nros to transform, retrieve them from the raw data, transform them and save them.
         '''
-        raw_filename = self.raw_index._get_filename_data(domains=domains)
-        raw_questions = self.raw_index._read_json_file(self.raw_questions_data_path+raw_filename)
-        questions_to_transform = [raw_questions['questions'][nro] for nro in question_nros]
+        wanted_nros = set(question_nros)
+        raw_questions = {}
+        for question in self.raw_index._iter_questions(domains=domains):
+            if str(question['nro']) in wanted_nros:
+                raw_questions[str(question['nro'])] = question
 
-        return [Question(**question) for question in questions_to_transform]
+        return [Question(**raw_questions[nro]) for nro in question_nros]
     
 
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type(asyncio.TimeoutError)))
     async def _is_parsable(self, nro: int) -> bool:
         '''
         Returns True if the act is parsable, False otherwise.
@@ -71,18 +65,20 @@ class TransformQuestions():
         date = str(datetime.datetime.now()).split()[0]
         request_url = f'{UNITS_BASE_URL}?nro={nro}&pointInTime={date}'
 
-        async with aiohttp.ClientSession(headers=self.sessionManager.get_headers(), cookies=self.sessionManager.get_cookies(), connector=aiohttp.TCPConnector(ssl=False)) as session:
-            try:
-                response = await session.get(request_url)
-            except asyncio.TimeoutError:
-                logging.warning(f"Request for parsability timed out. Continuing with the next request.")
-                return False
-            data = await response.json()
-
-            if 'units' not in data.keys():
-                return False
-            else:
-                return True
+        try:
+            response = await self.http_client.get(request_url, session=self.sessionManager)
+        except asyncio.TimeoutError:
+            logging.warning(f"Request for parsability timed out. Continuing with the next request.")
+            return False
+        except Exception as e:
+            logging.warning(f"Request for parsability of act {nro} failed: {e}")
+            return False
+        data = response.json()
+
+        if 'units' not in data.keys():
+            return False
+        else:
+            return True
         
     async def transform_questions(self, question_nros: list[str], domains: list[dict] = None) -> list[Question]:
 
@@ -99,18 +95,13 @@ class TransformQuestions():
         unparsable = set()
 
         related_acts = list(set([relatedAct.nro for question in questions_to_transform for relatedAct in question.relatedActs]))
-        related_acts = [related_acts[i:i + 25] for i in range(0, len(related_acts), 25)]
         
-        tasks = [[self._is_parsable(nro) for nro in sublist] for sublist in related_acts]
-
-        for n , task in enumerate(tasks):
-            results = await asyncio.gather(*task)
-            for result, nro in zip(results, related_acts[n]):
-                if nro not in parsable and nro not in unparsable:
-                    if result:
-                        parsable.add(nro)
-                    else:
-                        unparsable.add(nro)
+        results = await asyncio.gather(*[self._is_parsable(nro) for nro in related_acts])
+        for result, nro in zip(results, related_acts):
+            if result:
+                parsable.add(nro)
+            else:
+                unparsable.add(nro)
 
         transformed_questions = []
         for question in questions_to_transform:
@@ -68,16 +68,10 @@ class Validate():
             
         logging.info(f'Number of unique keywords in keywords folder: {len(keywords_keyword_ids)}')
 
-        keywords_index_folder_path = self.raw_keyword_index.raw_keyword_index_path
-        keywords_index_file_path = keywords_index_folder_path + self.raw_keyword_index._get_filename_index()
-
         keywords_index_keyword_ids = set()
 
-        with open(keywords_index_file_path, 'r') as f:
-            keywords_index_data = json.load(f)
-
-            for keyword in keywords_index_data:
-                keywords_index_keyword_ids.add((keyword['conceptId'], keyword['instanceOfType']))
+        for keyword in self.raw_keyword_index._get_keywords():
+            keywords_index_keyword_ids.add((keyword['conceptId'], keyword['instanceOfType']))
         
         logging.info(f'Number of unique keywords in keywords index: {len(keywords_index_keyword_ids)}')
 
@@ -307,13 +301,7 @@ class Validate():
                 questions_acts_nros.add(act['nro'])
         
         transformed_acts_index = LeafNodeActIndex()
-        transformed_acts_file_name = transformed_acts_index._get_filename_index()
-        transformed_acts_index_path = transformed_acts_index.leaf_node_acts_index_path + transformed_acts_file_name
-
-        with open(transformed_acts_index_path, 'r') as f:
-            transformed_acts_index_data = json.load(f)
-        
-        transformed_acts_nros = set(transformed_acts_index_data)
+        transformed_acts_nros = set(transformed_acts_index._get_act_nros())
 
         if questions_acts_nros.difference(transformed_acts_nros) != set():
             return False , len(questions)
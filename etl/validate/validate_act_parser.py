@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import time
+import dotenv
+import logging
+import argparse
+
+from yarl import URL
+
+from httpclient.http_client import config as http_config
+from httpclient.response_cache import ResponseCache
+from models.datamodels.tree_act import TreeAct
+from etl.extract.extractacts.act_parser import ActParser
+from etl.validate.legacy_act_parser import LegacyActParser
+
+dotenv.load_dotenv()
+GET_ACT_BASE_URL = os.getenv('GET_ACT_BASE_URL')
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s' , force=True)
+
+
+class ValidateActParser():
+    '''
+    Golden-output check of ActParser against LegacyActParser.
+    Every act response recorded in the HTTP response cache is parsed by both and the dumped TreeActs must be equal.
+    '''
+
+    def __init__(self, features: str = 'html.parser', cache_path: str = None):
+        self.legacy_parser = LegacyActParser()
+        self.parser = ActParser(features=features)
+        self.cache = ResponseCache(**{**http_config['response_cache'], 'path': cache_path or http_config['response_cache']['path']})
+
+    def _recorded_acts(self):
+        '''
+        Yield (nro, content) for every recorded act response.
+        '''
+        base_url = str(URL(GET_ACT_BASE_URL).with_query(None))
+        for entry in self.cache.iter_entries():
+            url = URL(entry.url)
+            if str(url.with_query(None)) != base_url or entry.status != 200:
+                continue
+            yield int(url.query['nro']), entry.body.decode(entry.encoding)
+
+    def _make_data(self, content: str) -> dict:
+        '''
+        Build the act dict the same way ExtractActs.get_act does, without fetching keywords.
+        '''
+        data = json.loads(content)
+        data.setdefault('actLawType', None)
+        data.setdefault('title', None)
+        data.setdefault('shortQuote', None)
+        data['keywords'] = []
+        data['elements'] = {}
+        data['citeLink'] = ''
+        return data
+
+    def _parse(self, parser, content: str) -> tuple[dict, float]:
+        data = self._make_data(content)
+        start = time.perf_counter()
+        tree_act = parser.parse_single_act(html_content=content, tree_act=TreeAct(**data), data=data)
+        elapsed = time.perf_counter() - start
+        return (tree_act.model_dump() if tree_act is not None else None), elapsed
+
+    def _describe_mismatch(self, expected: dict, actual: dict) -> str:
+        if expected is None or actual is None:
+            return f"expected {'nothing' if expected is None else 'an act'}, got {'nothing' if actual is None else 'an act'}"
+        for field in expected:
+            if field != 'elements' and expected[field] != actual.get(field):
+                return f"field {field} differs"
+        for unit_id in expected['elements']:
+            if unit_id not in actual['elements']:
+                return f"unit {unit_id} missing"
+            for field, value in expected['elements'][unit_id].items():
+                if value != actual['elements'][unit_id][field]:
+                    return f"unit {unit_id} field {field} differs"
+        return f"{len(actual['elements']) - len(expected['elements'])} extra units"
+
+    def validate(self, limit: int = None) -> tuple[int, list[int]]:
+        '''
+        Compare both parsers on the recorded acts and return the number of acts checked and the nros whose output differs.
+        '''
+        mismatches = []
+        checked = 0
+        legacy_seconds = 0.0
+        seconds = 0.0
+
+        for nro, content in self._recorded_acts():
+            if limit is not None and checked >= limit:
+                break
+            expected, legacy_elapsed = self._parse(self.legacy_parser, content)
+            actual, elapsed = self._parse(self.parser, content)
+            legacy_seconds += legacy_elapsed
+            seconds += elapsed
+            checked += 1
+
+            if expected != actual:
+                mismatches.append(nro)
+                logging.warning(f'Act {nro}: {self._describe_mismatch(expected, actual)}')
+
+        if checked == 0:
+            logging.error(f'No recorded act responses found in {self.cache.path}')
+            return checked, mismatches
+
+        logging.info(f'Checked {checked} acts with {self.parser.features}, {checked - len(mismatches)} identical, {len(mismatches)} different')
+        logging.info(f'Legacy parser: {legacy_seconds:.2f}s, single-pass parser: {seconds:.2f}s, speedup {legacy_seconds / max(seconds, 1e-9):.1f}x')
+        return checked, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check ActParser output against the legacy parser on recorded acts.')
+    parser.add_argument('--features', choices=ActParser.SUPPORTED_FEATURES, default='html.parser')
+    parser.add_argument('--cache-path', default=None)
+    parser.add_argument('--limit', type=int, default=None)
+    args = parser.parse_args()
+
+    checked, mismatches = ValidateActParser(features=args.features, cache_path=args.cache_path).validate(limit=args.limit)
+    #Nothing checked is a failure too, a wrong cache path must not pass as a clean run
+    sys.exit(1 if mismatches or checked == 0 else 0)
+
+
+if __name__ == '__main__':
+    main()
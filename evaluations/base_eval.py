@@ -1,12 +1,11 @@
 import tqdm
-import torch
 import random
 import logging
 
-from sentence_transformers import SentenceTransformer
 from typing import List
 
 
+from modelregistry.model_registry import ModelRegistry
 from qdrantdb.collections.qdrant_question_collection import QdrantQuestionCollection
 from qdrantdb.collections.qdrant_act_collection import QdrantActCollection
 from etl.common.questionindex.transformed_question_index import TransformedQuestionIndex
@@ -19,9 +18,7 @@ logger = logging.getLogger(__name__)
 
 
 async def get_model():
-    model = SentenceTransformer("sdadas/mmlw-retrieval-roberta-large")
-    model = model.to("cuda" if torch.cuda.is_available() else "cpu")
-    return model
+    return ModelRegistry().get_model()
 
 class BaseEval:
     def __init__(self) -> None:
@@ -89,7 +86,7 @@ class BaseEval:
             results_cite_ids = set()
 
             for cite_vector in acts:
-                cite_vector = ActVector(**cite_vector.payload)
+                cite_vector = ActVectorPayload(**cite_vector.payload)
                 for node_id in cite_vector.node_ids:
                     results_cite_ids.add((cite_vector.act_nro, node_id))
 
@@ -166,7 +163,7 @@ class BaseEval:
             second_results_cite_ids = set()
 
             for cite_vector in second_results:
-                cite_vector = ActVector(**cite_vector.payload)
+                cite_vector = ActVectorPayload(**cite_vector.payload)
                 for node_id in cite_vector.node_ids:
                     second_results_cite_ids.add((cite_vector.act_nro, node_id))
                 
@@ -0,0 +1,67 @@
+import time
+import asyncio
+
+
+class AdaptiveLimiter:
+    '''
+    AIMD concurrency limit for one upstream host. Every successful response grows the limit by 1/limit,
+    about one extra slot per round of requests, and an overload signal (a retryable status, a timeout or a
+    latency spike) multiplies it by decrease_factor. Decreases are applied at most once per
+    min_decrease_interval_seconds, or per baseline latency if that is longer, so one burst of failures only halves the limit once.
+
+    Latency baselines are smoothed per endpoint and updated by every successful response, slow ones included,
+    so small and large responses of one host are not compared against each other and a lasting latency change
+    becomes the new baseline after a few responses instead of pinning the limit at min.
+    '''
+
+    def __init__(self, initial: int, min: int, max: int, decrease_factor: float, latency_spike_factor: float, latency_smoothing: float,
+                 min_decrease_interval_seconds: float = 1.0) -> None:
+        self.limit = float(initial)
+        self.min_limit = min
+        self.max_limit = max
+        self.decrease_factor = decrease_factor
+        self.latency_spike_factor = latency_spike_factor
+        self.latency_smoothing = latency_smoothing
+        self.min_decrease_interval_seconds = min_decrease_interval_seconds
+
+        self.in_flight = 0
+        self.baseline_latencies: dict[str, float] = {}
+        self.last_decrease = 0.0
+        self.condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    def _update_baseline(self, endpoint: str, latency: float) -> float | None:
+        '''
+        Fold latency into the baseline of the endpoint and return the baseline it had before.
+        '''
+        baseline = self.baseline_latencies.get(endpoint)
+        if baseline is None:
+            self.baseline_latencies[endpoint] = latency
+        else:
+            self.baseline_latencies[endpoint] = baseline + self.latency_smoothing * (latency - baseline)
+        return baseline
+
+    def _decrease(self, endpoint: str = None) -> None:
+        now = time.monotonic()
+        interval = max(self.min_decrease_interval_seconds, self.baseline_latencies.get(endpoint) or 0)
+        if now - self.last_decrease >= interval:
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            self.last_decrease = now
+
+    async def release(self, latency: float = None, overloaded: bool = False, endpoint: str = None) -> None:
+        if overloaded:
+            self._decrease(endpoint)
+        elif latency is not None:
+            baseline = self._update_baseline(endpoint, latency)
+            if baseline is not None and latency > baseline * self.latency_spike_factor:
+                self._decrease(endpoint)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
@@ -0,0 +1,264 @@
+import json
+import time
+import asyncio
+import logging
+import aiohttp
+
+from yarl import URL
+from tenacity import AsyncRetrying, stop_after_attempt, wait_random_exponential, retry_if_exception
+
+from httpclient.token_bucket import TokenBucket
+from httpclient.adaptive_limiter import AdaptiveLimiter
+from httpclient.response_cache import ResponseCache
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+with open('httpclient/config.json') as f:
+    config = json.load(f)
+
+
+class RetryableStatusError(Exception):
+    """Raised for responses with a status worth retrying (rate limited or upstream error)."""
+    def __init__(self, status: int, url: str, retry_after: float = None) -> None:
+        super().__init__(f"HTTP {status} for URL: {url}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class HttpStatusError(Exception):
+    """Raised by HttpResponse.raise_for_status for non-2xx responses."""
+    def __init__(self, status: int, url: str) -> None:
+        super().__init__(f"HTTP {status} for URL: {url}")
+        self.status = status
+
+
+class HttpResponse:
+    '''
+    Fully read response, so it can be retried, cached and parsed after the connection is released.
+    latency is the network time of the attempt that returned it, without rate limit waits and earlier retries,
+    None for responses served from the cache.
+    '''
+    def __init__(self, status: int, url: str, body: bytes, encoding: str = 'utf-8', latency: float = None) -> None:
+        self.status = status
+        self.url = url
+        self.body = body
+        self.encoding = encoding
+        self.latency = latency
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.body)
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise HttpStatusError(self.status, self.url)
+
+
+def is_retryable(exception: BaseException) -> bool:
+    return isinstance(exception, (RetryableStatusError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError))
+
+
+def _parse_retry_after(value: str) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    def __init__(self, host: str) -> None:
+        rate_limit = config['rate_limit']['hosts'].get(host, config['rate_limit']['default'])
+        self.bucket = TokenBucket(rate_limit['rate_per_second'], rate_limit['burst'])
+        self.limiter = AdaptiveLimiter(**config['concurrency'])
+        self.metrics = {
+            'requests': 0,
+            'retries': 0,
+            'failures': 0,
+            'relogins': 0,
+            'statuses': {},
+            'latency_seconds_total': 0.0,
+            'throttled_seconds_total': 0.0
+        }
+
+    def get_metrics(self) -> dict:
+        completed = sum(self.metrics['statuses'].values())
+        return {
+            **self.metrics,
+            'average_latency_seconds': round(self.metrics['latency_seconds_total'] / completed, 4) if completed else None,
+            'concurrency_limit': round(self.limiter.limit, 2),
+            'in_flight': self.limiter.in_flight
+        }
+
+
+class HttpClient:
+    '''
+    One pooled aiohttp session shared by all extractors. Each upstream host gets a token bucket rate limit
+    and an AIMD concurrency limit, so callers can start as many requests as they like and the client
+    runs them as fast as the host allows. Connection errors, timeouts and retryable statuses are retried
+    with jittered exponential backoff, honouring Retry-After.
+
+    Cookies are sent as a header on every request instead of living in a shared cookie jar, so
+    responses can not overwrite the session cookies of other callers. Requests given a session
+    (SessionManager or SessionPool) take their cookies and headers from it, and a rejected session
+    (auth_failure_statuses) is logged in again and the request repeated once.
+
+    With the response cache enabled, recorded responses are served without touching the network or the
+    rate limits, which makes re-parsing and offline replay of a previous crawl possible.
+    '''
+
+    def __init__(self) -> None:
+        self.session: aiohttp.ClientSession = None
+        self.hosts: dict[str, HostState] = {}
+        self.retry_statuses = set(config['retry']['statuses'])
+        self.auth_failure_statuses = set(config['auth_failure_statuses'])
+        self.cache = ResponseCache(**config['response_cache'])
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**config['connector']),
+                timeout=aiohttp.ClientTimeout(total=config['timeout_seconds']),
+                cookie_jar=aiohttp.DummyCookieJar()
+            )
+        return self.session
+
+    def _get_host(self, url: str) -> HostState:
+        host = URL(url).host
+        if host not in self.hosts:
+            self.hosts[host] = HostState(host)
+        return self.hosts[host]
+
+    def _wait(self, retry_state) -> float:
+        backoff = wait_random_exponential(multiplier=config['retry']['multiplier_seconds'], max=config['retry']['max_seconds'])(retry_state)
+        exception = retry_state.outcome.exception()
+        retry_after = getattr(exception, 'retry_after', None)
+        return max(backoff, retry_after or 0)
+
+    async def _send(self, host: HostState, method: str, url: str, headers: dict, json_payload) -> HttpResponse:
+        host.metrics['throttled_seconds_total'] += await host.bucket.acquire()
+        await host.limiter.acquire()
+
+        start = time.monotonic()
+        try:
+            async with self._get_session().request(method, url, headers=headers, json=json_payload) as response:
+                body = await response.read()
+                status = response.status
+                encoding = response.charset or 'utf-8'
+                retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            host.metrics['failures'] += 1
+            await host.limiter.release(overloaded=True)
+            raise
+        except BaseException:
+            await host.limiter.release()
+            raise
+
+        latency = time.monotonic() - start
+        host.metrics['latency_seconds_total'] += latency
+        host.metrics['statuses'][status] = host.metrics['statuses'].get(status, 0) + 1
+
+        if status in self.retry_statuses:
+            await host.limiter.release(overloaded=True)
+            raise RetryableStatusError(status, url, retry_after)
+
+        await host.limiter.release(latency=latency, endpoint=f"{method} {URL(url).path}")
+        return HttpResponse(status, url, body, encoding, latency)
+
+    def _build_headers(self, headers: dict, cookies: dict) -> dict:
+        headers = dict(headers or {})
+        if cookies:
+            headers['Cookie'] = '; '.join(f"{name}={value}" for name, value in cookies.items())
+        return headers
+
+    async def _send_with_retries(self, host: HostState, method: str, url: str, headers: dict, json_payload) -> HttpResponse:
+        attempt_number = 0
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(config['retry']['max_attempts']),
+            wait=self._wait,
+            retry=retry_if_exception(is_retryable),
+            reraise=True):
+            with attempt:
+                attempt_number += 1
+                if attempt_number > 1:
+                    host.metrics['retries'] += 1
+                response = await self._send(host, method, url, headers, json_payload)
+        return response
+
+    async def request(self, method: str, url: str, headers: dict = None, cookies: dict = None, json_payload=None, session=None) -> HttpResponse:
+        '''
+        Send a request and return the read response. Raises the last error once retries are exhausted,
+        non-retryable statuses are returned to the caller.
+        With a session its cookies and headers are sent, extended by headers, and the session is renewed once if rejected.
+        An error of the renewal, such as a failed login, is raised to the caller.
+        '''
+        cache_key = None
+        if self.cache.enabled:
+            cache_key = self.cache.key(method, url, json_payload)
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                return HttpResponse(cached.status, cached.url, cached.body, cached.encoding)
+
+        host = self._get_host(url)
+        host.metrics['requests'] += 1
+
+        if session is None:
+            response = await self._send_with_retries(host, method, url, self._build_headers(headers, cookies), json_payload)
+        else:
+            for relogin in (False, True):
+                auth = session.acquire()
+                generation = auth.generation
+                request_headers = self._build_headers({**auth.get_headers(), **(headers or {})}, auth.get_cookies())
+                response = await self._send_with_retries(host, method, url, request_headers, json_payload)
+
+                if response.status not in self.auth_failure_statuses or relogin:
+                    break
+                host.metrics['relogins'] += 1
+                await auth.relogin(generation)
+
+        if cache_key is not None:
+            await asyncio.to_thread(self.cache.put, cache_key, response.status, response.url, response.encoding, response.body)
+        return response
+
+    async def get(self, url: str, headers: dict = None, cookies: dict = None, session=None) -> HttpResponse:
+        return await self.request('GET', url, headers=headers, cookies=cookies, session=session)
+
+    async def post(self, url: str, json_payload=None, headers: dict = None, cookies: dict = None, session=None) -> HttpResponse:
+        return await self.request('POST', url, headers=headers, cookies=cookies, json_payload=json_payload, session=session)
+
+    def get_metrics(self) -> dict:
+        return {host: state.get_metrics() for host, state in self.hosts.items()}
+
+    def log_metrics(self) -> None:
+        if self.cache.enabled:
+            logger.info(f"HTTP response cache: {self.cache.get_metrics()}")
+        for host, metrics in self.get_metrics().items():
+            logger.info(f"HTTP {host}: {metrics['requests']} requests, {metrics['retries']} retries, {metrics['failures']} connection failures, {metrics['relogins']} relogins, "
+                        f"statuses {metrics['statuses']}, average latency {metrics['average_latency_seconds']}s, "
+                        f"throttled {metrics['throttled_seconds_total']:.1f}s, concurrency limit {metrics['concurrency_limit']}")
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+_client: HttpClient = None
+
+
+def get_http_client() -> HttpClient:
+    '''
+    Return the process-wide HTTP client, creating it on first use.
+    '''
+    global _client
+    if _client is None:
+        _client = HttpClient()
+    return _client
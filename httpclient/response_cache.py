@@ -0,0 +1,133 @@
+import os
+import json
+import gzip
+import time
+import hashlib
+import threading
+
+from typing import Iterator
+
+from yarl import URL
+
+
+OFF = 'off'
+READ_WRITE = 'read_write'
+REFRESH = 'refresh'
+OFFLINE = 'offline'
+MODES = {OFF, READ_WRITE, REFRESH, OFFLINE}
+
+
+class OfflineCacheMissError(Exception):
+    """Raised in offline mode for a request that has no recorded response."""
+    pass
+
+
+class CachedResponse:
+    def __init__(self, status: int, url: str, encoding: str, stored_at: float, body: bytes) -> None:
+        self.status = status
+        self.url = url
+        self.encoding = encoding
+        self.stored_at = stored_at
+        self.body = body
+
+
+class ResponseCache:
+    '''
+    On-disk gzip cache of HTTP responses keyed by sha256 of method, URL and JSON payload.
+    Fields listed in ignore_fields (e.g. pointInTime) are dropped from the query string and the payload
+    before hashing, so recordings stay valid on later days.
+
+    Modes: off, read_write (serve fresh entries, fetch and store the rest), refresh (always fetch and store)
+    and offline (serve every recorded entry regardless of age, a miss raises OfflineCacheMissError).
+    '''
+
+    def __init__(self, path: str, mode: str, ttl_seconds: float, ignore_fields: list[str], statuses: list[int]) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown response cache mode {mode}, expected one of {sorted(MODES)}")
+        self.path = path
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.ignore_fields = set(ignore_fields)
+        self.statuses = set(statuses)
+        self.metrics = {'hits': 0, 'misses': 0, 'stale': 0, 'stores': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != OFF
+
+    def key(self, method: str, url: str, json_payload=None) -> str:
+        url = URL(url)
+        query = sorted((name, value) for name, value in url.query.items() if name not in self.ignore_fields)
+        if isinstance(json_payload, dict):
+            json_payload = {name: value for name, value in json_payload.items() if name not in self.ignore_fields}
+
+        canonical = json.dumps({
+            'method': method.upper(),
+            'url': str(url.with_query(None)),
+            'query': query,
+            'payload': json_payload
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key + '.gz')
+
+    def get(self, key: str) -> CachedResponse | None:
+        '''
+        Return the recorded response for key if the mode allows serving it.
+        '''
+        if self.mode in (OFF, REFRESH):
+            return None
+
+        file_path = self._file_path(key)
+        if not os.path.exists(file_path):
+            self.metrics['misses'] += 1
+            if self.mode == OFFLINE:
+                raise OfflineCacheMissError(f"No recorded response for request {key}")
+            return None
+
+        with gzip.open(file_path, 'rb') as f:
+            header, body = f.read().split(b'\n', 1)
+        header = json.loads(header)
+
+        if self.mode == READ_WRITE and time.time() - header['stored_at'] > self.ttl_seconds:
+            self.metrics['stale'] += 1
+            return None
+
+        self.metrics['hits'] += 1
+        return CachedResponse(header['status'], header['url'], header['encoding'], header['stored_at'], body)
+
+    def put(self, key: str, status: int, url: str, encoding: str, body: bytes) -> None:
+        if self.mode not in (READ_WRITE, REFRESH) or status not in self.statuses:
+            return
+
+        file_path = self._file_path(key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        header = json.dumps({'status': status, 'url': url, 'encoding': encoding, 'stored_at': time.time()}).encode('utf-8')
+
+        tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wb') as f:
+            f.write(header + b'\n' + body)
+        os.replace(tmp_path, file_path)
+        self.metrics['stores'] += 1
+
+    def iter_entries(self) -> Iterator[CachedResponse]:
+        '''
+        Yield every recorded response regardless of mode and age, e.g. to re-parse a previous crawl.
+        '''
+        if not os.path.isdir(self.path):
+            return
+        for prefix in sorted(os.listdir(self.path)):
+            prefix_path = os.path.join(self.path, prefix)
+            if not os.path.isdir(prefix_path):
+                continue
+            for file_name in sorted(os.listdir(prefix_path)):
+                if not file_name.endswith('.gz'):
+                    continue
+                with gzip.open(os.path.join(prefix_path, file_name), 'rb') as f:
+                    header, body = f.read().split(b'\n', 1)
+                header = json.loads(header)
+                yield CachedResponse(header['status'], header['url'], header['encoding'], header['stored_at'], body)
+
+    def get_metrics(self) -> dict:
+        return {'mode': self.mode, **self.metrics}
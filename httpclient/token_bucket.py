@@ -0,0 +1,36 @@
+import time
+import asyncio
+
+
+class TokenBucket:
+    '''
+    Allows rate_per_second requests on average with bursts of up to burst requests.
+    '''
+
+    def __init__(self, rate_per_second: float, burst: int) -> None:
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+
+    async def acquire(self) -> float:
+        '''
+        Wait for a token and return the seconds spent waiting.
+        '''
+        waited = 0.0
+        #The lock keeps waiters in FIFO order so a burst of callers is spread evenly
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate_per_second
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.tokens -= 1
+        return waited
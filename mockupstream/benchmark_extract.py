@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import statistics
+
+from etl.common.index_store import get_index_store
+from mockupstream.mock_server import MockUpstream
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BENCHMARK_RATE_PER_SECOND = 10000
+
+
+class MockSession:
+    '''
+    In-process stand-in for SessionManager, logs in against the mock server without a browser.
+    '''
+
+    def __init__(self, server: MockUpstream) -> None:
+        self.server = server
+        self.generation = 0
+        self.relogin_lock = asyncio.Lock()
+        self._login()
+
+    def _login(self) -> None:
+        self.cookies = self.server.issue_session()
+        self.headers = {'X-XSRF-TOKEN': self.cookies['XSRF-TOKEN']}
+        self.generation += 1
+
+    async def relogin(self, generation: int) -> None:
+        async with self.relogin_lock:
+            if self.generation == generation:
+                self._login()
+
+    def acquire(self) -> 'MockSession':
+        return self
+
+    def get_cookies(self) -> dict:
+        return self.cookies
+
+    def get_headers(self) -> dict:
+        return self.headers
+
+
+def _redirect_index_paths(extractor, root: str) -> None:
+    '''
+    Point the index store and the index and data directories of every index the extractor holds into root,
+    so benchmark runs start empty and never touch data/.
+    '''
+    for index in vars(extractor).values():
+        if not hasattr(index, 'config'):
+            continue
+        for name, value in vars(index).items():
+            if name.endswith('_path') and isinstance(value, str):
+                path = os.path.join(root, value)
+                os.makedirs(path, exist_ok=True)
+                setattr(index, name, path)
+        if hasattr(index, 'index_store'):
+            index.index_store = get_index_store(os.path.join(root, index.config['index_store']))
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+class ExtractBenchmark:
+    '''
+    Run the act, keyword and question extractors against the mock upstream and report
+    requests/sec and bytes/sec of every stage, plus the parse time per act.
+    '''
+
+    def __init__(self, server: MockUpstream, root: str, acts: int = None, keywords: int = None) -> None:
+        self.server = server
+        self.root = root
+        self.session = MockSession(server)
+        self.act_nros = server.data.act_nros[:acts]
+        self.keywords = [server.data.get_keyword(keyword_id) for keyword_id in server.data.keyword_ids[:keywords]]
+        self.results = {}
+
+    async def _run_stage(self, name: str, stage) -> None:
+        before = self.server.get_metrics()
+        start = time.perf_counter()
+        await stage
+        elapsed = time.perf_counter() - start
+        after = self.server.get_metrics()
+
+        requests = after['requests'] - before['requests']
+        bytes_sent = after['bytes_sent'] - before['bytes_sent']
+        self.results[name] = {
+            'seconds': round(elapsed, 2),
+            'requests': requests,
+            'requests_per_second': round(requests / elapsed, 1),
+            'megabytes_per_second': round(bytes_sent / elapsed / 2**20, 2),
+            'injected_errors': after['injected_errors'] - before['injected_errors'],
+            'injected_auth_failures': after['injected_auth_failures'] - before['injected_auth_failures']
+        }
+        logger.info(f"{name}: {self.results[name]}")
+
+    def _measure_parse_time(self, samples: int) -> None:
+        from models.datamodels.tree_act import TreeAct
+        from etl.extract.extractacts.act_parser import ActParser
+
+        parser = ActParser()
+        timings = []
+        for nro in self.act_nros[:samples]:
+            data = self.server.data.get_act(nro)
+            content = json.dumps(data)
+            data.update({'keywords': [], 'elements': {}, 'citeLink': None})
+
+            start = time.perf_counter()
+            parser.parse_single_act(html_content=content, tree_act=TreeAct(**data), data=data)
+            timings.append(time.perf_counter() - start)
+
+        self.results['parse_act'] = {
+            'acts': len(timings),
+            'mean_ms': round(statistics.mean(timings) * 1000, 2),
+            'p95_ms': round(_percentile(timings, 0.95) * 1000, 2)
+        }
+        logger.info(f"parse_act: {self.results['parse_act']}")
+
+    async def run(self, parse_samples: int) -> dict:
+        #The extractors read their URLs when imported, so they are imported once the mock environment is set
+        from httpclient.http_client import get_http_client
+        from etl.extract.parser_pool import get_parser_pool
+        from etl.extract.extractacts.extract_acts import ExtractActs
+        from etl.extract.extractkeywords.extract_keywords import ExtractKeywords
+        from etl.extract.extractquestions.extract_questions_domain import ExtractQuestionsDomain
+
+        extract_questions = ExtractQuestionsDomain(self.session)
+        extract_acts = ExtractActs(self.session)
+        extract_keywords = ExtractKeywords(self.session)
+        for extractor in (extract_questions, extract_acts, extract_keywords):
+            _redirect_index_paths(extractor, self.root)
+
+        try:
+            await self._run_stage('questions', extract_questions.get_all_questions(domains=None))
+            await self._run_stage('acts', extract_acts.get_acts(act_nros=self.act_nros))
+            await self._run_stage('keywords', extract_keywords.get_keywords(keywords=self.keywords))
+        finally:
+            get_http_client().log_metrics()
+            get_parser_pool().log_metrics()
+            await get_http_client().close()
+            await get_parser_pool().close()
+
+        self._measure_parse_time(parse_samples)
+        return self.results
+
+
+async def main(args) -> None:
+    server = MockUpstream(port=args.port, error_rate=args.error_rate, auth_failure_rate=args.auth_failure_rate, recorded_cache_path=args.recorded_cache_path)
+    await server.start()
+    os.environ.update(server.get_env())
+
+    from httpclient.http_client import config as http_config
+    http_config['response_cache']['mode'] = 'off'
+    http_config['rate_limit']['hosts'][server.host] = {'rate_per_second': BENCHMARK_RATE_PER_SECOND, 'burst': BENCHMARK_RATE_PER_SECOND}
+
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            results = await ExtractBenchmark(server, root, acts=args.acts, keywords=args.keywords).run(args.parse_samples)
+    finally:
+        await server.stop()
+
+    for name, result in results.items():
+        print(f"{name}: {result}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the extractors against the mock upstream server.')
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--acts', type=int, default=None, help='Number of acts to extract, all synthetic acts by default.')
+    parser.add_argument('--keywords', type=int, default=None, help='Number of keywords to extract, all synthetic keywords by default.')
+    parser.add_argument('--parse-samples', type=int, default=50)
+    parser.add_argument('--error-rate', type=float, default=None)
+    parser.add_argument('--auth-failure-rate', type=float, default=None)
+    parser.add_argument('--recorded-cache-path', default=None)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
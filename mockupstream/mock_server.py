@@ -0,0 +1,242 @@
+import json
+import uuid
+import random
+import asyncio
+import logging
+import argparse
+
+from aiohttp import web
+from yarl import URL
+
+from httpclient.response_cache import ResponseCache
+from mockupstream.synthetic_data import SyntheticData
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+with open('mockupstream/config.json') as f:
+    config = json.load(f)
+
+LINK_PREFIX = '/akty/'
+LINK_TO_AVOID = '/archiwum/'
+PUBLIC_PATHS = {'/login', '/redirect', '/logout', '/cite'}
+
+
+class MockUpstream:
+    '''
+    Local stand-in for the legal portal, serving the act, listing, units, question, keyword and login endpoints
+    the extractors use. Data is synthetic unless recorded_cache_path points at an HTTP response cache,
+    then recorded act responses are served for the acts it holds.
+
+    Every response is delayed by latency.mean_ms +- jitter_ms. error_rate of the API requests fail with one
+    of error_statuses and auth_failure_rate of them with 401, to exercise retries and re-login.
+    '''
+
+    def __init__(self, host: str = None, port: int = None, latency: dict = None, error_rate: float = None,
+                 auth_failure_rate: float = None, recorded_cache_path: str = None) -> None:
+        self.host = host or config['host']
+        self.port = port or config['port']
+        self.latency = latency or config['latency']
+        self.error_rate = config['error_rate'] if error_rate is None else error_rate
+        self.error_statuses = config['error_statuses']
+        self.auth_failure_rate = config['auth_failure_rate'] if auth_failure_rate is None else auth_failure_rate
+        self.per_page = config['listing_per_page']
+
+        self.data = SyntheticData(**config['synthetic'])
+        self.recorded_acts = self._load_recorded_acts(recorded_cache_path or config['recorded_cache_path'])
+        if self.recorded_acts:
+            self.data.act_nros = sorted(self.recorded_acts)
+
+        self.sessions: set[str] = set()
+        self.rng = random.Random(config['synthetic']['seed'])
+        self.runner: web.AppRunner = None
+        self.metrics = {'requests': 0, 'bytes_sent': 0, 'injected_errors': 0, 'injected_auth_failures': 0, 'paths': {}}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _load_recorded_acts(self, path: str) -> dict[int, bytes]:
+        if path is None:
+            return {}
+        recorded = {}
+        cache = ResponseCache(path=path, mode='offline', ttl_seconds=0, ignore_fields=[], statuses=[200])
+        for entry in cache.iter_entries():
+            url = URL(entry.url)
+            if entry.status == 200 and 'nro' in url.query and entry.body.startswith(b'{'):
+                if b'"units"' in entry.body:
+                    recorded[int(url.query['nro'])] = entry.body
+        logger.info(f"Serving {len(recorded)} recorded acts from {path}")
+        return recorded
+
+    def get_env(self) -> dict[str, str]:
+        '''
+        Environment variables pointing the extractors and the session manager at this server.
+        '''
+        return {
+            'LOGIN_URL': self.base_url + '/login',
+            'LOGOUT_URL': self.base_url + '/logout',
+            'REDIRECT_URL': self.base_url + '/redirect',
+            'REFERER_URL': self.base_url + '/',
+            'GET_ACT_BASE_URL': self.base_url + '/act',
+            'GET_ACT_KEYWORDS_URL': self.base_url + '/act/keywords',
+            'UNITS_BASE_URL': self.base_url + '/units',
+            'GET_CITE_BASE_URL': self.base_url + '/cite/',
+            'GET_LINK_BASE_URL': self.base_url,
+            'GET_LINK_TO_AVOID': LINK_TO_AVOID,
+            'GET_REQUEST_URL': self.base_url + '/search',
+            'GET_QUESTION_URL': self.base_url + '/question',
+            'GET_QUESTION_ACTS_URL': self.base_url + '/question/acts',
+            'GET_QUESTION_KEYWORDS_URL': self.base_url + '/question/keywords',
+            'GET_KEYWORD_URL': self.base_url + '/keyword',
+            'DOMAINS': '[]',
+            **self.data.get_payload_templates()
+        }
+
+    def issue_session(self) -> dict[str, str]:
+        '''
+        Create a logged in session and return its cookies, what a browser login would leave behind.
+        '''
+        session_id = uuid.uuid4().hex
+        self.sessions.add(session_id)
+        return {'JSESSIONID': session_id, 'XSRF-TOKEN': uuid.uuid4().hex, '__Host-bsid': uuid.uuid4().hex}
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        self.metrics['requests'] += 1
+        path = '/' + request.path.strip('/').split('/')[0]
+        self.metrics['paths'][path] = self.metrics['paths'].get(path, 0) + 1
+
+        delay_ms = self.latency['mean_ms'] + self.rng.uniform(-1, 1) * self.latency['jitter_ms']
+        await asyncio.sleep(max(delay_ms, 0) / 1000)
+
+        if path not in PUBLIC_PATHS:
+            if request.cookies.get('JSESSIONID') not in self.sessions or self.rng.random() < self.auth_failure_rate:
+                self.metrics['injected_auth_failures'] += 1
+                self.sessions.discard(request.cookies.get('JSESSIONID'))
+                return web.json_response({'error': 'unauthorized'}, status=401)
+            if self.rng.random() < self.error_rate:
+                self.metrics['injected_errors'] += 1
+                return web.json_response({'error': 'injected'}, status=self.rng.choice(self.error_statuses), headers={'Retry-After': '0'})
+
+        response = await handler(request)
+        if response.body is not None:
+            self.metrics['bytes_sent'] += len(response.body)
+        return response
+
+    async def _login_page(self, request: web.Request) -> web.Response:
+        return web.Response(content_type='text/html', text=(
+            '<html><body><form method="post" action="/login">'
+            '<input name="login"><input name="password" type="password">'
+            '<button id="login_btn" type="submit">Zaloguj</button></form></body></html>'))
+
+    async def _login(self, request: web.Request) -> web.Response:
+        response = web.HTTPFound('/redirect')
+        for name, value in self.issue_session().items():
+            response.set_cookie(name, value)
+        raise response
+
+    async def _redirect_page(self, request: web.Request) -> web.Response:
+        return web.Response(content_type='text/html', text='<html><body><div class="result-text">Zalogowano</div></body></html>')
+
+    async def _logout(self, request: web.Request) -> web.Response:
+        self.sessions.discard(request.cookies.get('JSESSIONID'))
+        return web.Response(content_type='text/html', text='<html><body>Wylogowano</body></html>')
+
+    async def _act(self, request: web.Request) -> web.Response:
+        nro = int(request.query['nro'])
+        if nro in self.recorded_acts:
+            return web.Response(body=self.recorded_acts[nro], content_type='application/json')
+        if nro not in self.data.act_nros:
+            return web.json_response({'error': 'not found'}, status=404)
+        return web.json_response(self.data.get_act(nro))
+
+    async def _act_keywords(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        return web.json_response(self.data.get_act_keywords(payload['id']))
+
+    async def _units(self, request: web.Request) -> web.Response:
+        nro = int(request.query['nro'])
+        if nro not in self.data.act_nros:
+            return web.json_response({})
+        return web.json_response({'units': self.data.get_units(nro)})
+
+    async def _cite(self, request: web.Request) -> web.Response:
+        page = int(request.match_info['page'])
+        return web.Response(content_type='text/html', text=self.data.get_listing_page(page, self.per_page, LINK_PREFIX))
+
+    async def _search(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        return web.json_response(self.data.search_questions(payload.get('startFrom', 0), payload.get('hitsPp', 25)))
+
+    async def _question(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        return web.json_response(self.data.get_question(payload['nro']))
+
+    async def _question_acts(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        return web.json_response(self.data.get_question_acts(payload['nro']))
+
+    async def _question_keywords(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        return web.json_response(self.data.get_question_keywords(payload['id']))
+
+    async def _keyword(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        return web.json_response(self.data.get_keyword_page(payload['uiConceptId'], payload.get('startFrom', 0), payload.get('hitsPp', 25)))
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.add_routes([
+            web.get('/login', self._login_page),
+            web.post('/login', self._login),
+            web.get('/redirect', self._redirect_page),
+            web.get('/logout', self._logout),
+            web.get('/act', self._act),
+            web.post('/act/keywords', self._act_keywords),
+            web.get('/units', self._units),
+            web.get('/cite/{page}', self._cite),
+            web.post('/search', self._search),
+            web.post('/question', self._question),
+            web.post('/question/acts', self._question_acts),
+            web.post('/question/keywords', self._question_keywords),
+            web.post('/keyword', self._keyword)
+        ])
+        return app
+
+    async def start(self) -> None:
+        self.runner = web.AppRunner(self.create_app(), access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        logger.info(f"Mock upstream listening on {self.base_url}")
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def get_metrics(self) -> dict:
+        return dict(self.metrics, paths=dict(self.metrics['paths']))
+
+
+async def main(args) -> None:
+    server = MockUpstream(port=args.port, error_rate=args.error_rate, auth_failure_rate=args.auth_failure_rate, recorded_cache_path=args.recorded_cache_path)
+    await server.start()
+    for name, value in server.get_env().items():
+        print(f"{name}='{value}'")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the mock upstream server and print the environment pointing the ETL at it.')
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--error-rate', type=float, default=None)
+    parser.add_argument('--auth-failure-rate', type=float, default=None)
+    parser.add_argument('--recorded-cache-path', default=None)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
@@ -0,0 +1,144 @@
+import json
+import random
+
+
+FIRST_ACT_NRO = 16790000
+FIRST_QUESTION_NRO = 500000
+FIRST_KEYWORD_ID = 1000
+KEYWORD_INSTANCE_OF_TYPE = 7
+QUESTION_ID_OFFSET = 1000000
+ACT_ID_OFFSET = 2000000
+
+WORDS = ['ustawa', 'przepis', 'umowa', 'strona', 'sąd', 'termin', 'prawo', 'obowiązek', 'organ', 'wniosek',
+         'decyzja', 'podatek', 'zobowiązanie', 'świadczenie', 'najem', 'spadek', 'pracownik', 'pracodawca']
+
+
+class SyntheticData:
+    '''
+    Deterministic stand-in for the upstream dataset. Every act, question and keyword is generated
+    from the seed and its own number, so responses are stable across requests and runs without storing anything.
+    '''
+
+    def __init__(self, seed: int, acts: int, articles_per_act: int, paragraphs_per_article: int, questions: int,
+                 acts_per_question: int, keywords: int, keywords_per_question: int, max_keyword_hits: int) -> None:
+        self.seed = seed
+        self.act_nros = [FIRST_ACT_NRO + i for i in range(acts)]
+        self.question_nros = [FIRST_QUESTION_NRO + i for i in range(questions)]
+        self.keyword_ids = [FIRST_KEYWORD_ID + i for i in range(keywords)]
+        self.articles_per_act = articles_per_act
+        self.paragraphs_per_article = paragraphs_per_article
+        self.acts_per_question = acts_per_question
+        self.keywords_per_question = keywords_per_question
+        self.max_keyword_hits = max_keyword_hits
+
+    def _random(self, *key) -> random.Random:
+        return random.Random(f"{self.seed}:{':'.join(str(part) for part in key)}")
+
+    def _sentence(self, rng: random.Random, words: int) -> str:
+        return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+    def get_keyword(self, keyword_id: int) -> dict:
+        return {'label': f"słowo kluczowe {keyword_id}", 'conceptId': keyword_id, 'instanceOfType': KEYWORD_INSTANCE_OF_TYPE}
+
+    def get_units(self, nro: int) -> list[dict]:
+        units = []
+        for article in range(1, self.articles_per_act + 1):
+            units.append({'unitId': f"art_{article}", 'unitName': f"Art. {article}"})
+            for paragraph in range(1, self.paragraphs_per_article + 1):
+                units.append({'unitId': f"art_{article}__ust_{paragraph}", 'unitName': f"ust. {paragraph}"})
+        return units
+
+    def get_act(self, nro: int) -> dict:
+        '''
+        Act in the shape of the act endpoint: metadata, units and the html content the units refer to by div id.
+        '''
+        rng = self._random('act', nro)
+        articles = []
+        for article in range(1, self.articles_per_act + 1):
+            paragraphs = ''.join(
+                f'<div id="art_{article}__ust_{paragraph}"><span class="num">{paragraph}.</span> {self._sentence(rng, rng.randint(8, 40))}</div>'
+                for paragraph in range(1, self.paragraphs_per_article + 1))
+            articles.append(f'<div id="art_{article}"><h3>Art. {article}.</h3><div class="content">{paragraphs}</div></div>')
+
+        return {
+            'id': str(ACT_ID_OFFSET + nro),
+            'nro': nro,
+            'title': f"Ustawa nr {nro} o {rng.choice(WORDS)}",
+            'shortQuote': f"Dz.U. {rng.randint(1990, 2024)} poz. {rng.randint(1, 2000)}",
+            'actLawType': 'USTAWA',
+            'units': self.get_units(nro),
+            'content': '<div class="act">' + ''.join(articles) + '</div>'
+        }
+
+    def get_act_keywords(self, act_id: int) -> dict:
+        rng = self._random('act_keywords', act_id)
+        return {'keywords': [self.get_keyword(keyword_id) for keyword_id in rng.sample(self.keyword_ids, min(5, len(self.keyword_ids)))]}
+
+    def get_listing_page(self, page: int, per_page: int, link_prefix: str) -> str:
+        '''
+        Html of one page of the act listing, newest acts first, with the pagination block the extractor reads the total from.
+        '''
+        nros = list(reversed(self.act_nros))[(page - 1) * per_page:page * per_page]
+        links = ''.join(f'<li><a class="wk-link" href="{link_prefix}ustawa-{nro}">Ustawa {nro}</a></li>' for nro in nros)
+        pagination = f'<div class="pagination-results"><span>{len(nros)}</span><span>{len(self.act_nros)}</span><span>wyników</span></div>'
+        return f'<html><body>{pagination}<ul>{links}</ul></body></html>'
+
+    def search_questions(self, start_from: int, hits_per_page: int) -> dict:
+        page = self.question_nros[start_from:start_from + hits_per_page]
+        return {'availableHitCount': len(self.question_nros), 'documentList': [{'nro': nro} for nro in page]}
+
+    def get_question(self, nro: int) -> dict:
+        rng = self._random('question', nro)
+        return {
+            'id': QUESTION_ID_OFFSET + nro,
+            'nro': nro,
+            'title': self._sentence(rng, 6),
+            'questionContent': f'<div class="qa_q">{self._sentence(rng, 25)} <a href="#">{rng.choice(WORDS)}</a></div>',
+            'answerContent': f'<div class="qa_a-cont">{self._sentence(rng, 30)}</div><div class="qa_a-just">{self._sentence(rng, 120)}</div>'
+        }
+
+    def _act_document(self, nro: int, rng: random.Random) -> dict:
+        article = rng.randint(1, self.articles_per_act)
+        return {
+            'nro': nro,
+            'title': f"Ustawa nr {nro}",
+            'lawType': 'USTAWA',
+            'validity': 'ACTUAL',
+            'relationData': {'units': [{'nro': nro, 'id': f"art_{article}", 'name': f"Art. {article}"}]}
+        }
+
+    def get_question_acts(self, nro: int) -> dict:
+        rng = self._random('question_acts', nro)
+        act_nros = rng.sample(self.act_nros, min(self.acts_per_question, len(self.act_nros)))
+        return {'documentList': [self._act_document(act_nro, rng) for act_nro in act_nros]}
+
+    def get_question_keywords(self, question_id: int) -> dict:
+        rng = self._random('question_keywords', question_id)
+        keyword_ids = rng.sample(self.keyword_ids, min(self.keywords_per_question, len(self.keyword_ids)))
+        return {'keywords': [self.get_keyword(keyword_id) for keyword_id in keyword_ids]}
+
+    def get_keyword_hits(self, keyword_id: int) -> int:
+        #Skewed so a few keywords are much larger than the rest, like the real data
+        return int(self.max_keyword_hits * self._random('keyword_hits', keyword_id).random() ** 3)
+
+    def get_keyword_page(self, keyword_id: int, start_from: int, hits_per_page: int) -> dict:
+        hits = self.get_keyword_hits(keyword_id)
+        documents = []
+        for hit in range(start_from, min(start_from + hits_per_page, hits)):
+            rng = self._random('keyword', keyword_id, hit)
+            documents.append(self._act_document(self.act_nros[hit % len(self.act_nros)], rng))
+        return {'availableHitCount': hits, 'documentList': documents}
+
+    def get_payload_templates(self) -> dict[str, str]:
+        '''
+        Minimal request payload templates, the extractors fill in the fields the mock reads.
+        '''
+        template = json.dumps({'pointInTime': None})
+        return {
+            'GET_ACT_KEYWORDS_PAYLOAD': template,
+            'GET_KEYWORD_PAYLOAD': template,
+            'GET_QUESTION_PAYLOAD': template,
+            'GET_QUESTION_ACTS_RELATIONSHIP_PAYLOAD': template,
+            'GET_QUESTION_KEYWORDS_PAYLOAD': template,
+            'GET_QUESTION_SEARCH_PAYLOAD': template
+        }
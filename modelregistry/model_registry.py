@@ -0,0 +1,78 @@
+import json
+import time
+import logging
+import threading
+
+from sentence_transformers import SentenceTransformer
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUPPORTED_BACKENDS = {'torch'}
+
+
+class ModelRegistry:
+    '''
+    Process-wide registry of embedding models. A model is loaded on its first get_model call and
+    shared by every later caller asking for the same (name, device, backend).
+    '''
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ModelRegistry, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self) -> None:
+        with open("modelregistry/config.json") as f:
+            self.config = json.load(f)
+
+        self._models: dict[tuple[str, str, str], SentenceTransformer] = {}
+        self._stats: dict[tuple[str, str, str], dict] = {}
+        self._lock = threading.Lock()
+
+    def _resolve_device(self, device: str = None) -> str:
+        device = device or self.config['device']
+        if device == 'auto':
+            import torch
+            return "cuda" if torch.cuda.is_available() else "cpu"
+        return device
+
+    def get_model(self, name: str = None, device: str = None, backend: str = None) -> SentenceTransformer:
+        name = name or self.config['default_model']
+        device = self._resolve_device(device)
+        backend = backend or self.config['backend']
+        if backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"Unsupported model backend {backend}, expected one of {sorted(SUPPORTED_BACKENDS)}")
+
+        key = (name, device, backend)
+        if key in self._models:
+            return self._models[key]
+
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = self._load(key)
+        return self._models[key]
+
+    def _load(self, key: tuple[str, str, str]) -> SentenceTransformer:
+        name, device, backend = key
+
+        start = time.perf_counter()
+        model = SentenceTransformer(name, device=device)
+        load_seconds = time.perf_counter() - start
+
+        parameter_bytes = sum(parameter.numel() * parameter.element_size() for parameter in model.parameters())
+        self._stats[key] = {
+            'name': name,
+            'device': device,
+            'backend': backend,
+            'load_seconds': round(load_seconds, 2),
+            'parameter_megabytes': round(parameter_bytes / 2**20, 1)
+        }
+        logger.info(f"Loaded model {name} on {device} ({backend}) in {load_seconds:.1f}s, {parameter_bytes / 2**20:.0f} MB of parameters")
+        return model
+
+    def get_stats(self) -> list[dict]:
+        return list(self._stats.values())
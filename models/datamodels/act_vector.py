@@ -16,4 +16,31 @@ class ActVector(BaseModel):
     chunk_id: Optional[int] = None
     total_chunks: Optional[int] = None
     keywords: List[Keyword] = []
-    node_ids: List[str] = []
\ No newline at end of file
+    node_ids: List[str] = []
+
+def keyword_id(conceptId: int, instanceOfType: int) -> str:
+    return f"{conceptId}:{instanceOfType}"
+
+class ActVectorPayload(BaseModel):
+    '''
+    Slim Qdrant payload of an act vector, the chunk text is served from Mongo leaf_acts.reconstruct.
+    '''
+    act_nro: int
+    parent_id: str
+    reconstruct_id: str
+    chunk_id: Optional[int] = None
+    total_chunks: Optional[int] = None
+    keyword_ids: List[str] = []
+    node_ids: List[str] = []
+
+    @classmethod
+    def from_act_vector(cls, act_vector: ActVector) -> 'ActVectorPayload':
+        return cls(
+            act_nro=act_vector.act_nro,
+            parent_id=act_vector.parent_id,
+            reconstruct_id=act_vector.reconstruct_id,
+            chunk_id=act_vector.chunk_id,
+            total_chunks=act_vector.total_chunks,
+            keyword_ids=[keyword_id(keyword.conceptId, keyword.instanceOfType) for keyword in act_vector.keywords],
+            node_ids=act_vector.node_ids
+        )
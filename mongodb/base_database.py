@@ -1,16 +1,41 @@
 import json
+import tqdm
+import asyncio
+import logging
+import datetime
 
+from pydantic import BaseModel
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
 from motor.motor_asyncio import AsyncIOMotorCollection
 
 from mongodb.mongo_singleton import MongoSingleton
+from resilience.resilient_call import resilient
 
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+def count_duplicate_key_errors(error: BulkWriteError) -> int:
+    '''
+    Return the number of duplicate key errors of a bulk write, re-raising it if any other write failed.
+    '''
+    write_errors = error.details.get('writeErrors', [])
+    if any(write_error.get('code') != DUPLICATE_KEY_ERROR_CODE for write_error in write_errors):
+        raise error
+    return len(write_errors)
+
 class BaseDatabase:
     def __init__(self):
         with open('mongodb/config.json', 'r') as config_file:
             config = json.load(config_file)
 
             self.config = config['db_config']
+            self.bulk_write_config = config['bulk_write']
+            self.change_watcher_config = config['change_watcher']
+            self.leaf_act_cache_config = config['leaf_act_cache']
             self.client = MongoSingleton().client
             self.db = self.client[self.config['db_name']]
 
@@ -21,4 +46,130 @@ class BaseDatabase:
         return await self.db.list_collection_names()
     
     def get_collection(self, collection: str) -> AsyncIOMotorCollection:
-        return self.db[collection]
\ No newline at end of file
+        return self.db[collection]
+
+    @resilient('mongo', 'write')
+    async def bump_dataset_version(self) -> None:
+        '''
+        Increment the dataset version document, which serving caches poll when change streams are unavailable.
+        '''
+        metadata = self.get_collection(self.change_watcher_config['metadata_collection'])
+        await metadata.update_one({'_id': 'dataset_version'},
+                                  {'$inc': {'version': 1}, '$set': {'updated_at': datetime.datetime.now()}},
+                                  upsert=True)
+
+    @resilient('mongo', 'read')
+    async def get_dataset_version(self) -> int:
+        metadata = self.get_collection(self.change_watcher_config['metadata_collection'])
+        document = await metadata.find_one({'_id': 'dataset_version'})
+        return document['version'] if document else 0
+
+    def _projection_with_key(self, projection: dict | None, key: str) -> dict | None:
+        '''
+        Make sure the pagination key is returned whatever projection was requested.
+        '''
+        if projection is None:
+            return None
+
+        projection = dict(projection)
+        is_inclusion = any(value for field, value in projection.items() if field != '_id')
+        if is_inclusion:
+            projection[key] = 1
+        else:
+            projection.pop(key, None)
+        return projection
+
+    @resilient('mongo', 'read')
+    async def _find_batch_after(self, collection: AsyncIOMotorCollection, key: str, start_after, projection: dict | None, batch_size: int) -> list[dict]:
+        query = {} if start_after is None else {key: {'$gt': start_after}}
+        cursor = collection.find(query, projection).sort(key, 1).limit(batch_size)
+        return await cursor.to_list(length=batch_size)
+
+    async def scroll_by_key(self, collection: AsyncIOMotorCollection, batch_size: int = 100, projection: dict = None, key: str = '_id', start_after = None):
+        '''
+        Yield batches of documents ordered by key, paginating with key > last seen key instead of skip.
+        The key must be unique and indexed. Pass the last key of a previous batch as start_after to resume.
+        '''
+        projection = self._projection_with_key(projection, key)
+        last_key = start_after
+
+        while True:
+            batch = await self._find_batch_after(collection, key, last_key, projection, batch_size)
+            if not batch:
+                break
+
+            yield batch
+
+            if len(batch) < batch_size:
+                break
+            last_key = batch[-1][key]
+
+    async def get_key_set(self, collection: AsyncIOMotorCollection, key_fields: list[str], batch_size: int = 10000) -> set:
+        '''
+        Return the set of key values (tuples for compound keys) stored in the collection,
+        fetching only the key fields in keyset-paginated batches.
+        '''
+        projection = {field: 1 for field in key_fields}
+        keys = set()
+
+        if len(key_fields) == 1:
+            field = key_fields[0]
+            projection['_id'] = 0
+            async for batch in self.scroll_by_key(collection, batch_size=batch_size, projection=projection, key=field):
+                keys.update(document[field] for document in batch)
+        else:
+            async for batch in self.scroll_by_key(collection, batch_size=batch_size, projection=projection):
+                keys.update(tuple(document[field] for field in key_fields) for document in batch)
+
+        return keys
+
+    @resilient('mongo', 'write')
+    async def _write_batch(self, collection: AsyncIOMotorCollection, documents: list[dict], key_fields: list[str], upsert: bool) -> dict:
+        summary = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0}
+
+        if upsert:
+            requests = [ReplaceOne({field: document[field] for field in key_fields}, document, upsert=True) for document in documents]
+            try:
+                result = (await collection.bulk_write(requests, ordered=False)).bulk_api_result
+            except BulkWriteError as e:
+                #Concurrent upserts of the same key can race on the unique index, the loser is reported as a duplicate
+                summary['duplicates'] = count_duplicate_key_errors(e)
+                result = e.details
+            summary['inserted'] = result.get('nUpserted', 0)
+            summary['updated'] = result.get('nModified', 0)
+            summary['unchanged'] = result.get('nMatched', 0) - result.get('nModified', 0)
+            return summary
+
+        try:
+            result = await collection.insert_many(documents, ordered=False)
+            summary['inserted'] = len(result.inserted_ids)
+        except BulkWriteError as e:
+            summary['duplicates'] = count_duplicate_key_errors(e)
+            summary['inserted'] = e.details.get('nInserted', 0)
+        return summary
+
+    async def bulk_write_documents(self, collection: AsyncIOMotorCollection, documents: list[BaseModel], key_fields: list[str], upsert: bool = True, batch_size: int = None, concurrency: int = None) -> dict:
+        '''
+        Write documents in unordered batches, with at most concurrency batches in flight.
+        With upsert, documents replace the ones with the same key_fields so reloads are idempotent and
+        identical documents are counted as unchanged, without it they are inserted and existing keys are
+        counted as duplicates. Return the number of inserted, updated, unchanged and duplicate documents.
+        '''
+        batch_size = batch_size or self.bulk_write_config['batch_size']
+        semaphore = asyncio.Semaphore(concurrency or self.bulk_write_config['concurrency'])
+        summary = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0}
+
+        with tqdm.tqdm(total=len(documents)) as pbar:
+            async def write_batch(batch: list[BaseModel]) -> None:
+                async with semaphore:
+                    batch_summary = await self._write_batch(collection, [document.model_dump() for document in batch], key_fields, upsert)
+                for count in summary:
+                    summary[count] += batch_summary[count]
+                pbar.update(len(batch))
+
+            await asyncio.gather(*[write_batch(documents[i:i + batch_size]) for i in range(0, len(documents), batch_size)])
+
+        logger.info(f"Bulk write to {collection.name}: {summary}")
+        if summary['inserted'] or summary['updated']:
+            await self.bump_dataset_version()
+        return summary
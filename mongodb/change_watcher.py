@@ -0,0 +1,129 @@
+import asyncio
+import logging
+
+from typing import Callable
+from pymongo.errors import OperationFailure, PyMongoError
+
+from mongodb.base_database import BaseDatabase
+from resilience.circuit_breaker import CircuitOpenError
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHANGE_STREAM_NOT_SUPPORTED_CODES = {40573, 40324}
+#ChangeStreamFatalError and ChangeStreamHistoryLost, the resume token is older than the oplog
+CHANGE_STREAM_HISTORY_LOST_CODES = {280, 286}
+INVALIDATE_ALL = None
+
+class MongoChangeWatcher(BaseDatabase):
+    '''
+    Calls the callback registered for a collection with the changed nros, or with None when the
+    affected nros are unknown (deletes, drops, dataset version bumps) and everything must be invalidated.
+
+    Change streams need a replica set, a single-node one is enough (see mongodb/mongodb.conf).
+    Without it, or when the stream fails for any other reason, the watcher polls the dataset version
+    document bumped by the loaders. If the watcher stops anyway on_stop is called, so callers can
+    stop serving from caches nothing invalidates any more.
+    '''
+    def __init__(self, callbacks: dict[str, Callable[[list[int] | None], None]], on_stop: Callable[[], None] = None):
+        super().__init__()
+        self.callbacks = callbacks
+        self.on_stop = on_stop
+        self.poll_interval_seconds = self.change_watcher_config['poll_interval_seconds']
+        self.task: asyncio.Task = None
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def _invalidate(self, collection: str, nros: list[int] | None) -> None:
+        if collection in self.callbacks:
+            self.callbacks[collection](nros)
+
+    def _invalidate_all(self) -> None:
+        for collection in self.callbacks:
+            self._invalidate(collection, INVALIDATE_ALL)
+
+    def _handle_change(self, change: dict) -> None:
+        collection = change.get('ns', {}).get('coll')
+        operation = change['operationType']
+        document = change.get('fullDocument') or {}
+
+        if operation in ('insert', 'update', 'replace') and 'nro' in document:
+            self._invalidate(collection, [document['nro']])
+        elif collection is not None:
+            self._invalidate(collection, INVALIDATE_ALL)
+        else:
+            self._invalidate_all()
+
+    async def run(self) -> None:
+        try:
+            try:
+                await self.watch_change_streams()
+            except Exception as e:
+                if isinstance(e, OperationFailure) and e.code in CHANGE_STREAM_NOT_SUPPORTED_CODES:
+                    logger.warning(f"Change streams are not available ({e}), polling the dataset version every {self.poll_interval_seconds}s.")
+                else:
+                    logger.error(f"Change stream failed ({e}), invalidating caches and polling the dataset version every {self.poll_interval_seconds}s.")
+                    self._invalidate_all()
+            await self.poll_dataset_version()
+        except Exception:
+            logger.exception("Change watcher stopped, caches are no longer invalidated.")
+            self._invalidate_all()
+            if self.on_stop is not None:
+                self.on_stop()
+
+    async def watch_change_streams(self) -> None:
+        pipeline = [{'$match': {'ns.coll': {'$in': list(self.callbacks.keys())}}}]
+        resume_token = None
+
+        while True:
+            try:
+                async with self.db.watch(pipeline=pipeline, full_document='updateLookup', resume_after=resume_token) as stream:
+                    logger.info(f"Watching change streams of {list(self.callbacks.keys())}")
+                    async for change in stream:
+                        self._handle_change(change)
+                        resume_token = stream.resume_token
+                #The stream was invalidated (collection dropped or renamed), start a new one
+                resume_token = None
+            except OperationFailure as e:
+                if e.code not in CHANGE_STREAM_HISTORY_LOST_CODES or resume_token is None:
+                    raise
+                logger.warning(f"Change stream history lost ({e}), invalidating caches and starting a new stream.")
+                self._invalidate_all()
+                resume_token = None
+            except PyMongoError as e:
+                logger.warning(f"Change stream interrupted ({e}), invalidating caches and resuming.")
+                self._invalidate_all()
+                await asyncio.sleep(self.poll_interval_seconds)
+
+    async def poll_dataset_version(self) -> None:
+        '''
+        Invalidate every cache when the dataset version changes. A failed read invalidates them too,
+        changes made while the version could not be read would be missed otherwise.
+        '''
+        version = None
+
+        while True:
+            try:
+                current_version = await self.get_dataset_version()
+            except (PyMongoError, CircuitOpenError) as e:
+                logger.warning(f"Could not read the dataset version ({e}), invalidating caches.")
+                self._invalidate_all()
+                version = None
+            else:
+                if version is not None and current_version != version:
+                    logger.info(f"Dataset version changed from {version} to {current_version}, invalidating caches.")
+                    self._invalidate_all()
+                version = current_version
+
+            await asyncio.sleep(self.poll_interval_seconds)
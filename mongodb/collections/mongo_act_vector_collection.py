@@ -1,9 +1,9 @@
-import tqdm
 import logging
 
 from pymongo.errors import DuplicateKeyError
 
 from mongodb.base_database import BaseDatabase
+from resilience.resilient_call import resilient
 from models.datamodels.act_vector import ActVector
 
 
@@ -23,37 +23,38 @@ class MongoVectorActCollection(BaseDatabase):
         await instance.collection.create_index([("act_nro", 1) , ("reconstruct_id" , 1)], unique=True)
         return instance
     
+    @resilient('mongo', 'read')
     async def get_number_of_documents(self):
         return await self.collection.count_documents({})
     
+    @resilient('mongo', 'read')
     async def get_act_vector(self, act_nro: int , reconstruct_id: str):
         return await self.collection.find_one({"act_nro": act_nro , "reconstruct_id": reconstruct_id})
     
+    @resilient('mongo', 'write')
     async def add_act_vector(self, act_vector: ActVector):
         try:
             await self.collection.insert_one(act_vector.model_dump())
+            await self.bump_dataset_version()
         except DuplicateKeyError as e:
             logger.info(f"Duplicate key error: {e}")
     
+    @resilient('mongo', 'write')
     async def delete_act_vector(self, act_nro:int):
         await self.collection.delete_one({"act_nro": act_nro})
+        await self.bump_dataset_version()
 
+    @resilient('mongo', 'write')
     async def delete_collection(self):
         await self.collection.drop()
+        await self.bump_dataset_version()
 
-    async def add_act_vectors(self, act_vectors: list[ActVector]):
-        for act_vector in tqdm.tqdm(act_vectors):
-            await self.add_act_vector(act_vector)
+    async def get_act_vector_keys(self) -> set[tuple[int, str]]:
+        return await self.get_key_set(self.collection, key_fields=['act_nro', 'reconstruct_id'])
 
-    async def scroll_all(self , batch_size: int = 100):
-        total_docs = await self.get_number_of_documents()
-        skip = 0
-        
-        while skip < total_docs:
-            cursor = self.collection.find().skip(skip).limit(batch_size)
+    async def add_act_vectors(self, act_vectors: list[ActVector], upsert: bool = True, batch_size: int = None, concurrency: int = None) -> dict:
+        return await self.bulk_write_documents(self.collection, act_vectors, key_fields=['act_nro', 'reconstruct_id'], upsert=upsert, batch_size=batch_size, concurrency=concurrency)
 
-            batch = await cursor.to_list(length=batch_size)
-            
+    async def scroll_all(self, batch_size: int = 100, projection: dict = None, key: str = '_id', start_after = None):
+        async for batch in self.scroll_by_key(self.collection, batch_size=batch_size, projection=projection, key=key, start_after=start_after):
             yield batch
-            skip += batch_size
-        
\ No newline at end of file
@@ -1,9 +1,9 @@
-import tqdm
 import logging
 
 from pymongo.errors import DuplicateKeyError
 
 from mongodb.base_database import BaseDatabase
+from resilience.resilient_call import resilient
 from models.datamodels.keyword import Keyword
 
 logging.basicConfig(level=logging.INFO)
@@ -24,21 +24,29 @@ class MongoKeywordCollection(BaseDatabase):
         await instance.collection.create_index([('conceptId', 1) , ('instanceOfType' , 1)], unique=True)
         return instance
 
+    @resilient('mongo', 'read')
     async def get_number_of_documents(self):
         return await self.collection.count_documents({})
 
+    @resilient('mongo', 'read')
     async def get_keyword(self, conceptId: int, instanceOfType: int):
         return await self.collection.find_one({"conceptId": conceptId, "instanceOfType": instanceOfType})
     
+    @resilient('mongo', 'write')
     async def add_keyword(self, keyword: Keyword):
         try:
             await self.collection.insert_one(keyword.model_dump())
+            await self.bump_dataset_version()
         except DuplicateKeyError as e:
             logger.info(f"Duplicate key error: {e}")
     
+    @resilient('mongo', 'write')
     async def delete_keyword(self, conceptId: int, instanceOfType: int):
         await self.collection.delete_one({"conceptId": conceptId, "instanceOfType": instanceOfType})
+        await self.bump_dataset_version()
 
-    async def add_keywords(self, keywords: list[Keyword]):
-        for keyword in tqdm.tqdm(keywords):
-            await self.add_keyword(keyword)
\ No newline at end of file
+    async def get_keyword_ids(self) -> set[tuple[int, int]]:
+        return await self.get_key_set(self.collection, key_fields=['conceptId', 'instanceOfType'])
+
+    async def add_keywords(self, keywords: list[Keyword], upsert: bool = True, batch_size: int = None, concurrency: int = None) -> dict:
+        return await self.bulk_write_documents(self.collection, keywords, key_fields=['conceptId', 'instanceOfType'], upsert=upsert, batch_size=batch_size, concurrency=concurrency)
@@ -1,9 +1,9 @@
-import tqdm
 import logging
 
 from pymongo.errors import DuplicateKeyError
 
 from mongodb.base_database import BaseDatabase
+from resilience.resilient_call import resilient
 from models.datamodels.leaf_act import LeafAct
 
 
@@ -24,27 +24,38 @@ class MongoLeafActCollection(BaseDatabase):
         await instance.collection.create_index("nro", unique=True)
         return instance
     
+    @resilient('mongo', 'read')
     async def get_number_of_documents(self):
         return await self.collection.count_documents({})
     
+    @resilient('mongo', 'read')
     async def get_leaf_act(self, nro: int):
         return await self.collection.find_one({"nro": nro})
     
+    @resilient('mongo', 'read')
     async def get_leaf_acts(self, nros: list[int]):
         return await self.collection.find({"nro": {"$in": nros}}).to_list(length=None)
     
+    @resilient('mongo', 'write')
     async def add_leaf_act(self, leaf_act: LeafAct):
         try:
             await self.collection.insert_one(leaf_act.model_dump())
+            await self.bump_dataset_version()
         except DuplicateKeyError as e:
             logger.info(f"Duplicate key error: {e}")
     
+    @resilient('mongo', 'write')
     async def delete_leaf_act(self, nro:int):
         await self.collection.delete_one({"nro": nro})
+        await self.bump_dataset_version()
 
-    async def add_leaf_acts(self, leaf_acts: list[LeafAct]):
-        for leaf_act in tqdm.tqdm(leaf_acts):
-            await self.add_leaf_act(leaf_act)
+    async def get_leaf_act_nros(self) -> set[int]:
+        return await self.get_key_set(self.collection, key_fields=['nro'])
+
+    async def add_leaf_acts(self, leaf_acts: list[LeafAct], upsert: bool = True, batch_size: int = None, concurrency: int = None) -> dict:
+        return await self.bulk_write_documents(self.collection, leaf_acts, key_fields=['nro'], upsert=upsert, batch_size=batch_size, concurrency=concurrency)
     
+    @resilient('mongo', 'write')
     async def delete_leaf_acts_collection(self):
-        await self.collection.drop()
\ No newline at end of file
+        await self.collection.drop()
+        await self.bump_dataset_version()
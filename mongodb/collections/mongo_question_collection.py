@@ -1,10 +1,10 @@
-import tqdm
 import logging
 
 from motor.motor_asyncio import AsyncIOMotorCollection
 from pymongo.errors import DuplicateKeyError
 
 from mongodb.base_database import BaseDatabase
+from resilience.resilient_call import resilient
 from models.datamodels.question import Question
 
 logging.basicConfig(level=logging.INFO)
@@ -23,33 +23,33 @@ class MongoQuestionCollection(BaseDatabase):
         await instance.collection.create_index("nro", unique=True)
         return instance
     
+    @resilient('mongo', 'read')
     async def _get_number_of_documents(self):
         return await self.collection.count_documents({})
     
+    @resilient('mongo', 'write')
     async def _add_question(self, question: Question):
         try:
             await self.collection.insert_one(question.model_dump())
+            await self.bump_dataset_version()
         except DuplicateKeyError as e:
             logger.info(f"Duplicate key error: {e}")
     
-    async def add_questions(self, questions: list[Question]):
-        for question in tqdm.tqdm(questions):
-            await self._add_question(question)
+    async def get_question_nros(self) -> set[int]:
+        return await self.get_key_set(self.collection, key_fields=['nro'])
+
+    async def add_questions(self, questions: list[Question], upsert: bool = True, batch_size: int = None, concurrency: int = None) -> dict:
+        return await self.bulk_write_documents(self.collection, questions, key_fields=['nro'], upsert=upsert, batch_size=batch_size, concurrency=concurrency)
     
+    @resilient('mongo', 'write')
     async def delete_question(self, nro:int):
         await self.collection.delete_one({"nro": nro})
+        await self.bump_dataset_version()
     
+    @resilient('mongo', 'read')
     async def get_question(self, nro:int):
         return await self.collection.find_one({"nro": nro})
     
-    async def scroll_all(self , batch_size: int = 100):
-        total_docs = await self._get_number_of_documents()
-        skip = 0
-        
-        while skip < total_docs:
-            cursor = self.collection.find().skip(skip).limit(batch_size)
-
-            batch = await cursor.to_list(length=batch_size)
-            
+    async def scroll_all(self, batch_size: int = 100, projection: dict = None, key: str = '_id', start_after = None):
+        async for batch in self.scroll_by_key(self.collection, batch_size=batch_size, projection=projection, key=key, start_after=start_after):
             yield batch
-            skip += batch_size
\ No newline at end of file
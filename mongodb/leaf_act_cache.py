@@ -0,0 +1,66 @@
+import logging
+
+from collections import OrderedDict
+
+from mongodb.collections.mongo_leaf_act_collection import MongoLeafActCollection
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LeafActCache:
+    '''
+    In-memory LRU cache of at most max_size leaf act documents keyed by nro, invalidated by MongoChangeWatcher.
+    When disabled every call goes straight to Mongo.
+    '''
+    def __init__(self, collection: MongoLeafActCollection, enabled: bool = True, max_size: int = None):
+        self.collection = collection
+        self.enabled = enabled
+        self.max_size = max_size or collection.leaf_act_cache_config['max_size']
+        self.leaf_acts: OrderedDict[int, dict] = OrderedDict()
+        self.generation = 0
+
+    async def get_leaf_acts(self, nros: list[int]) -> list[dict]:
+        if not self.enabled:
+            return await self.collection.get_leaf_acts(nros=nros)
+
+        result = {nro: self.leaf_acts[nro] for nro in set(nros) if nro in self.leaf_acts}
+        for nro in result:
+            self.leaf_acts.move_to_end(nro)
+        missing = [nro for nro in set(nros) if nro not in result]
+
+        if missing:
+            generation = self.generation
+            fetched = await self.collection.get_leaf_acts(nros=missing)
+            for leaf_act in fetched:
+                result[leaf_act['nro']] = leaf_act
+
+            #Do not store documents that may have changed while they were being fetched
+            if generation == self.generation:
+                for leaf_act in fetched:
+                    self.leaf_acts[leaf_act['nro']] = leaf_act
+                while len(self.leaf_acts) > self.max_size:
+                    self.leaf_acts.popitem(last=False)
+
+        return list(result.values())
+
+    def disable(self) -> None:
+        '''
+        Drop everything and go straight to Mongo from now on, used when nothing invalidates the cache any more.
+        '''
+        self.invalidate(None)
+        self.enabled = False
+        logger.warning("Leaf act cache disabled.")
+
+    def invalidate(self, nros: list[int] | None) -> None:
+        '''
+        Drop the given nros from the cache, or everything if nros is None.
+        '''
+        self.generation += 1
+        if nros is None:
+            self.leaf_acts.clear()
+            logger.info("Leaf act cache cleared.")
+        else:
+            for nro in nros:
+                self.leaf_acts.pop(nro, None)
@@ -1,59 +1,102 @@
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
+import logging
 
 from qdrant_client import models
 from qdrant_client.models import Record 
 
-from models.datamodels.act_vector import ActVector
+from models.datamodels.act_vector import ActVector, ActVectorPayload, keyword_id
 from models.api_models import Keyword
 from qdrantdb.qdrant_base_database import QdrantBaseDatabase
+from resilience.resilient_call import resilient
+from vectorstore.act_vector_store_base import ActVectorStoreBase
 
 
-MAX_RETRIES = 3
-RETRY_WAIT_SECONDS = 2
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
-class QdrantActCollection(QdrantBaseDatabase):
+SLIM_PAYLOAD_SCHEMA = 'slim'
+FULL_PAYLOAD_SCHEMA = 'full'
+
+
+class QdrantActCollection(QdrantBaseDatabase, ActVectorStoreBase):
     def __init__(self) -> None:
         super().__init__()
         self.collection_name = 'acts'
+        self.payload_schema = self.collection_config['acts'].get('payload_schema', FULL_PAYLOAD_SCHEMA)
+
+    @classmethod
+    async def create(cls, check_payload_schema: bool = True) -> 'QdrantActCollection':
+        instance = await super().create()
+        if check_payload_schema:
+            await instance.check_payload_schema()
+        return instance
+
+    async def get_stored_payload_schema(self) -> str | None:
+        '''
+        Return the payload schema of the stored points judged by a sample point, None for an empty collection.
+        '''
+        records, _ = await self.client.scroll(collection_name=self.collection_name, limit=1, with_payload=True, with_vectors=False)
+        if not records:
+            return None
+        return FULL_PAYLOAD_SCHEMA if 'text' in records[0].payload else SLIM_PAYLOAD_SCHEMA
+
+    async def check_payload_schema(self) -> None:
+        '''
+        Refuse to work on points stored with another schema than the configured one, keyword filtered searches
+        would silently match nothing. Run migrate_act_payloads.py before switching payload_schema to slim.
+        '''
+        stored_schema = await self.get_stored_payload_schema()
+        if stored_schema is not None and stored_schema != self.payload_schema:
+            raise ValueError(f"Collection {self.collection_name} stores {stored_schema} payloads but payload_schema is {self.payload_schema}. "
+                             f"Run qdrantdb/migrate_act_payloads.py or set payload_schema to {stored_schema}.")
 
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type(Exception)))
+    def to_payload(self, act_vector: ActVector) -> dict:
+        '''
+        Build the point payload for the configured schema, the slim schema drops the chunk text and token counts.
+        '''
+        if self.payload_schema == SLIM_PAYLOAD_SCHEMA:
+            return ActVectorPayload.from_act_vector(act_vector).model_dump()
+        return act_vector.model_dump()
+
+    @resilient('qdrant', 'write')
     async def upsert_single_act_vector(self, act_vector: ActVector, _id: int, vector) -> None:
 
-        act_vector = act_vector.model_dump()
         point = models.PointStruct(
             id = _id,
-            payload = act_vector,
+            payload = self.to_payload(act_vector),
             vector = vector
         )
         await self.client.upsert(collection_name=self.collection_name, points = [point])
 
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type(Exception)))
+    @resilient('qdrant', 'write')
     async def upsert_batch_act_vectors(self, act_vectors: list[ActVector], ids: list[int], vectors) -> None:
         points = []
         for i, act_vector in enumerate(act_vectors):
-            act_vector = act_vector.model_dump()
-
             point = models.PointStruct(
                 id = ids[i],
-                payload = act_vector,
+                payload = self.to_payload(act_vector),
                 vector = vectors[i]
             )
             points.append(point)
         await self.client.upsert(collection_name=self.collection_name, points = points)
 
+    @resilient('qdrant', 'read')
     async def search_acts(self, limit:int , vector: list[float]) -> list[Record]:
         response = await self.client.search(collection_name=self.collection_name, query_vector=vector, limit=limit, with_payload=True)
         return response
     
+    @resilient('qdrant', 'read')
     async def search_acts_keyword_filtered(self, limit: int, act_nros: list[int] , keywords :list[Keyword] , vector: list[float])-> list[Record]:
-        concept_id_set = list(set([keyword.conceptId for keyword in keywords]))
-        instance_of_type_set = list(set([keyword.instanceOfType for keyword in keywords]))
+        if self.payload_schema == SLIM_PAYLOAD_SCHEMA:
+            keyword_ids = list(set([keyword_id(keyword.conceptId, keyword.instanceOfType) for keyword in keywords]))
+            keyword_condition = models.FieldCondition(key="keyword_ids", match=models.MatchAny(any=keyword_ids))
+        else:
+            concept_id_set = list(set([keyword.conceptId for keyword in keywords]))
+            instance_of_type_set = list(set([keyword.instanceOfType for keyword in keywords]))
+            keyword_condition = models.NestedCondition(nested=models.Nested(key="keywords", filter=models.Filter(
+                must=[
+                models.FieldCondition(key="conceptId", match=models.MatchAny(any=concept_id_set)),
+                models.FieldCondition(key="instanceOfType", match=models.MatchAny(any=instance_of_type_set))
+                ])))
 
         return await self.client.search(
         collection_name=self.collection_name,
@@ -62,15 +105,12 @@ class QdrantActCollection(QdrantBaseDatabase):
         with_payload=True,
         search_params=models.SearchParams(exact=False),
         query_filter=models.Filter(must=[
-            models.NestedCondition(nested=models.Nested(key="keywords", filter=models.Filter(
-                must=[
-                models.FieldCondition(key="conceptId", match=models.MatchAny(any=concept_id_set)),
-                models.FieldCondition(key="instanceOfType", match=models.MatchAny(any=instance_of_type_set))
-                ]))),
+            keyword_condition,
             models.FieldCondition(key="act_nro",match=models.MatchAny(any=act_nros))
             ])
         )
 
+    @resilient('qdrant', 'read')
     async def search_acts_filtered(self, limit: int, act_nros: list[int], vector: list[float]) -> list[Record]:
         return await self.client.search(
         collection_name=self.collection_name,
@@ -81,23 +121,71 @@ class QdrantActCollection(QdrantBaseDatabase):
         query_filter=models.Filter(must=[models.FieldCondition(key="act_nro",match=models.MatchAny(any=act_nros))])
     )
     
+    @resilient('qdrant', 'read')
     async def retrieve_act_vector(self, act_vector_id: int) -> Record:
         response = await self.client.retrieve(collection_name=self.collection_name, ids = [act_vector_id])
         return response
 
+    @resilient('qdrant', 'read')
     async def retrieve_batch_act_vectors(self, act_vector_ids: list[int]) -> list[Record]:
         response = await self.client.retrieve(collection_name=self.collection_name, ids = act_vector_ids)
         return response
     
+    @resilient('qdrant', 'write')
     async def delete_act_vector(self, act_vector_id: int) -> None:
         await self.client.delete(collection_name=self.collection_name, points_selector = models.PointIdsList(points=[act_vector_id]))
     
+    @resilient('qdrant', 'write')
     async def delete_batch_questions(self, act_vector_ids: list[int]) -> None:
         await self.client.delete(collection_name=self.collection_name, points_selector = models.PointIdsList(points=act_vector_ids))
 
+    @resilient('qdrant', 'read')
     async def get_act_vector_count(self) -> int:
         response = await self.client.count(collection_name=self.collection_name)
         return response.count
     
+    @resilient('qdrant', 'write')
     async def delete_collection(self) -> None:
-        await self.client.delete_collection(collection_name=self.collection_name)
\ No newline at end of file
+        await self.client.delete_collection(collection_name=self.collection_name)
+
+    @resilient('qdrant', 'write')
+    async def overwrite_payloads(self, payloads: dict[int, dict]) -> None:
+        operations = [
+            models.OverwritePayloadOperation(overwrite_payload=models.SetPayload(payload=payload, points=[point_id]))
+            for point_id, payload in payloads.items()
+        ]
+        await self.client.batch_update_points(collection_name=self.collection_name, update_operations=operations)
+
+    async def migrate_to_slim_payloads(self, batch_size: int = 1000) -> int:
+        '''
+        Rewrite full act vector payloads in place with the slim schema, vectors are left untouched.
+        Points that are already slim are skipped so the migration can be rerun after an interruption.
+        Set payload_schema to slim in the config once it has finished.
+        '''
+        await self.client.create_payload_index(collection_name=self.collection_name, field_name='act_nro', field_schema='integer')
+        await self.client.create_payload_index(collection_name=self.collection_name, field_name='keyword_ids', field_schema='keyword')
+
+        migrated = 0
+        offset = None
+        while True:
+            records, offset = await self.client.scroll(
+                collection_name=self.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+
+            payloads = {
+                record.id: ActVectorPayload.from_act_vector(ActVector(**record.payload)).model_dump()
+                for record in records if 'text' in record.payload
+            }
+            if payloads:
+                await self.overwrite_payloads(payloads)
+                migrated += len(payloads)
+
+            if offset is None:
+                break
+
+        logger.info(f"Migrated {migrated} act vector payloads to the slim schema")
+        return migrated
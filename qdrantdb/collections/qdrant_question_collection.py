@@ -1,23 +1,16 @@
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
-
 from qdrant_client import models
 from qdrant_client.models import Record 
 
 from models.datamodels.question import Question
 from qdrantdb.qdrant_base_database import QdrantBaseDatabase
-
-MAX_RETRIES = 3
-RETRY_WAIT_SECONDS = 2
+from resilience.resilient_call import resilient
 
 class QdrantQuestionCollection(QdrantBaseDatabase):
     def __init__(self) -> None:
         super().__init__()
         self.collection_name = 'questions'
 
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type(Exception)))
+    @resilient('qdrant', 'write')
     async def upsert_question(self, question: Question, vector) -> None:
         
         question = question.model_dump()
@@ -29,10 +22,7 @@ class QdrantQuestionCollection(QdrantBaseDatabase):
 
         await self.client.upsert(collection_name=self.collection_name, points = [point])
 
-    @retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=(retry_if_exception_type(Exception)))
+    @resilient('qdrant', 'write')
     async def upsert_batch_questions(self, questions: list[Question] , vectors) -> None:
         points = []
         for i, question in enumerate(questions):
@@ -47,10 +37,12 @@ class QdrantQuestionCollection(QdrantBaseDatabase):
         await self.client.upsert(collection_name=self.collection_name, points = points)
 
 
+    @resilient('qdrant', 'read')
     async def search_questions(self, limit: int, vector: list[float]) -> list[Record]:
         response = await self.client.search(collection_name=self.collection_name, query_vector=vector, limit=limit, with_payload=True)
         return response
     
+    @resilient('qdrant', 'read')
     async def search_questions_excluding_ids(self, limit: int, vector: list[float], exclude_ids: list[int]) -> list[Record]:
         return await self.client.search(
         collection_name=self.collection_name,
@@ -61,23 +53,29 @@ class QdrantQuestionCollection(QdrantBaseDatabase):
         query_filter=models.Filter(must_not=[models.FieldCondition(key="nro",match=models.MatchAny(any=exclude_ids))])
     )
 
+    @resilient('qdrant', 'read')
     async def retrieve_question(self, question_nro: int) -> Record:
         response = await self.client.retrieve(collection_name=self.collection_name, ids = [question_nro])
         return response
 
+    @resilient('qdrant', 'read')
     async def retrieve_batch_questions(self, question_nros: list[int]) -> list[Record]:
         response = await self.client.retrieve(collection_name=self.collection_name, ids = question_nros)
         return response
     
+    @resilient('qdrant', 'write')
     async def delete_question(self, question_nro: int) -> None:
         await self.client.delete(collection_name=self.collection_name, points_selector = models.PointIdsList(points=[question_nro]))
 
+    @resilient('qdrant', 'write')
     async def delete_batch_questions(self, question_nros: list[int]) -> None:
         await self.client.delete(collection_name=self.collection_name, points_selector = models.PointIdsList(points=question_nros))
     
+    @resilient('qdrant', 'read')
     async def get_question_count(self) -> int:
         response = await self.client.count(collection_name=self.collection_name)
         return response.count
     
+    @resilient('qdrant', 'write')
     async def delete_collection(self) -> None:
         await self.client.delete_collection(collection_name=self.collection_name)
\ No newline at end of file
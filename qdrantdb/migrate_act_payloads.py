@@ -0,0 +1,14 @@
+import asyncio
+
+from qdrantdb.collections.qdrant_act_collection import QdrantActCollection
+
+
+async def main():
+    #The stored schema is expected to differ from the configured one until the migration has run
+    qdrant_act_collection = await QdrantActCollection.create(check_payload_schema=False)
+    await qdrant_act_collection.migrate_to_slim_payloads()
+    print('Migration finished, set collections.acts.payload_schema to "slim" in qdrantdb/config.json')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -25,6 +25,23 @@ class QdrantBaseDatabase:
         response = await self.client.get_collections()
         return response
 
+    def _hnsw_config(self, collection: str) -> models.HnswConfigDiff | None:
+        hnsw = self.collection_config[collection].get('hnsw')
+        return models.HnswConfigDiff(**hnsw) if hnsw else None
+
+    def _quantization_config(self, collection: str) -> models.ScalarQuantization | None:
+        '''
+        Scalar quantization from the collection config, e.g. {"type": "int8", "quantile": 0.99, "always_ram": true}, None to keep full vectors only.
+        '''
+        quantization = self.collection_config[collection].get('scalar_quantization')
+        if not quantization:
+            return None
+        return models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType(quantization['type']),
+            quantile=quantization.get('quantile'),
+            always_ram=quantization.get('always_ram')
+        ))
+
     async def initialize_collections(self) -> None:
         collections = await self.list_collections()
         collections_names = [collection.name for collection in collections.collections]
@@ -33,5 +50,7 @@ class QdrantBaseDatabase:
             if self.collection_config[collection]['name'] not in collections_names:
                 await self.client.create_collection(collection_name=self.collection_config[collection]['name'], 
                                                     vectors_config=models.VectorParams(size=self.collection_config[collection]['vector_size'],
-                                                    distance=models.Distance.COSINE)
+                                                    distance=models.Distance.COSINE),
+                                                    hnsw_config=self._hnsw_config(collection),
+                                                    quantization_config=self._quantization_config(collection)
                                                     )
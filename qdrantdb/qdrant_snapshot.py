@@ -0,0 +1,144 @@
+import os
+import json
+import asyncio
+import logging
+import argparse
+import datetime
+import numpy as np
+
+from tqdm import tqdm
+
+from qdrantdb.qdrant_base_database import QdrantBaseDatabase
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class QdrantSnapshot(QdrantBaseDatabase):
+    '''
+    Exports collections to a memory-mapped float32 vectors.npy with ids.npy, payloads.jsonl and a manifest,
+    and restores them with the client's parallel uploader, so a collection can be rebuilt without re-encoding the corpus.
+    '''
+    VECTORS_FILE = 'vectors.npy'
+    IDS_FILE = 'ids.npy'
+    PAYLOADS_FILE = 'payloads.jsonl'
+    MANIFEST_FILE = 'manifest.json'
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.snapshot_config = self.config['snapshots']
+
+    def _snapshot_path(self, collection_name: str, path: str = None) -> str:
+        return os.path.join(path or self.snapshot_config['path'], collection_name) + '/'
+
+    async def export_collection(self, collection_name: str, path: str = None) -> int:
+        path = self._snapshot_path(collection_name, path)
+        os.makedirs(path, exist_ok=True)
+
+        total = (await self.client.count(collection_name=collection_name, exact=True)).count
+        vector_size = self.collection_config[collection_name]['vector_size']
+        vectors = np.lib.format.open_memmap(path + self.VECTORS_FILE, mode='w+', dtype=np.float32, shape=(total, vector_size))
+        ids = np.zeros(total, dtype=np.int64)
+
+        row = 0
+        offset = None
+        with open(path + self.PAYLOADS_FILE, 'w', encoding='utf-8') as payloads_file, tqdm(total=total, desc=f"Exporting {collection_name}") as pbar:
+            while row < total:
+                records, offset = await self.client.scroll(
+                    collection_name=collection_name,
+                    limit=self.snapshot_config['batch_size'],
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=True
+                )
+                #Points added after counting are left for the next export
+                records = records[:total - row]
+                if not records:
+                    break
+
+                vectors[row:row + len(records)] = np.asarray([record.vector for record in records], dtype=np.float32)
+                for record in records:
+                    ids[row] = record.id
+                    payloads_file.write(json.dumps(record.payload, ensure_ascii=False) + '\n')
+                    row += 1
+                pbar.update(len(records))
+
+                if offset is None:
+                    break
+
+        vectors.flush()
+        del vectors
+        np.save(path + self.IDS_FILE, ids[:row])
+
+        with open(path + self.MANIFEST_FILE, 'w') as f:
+            json.dump({
+                'collection_name': collection_name,
+                'count': row,
+                'vector_size': vector_size,
+                'exported_at': datetime.datetime.now(datetime.timezone.utc).isoformat()
+            }, f, indent=4)
+
+        logger.info(f"Exported {row} points of {collection_name} to {path}")
+        return row
+
+    async def import_collection(self, collection_name: str, path: str = None, recreate: bool = False) -> int:
+        '''
+        Upload a snapshot into collection_name in snapshots.parallel worker processes. With recreate the collection
+        is dropped first and created again from the current config, which is how changes to the vector size,
+        hnsw or scalar_quantization settings are applied.
+        '''
+        path = self._snapshot_path(collection_name, path)
+        with open(path + self.MANIFEST_FILE, 'r') as f:
+            manifest = json.load(f)
+
+        if recreate:
+            await self.client.delete_collection(collection_name=collection_name)
+            logger.info(f"Dropped collection {collection_name}")
+        await self.initialize_collections()
+
+        vectors = np.load(path + self.VECTORS_FILE, mmap_mode='r')
+        ids = np.load(path + self.IDS_FILE)
+        total = manifest['count']
+
+        with open(path + self.PAYLOADS_FILE, 'r', encoding='utf-8') as payloads_file:
+            payloads = tqdm((json.loads(line) for line in payloads_file), total=total, desc=f"Importing {collection_name}")
+            #The uploader is synchronous, it streams batches from the memory-mapped vectors and retries them itself
+            await asyncio.to_thread(
+                self.client.upload_collection,
+                collection_name=collection_name,
+                vectors=vectors[:total],
+                payload=payloads,
+                ids=ids[:total].tolist(),
+                batch_size=self.snapshot_config['batch_size'],
+                parallel=self.snapshot_config['parallel'],
+                max_retries=self.snapshot_config['max_retries'],
+                wait=True
+            )
+
+        count = (await self.client.count(collection_name=collection_name, exact=True)).count
+        if count < total:
+            logger.error(f"Imported {total} points into {collection_name} but the collection holds {count}")
+        else:
+            logger.info(f"Imported {total} points into {collection_name} from {path}")
+        return total
+
+
+async def main(command: str, collections: list[str], path: str, recreate: bool) -> None:
+    snapshot = await QdrantSnapshot.create()
+    for collection_name in collections:
+        if command == 'export':
+            await snapshot.export_collection(collection_name, path)
+        else:
+            await snapshot.import_collection(collection_name, path, recreate)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export Qdrant collections to disk or restore them without re-encoding.')
+    parser.add_argument('command', choices=['export', 'import'])
+    parser.add_argument('--collections', nargs='+', default=['acts', 'questions'], choices=['acts', 'questions'])
+    parser.add_argument('--path', default=None, help='Snapshot directory, defaults to snapshots.path in qdrantdb/config.json.')
+    parser.add_argument('--recreate', action='store_true', help='Drop and recreate each collection from config before importing.')
+    args = parser.parse_args()
+
+    asyncio.run(main(args.command, args.collections, args.path, args.recreate))
@@ -0,0 +1,131 @@
+import json
+import time
+import logging
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit breaker is open."""
+    pass
+
+
+class CircuitBreaker:
+    '''
+    Counts consecutive failures of a backend and stops sending it requests once failure_threshold is reached.
+    After recovery_timeout_seconds up to half_open_max_calls probe requests are let through,
+    a successful probe closes the circuit and a failed one opens it again.
+    '''
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout_seconds: float, half_open_max_calls: int) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout_seconds = recovery_timeout_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+
+        self.metrics = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'rejected': 0,
+            'transitions': {}
+        }
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        transition = f"{self.state}->{state}"
+        self.metrics['transitions'][transition] = self.metrics['transitions'].get(transition, 0) + 1
+        logger.warning(f"Circuit breaker {self.name}: {transition}")
+
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+        if state == HALF_OPEN:
+            self.half_open_calls = 0
+        if state == CLOSED:
+            self.consecutive_failures = 0
+
+    def allow_request(self) -> bool:
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout_seconds:
+            self._transition(HALF_OPEN)
+
+        if self.state == CLOSED:
+            allowed = True
+        elif self.state == HALF_OPEN and self.half_open_calls < self.half_open_max_calls:
+            self.half_open_calls += 1
+            allowed = True
+        else:
+            allowed = False
+
+        if allowed:
+            self.metrics['calls'] += 1
+        else:
+            self.metrics['rejected'] += 1
+        return allowed
+
+    def before_call(self) -> None:
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit breaker {self.name} is {self.state}, rejecting call.")
+
+    def record_success(self) -> None:
+        self.metrics['successes'] += 1
+        self.consecutive_failures = 0
+        if self.state == HALF_OPEN:
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        self.metrics['failures'] += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._transition(OPEN)
+
+    def release(self) -> None:
+        '''
+        Give back a half-open probe slot for a call that ended without a verdict (e.g. cancelled).
+        '''
+        if self.state == HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+
+    def get_metrics(self) -> dict:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            **self.metrics
+        }
+
+
+with open('resilience/config.json') as f:
+    config = json.load(f)
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    '''
+    Return the process-wide circuit breaker for the given backend name, creating it from config on first use.
+    '''
+    if name not in _breakers:
+        breaker_config = config['breakers'][name]
+        _breakers[name] = CircuitBreaker(
+            name=name,
+            failure_threshold=breaker_config['failure_threshold'],
+            recovery_timeout_seconds=breaker_config['recovery_timeout_seconds'],
+            half_open_max_calls=breaker_config['half_open_max_calls']
+        )
+    return _breakers[name]
+
+
+def get_resilience_metrics() -> dict:
+    return {name: breaker.get_metrics() for name, breaker in _breakers.items()}
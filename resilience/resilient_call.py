@@ -0,0 +1,90 @@
+import time
+import asyncio
+import functools
+
+from pymongo.errors import ConnectionFailure, ExecutionTimeout, WTimeoutError, PyMongoError
+from qdrant_client.http.exceptions import UnexpectedResponse, ResponseHandlingException
+from tenacity import AsyncRetrying, stop_after_attempt, wait_random_exponential, retry_if_exception
+
+from resilience.circuit_breaker import config, get_circuit_breaker
+
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def is_retryable(exception: BaseException) -> bool:
+    '''
+    Return True for errors that signal a degraded backend rather than a bad request.
+    '''
+    if isinstance(exception, (asyncio.TimeoutError, ConnectionError, ResponseHandlingException)):
+        return True
+    if isinstance(exception, UnexpectedResponse):
+        return exception.status_code in RETRYABLE_STATUS_CODES
+    if isinstance(exception, (ConnectionFailure, ExecutionTimeout, WTimeoutError)):
+        return True
+    if isinstance(exception, PyMongoError):
+        return exception.has_error_label('RetryableWriteError')
+    return False
+
+
+def _stop_at(deadline: float):
+    def stop(retry_state) -> bool:
+        return time.monotonic() >= deadline
+    return stop
+
+
+def _wait_until(deadline: float, wait):
+    '''
+    Backoff capped to the time left before the deadline.
+    '''
+    def capped(retry_state) -> float:
+        return max(0.0, min(wait(retry_state), deadline - time.monotonic()))
+    return capped
+
+
+def resilient(breaker_name: str, operation: str):
+    '''
+    Decorate an async database call with a per-call deadline, jittered exponential backoff
+    on retryable errors and the named circuit breaker.
+    The deadline bounds the whole call including retries, each attempt gets the remaining time.
+    Backoff never sleeps past the deadline, and once no time is left the last error is raised
+    without another attempt, so the breaker is not charged for attempts that could not succeed.
+    '''
+    operation_config = config['operations'][operation]
+    deadline_seconds = operation_config['deadline_seconds']
+    max_attempts = operation_config['max_attempts']
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            breaker = get_circuit_breaker(breaker_name)
+            deadline = time.monotonic() + deadline_seconds
+            backoff = wait_random_exponential(multiplier=config['backoff']['multiplier_seconds'], max=config['backoff']['max_seconds'])
+            last_error: Exception = None
+
+            async for attempt in AsyncRetrying(
+                stop=(stop_after_attempt(max_attempts) | _stop_at(deadline)),
+                wait=_wait_until(deadline, backoff),
+                retry=retry_if_exception(is_retryable),
+                reraise=True):
+                with attempt:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 and last_error is not None:
+                        raise last_error
+                    breaker.before_call()
+                    try:
+                        result = await asyncio.wait_for(func(*args, **kwargs), timeout=max(remaining, 0.001))
+                    except Exception as e:
+                        last_error = e
+                        if is_retryable(e):
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+                        raise
+                    except BaseException:
+                        breaker.release()
+                        raise
+                    breaker.record_success()
+            return result
+        return wrapper
+    return decorator
@@ -4,7 +4,9 @@ import dotenv
 import logging
 import asyncio 
 
-from sessionmanager.session_manager import SessionManager
+from sessionmanager.session_pool import SessionPool
+from httpclient.http_client import get_http_client
+from etl.extract.parser_pool import get_parser_pool
 
 from etl.extract.extractquestions.extract_questions_domain import ExtractQuestionsDomain
 from etl.extract.extractacts.extract_acts import ExtractActs
@@ -33,7 +35,7 @@ DOMAINS = os.getenv('DOMAINS')
 #Ignore warnings and errors, they are being handled by tenacity
 async def main():
 
-    session_manager = SessionManager(EMAIL, PASSWORD)
+    session_manager = SessionPool(EMAIL, PASSWORD)
     extract = ExtractQuestionsDomain(session_manager)
     transform = TransformQuestions(session_manager)
     transformed_question_index = TransformedQuestionIndex()
@@ -61,6 +63,9 @@ async def main():
     await keyword_extractor.get_keywords(keywords = keywords_from_questions)
     logging.info(f'Extracted keywords')
 
+    await get_http_client().close()
+    await get_parser_pool().close()
+
     #There are errors in the keywords, api. Needs a complex parser to fix them. 1 keyword to fix look for 'all()' in units['id'].
     #Run the following to find the errors:
     
@@ -92,7 +97,7 @@ async def main():
     logging.info(f'Loaded questions')
 
     logging.info(f'Validating loaded data')
-    load_questions.validate_loaded_data()
+    await load_questions.validate_loaded_data()
     logging.info(f'Validation complete')
 
     logging.info(f'Loading keywords')
@@ -113,7 +118,7 @@ async def main():
     logging.info(f'Loaded act vectors')
     
     logging.info(f'Validating loaded data')
-    load_keywords.validate_loaded_data()
+    await load_keywords.validate_loaded_data()
     logging.info(f'Validation complete')
     '''
 
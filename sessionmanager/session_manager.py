@@ -1,6 +1,8 @@
 import os
 import json
+import time
 import dotenv
+import asyncio
 import logging
 import datetime
 
@@ -21,31 +23,47 @@ REDIRECT_URL=os.getenv('REDIRECT_URL')
 REFERER_URL=os.getenv('REFERER_URL')
 
 
+class SessionLoginError(Exception):
+    """Raised when logging in again failed, and to later callers until session.relogin_backoff_seconds have passed."""
+
+
 class SessionManager:
-    def __init__(self, email: str, password: str) -> None:
+    '''
+    Authenticated cookies and headers for the upstream API.
+
+    The session is persisted to disk and reused by later runs until its cookies expire or it gets
+    older than session.max_age_hours, so Chrome is started only when a new login is needed.
+    relogin() replaces a session the API rejected, concurrent callers trigger a single login. The rejected
+    session is kept until the new login succeeds, and a failed login is not retried for session.relogin_backoff_seconds.
+    '''
+
+    def __init__(self, email: str, password: str, session_id: int = 0) -> None:
         self.email = email
         self.password = password
 
         with open('sessionmanager/config.json') as f:
             config = json.load(f)
-        
+
         self.config = config
-        self.driver = self.setup_driver()
+        self.driver: webdriver.Chrome = None
 
         self.login_url = LOGIN_URL
         self.redirect_url = REDIRECT_URL
+        self.session_file = os.path.join(self.config['session']['path'], f"session_{session_id}.json")
 
         self.cookies = {}
         self.headers = {}
+        self.expires_at = 0.0
+        self.generation = 0
+        self.relogin_lock = asyncio.Lock()
+        self.login_error: SessionLoginError = None
+        self.login_failed_at = 0.0
         self.date = str(datetime.datetime.now()).split()[0]
 
-        try:
-            self.login()
-            self.check_session()
-            self.check_resources_page()
-            self.collect_session_data()
-        except Exception as e:
-            self.handle_exception(e)
+        if self.load_session():
+            logging.info(f"Reusing persisted session {self.session_file}")
+        else:
+            self.start_session()
 
     def setup_driver(self) -> webdriver.Chrome:
         chrome_options = Options()
@@ -58,6 +76,23 @@ class SessionManager:
     def wait_for_element(self, by: By, value: str , timeout: float) -> WebDriverWait:
         return WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located((by, value)))
 
+    def start_session(self) -> None:
+        '''
+        Log in with a fresh browser, collect the session cookies and persist them. The browser is closed afterwards.
+        '''
+        self.driver = self.setup_driver()
+        try:
+            self.login()
+            self.check_session()
+            self.check_resources_page()
+            self.collect_session_data()
+        except Exception as e:
+            self.handle_exception(e)
+
+        self.close_driver()
+        self.save_session()
+        self.generation += 1
+
     def login(self) -> None:
         self.driver.get(self.login_url)
         self.wait_for_element(By.ID, 'login_btn', self.config['timeout'])
@@ -79,20 +114,113 @@ class SessionManager:
         self.wait_for_element(By.CLASS_NAME, 'result-text', self.config['timeout'])
 
     def collect_session_data(self) -> None:
+        max_age_seconds = self.config['session']['max_age_hours'] * 3600
+        expires_at = time.time() + max_age_seconds
+
+        session_cookies = {}
         cookies = self.driver.get_cookies()
         for cookie in cookies:
             if cookie['name'] in self.config['required_cookies']:
-                self.cookies[cookie['name']] = cookie['value']
+                session_cookies[cookie['name']] = cookie['value']
+                #Session cookies carry no expiry, they are bounded by max_age_hours only
+                if cookie.get('expiry') is not None:
+                    expires_at = min(expires_at, cookie['expiry'])
 
-        self.headers = self.config['headers_template']
-        self.headers['Referer'] = REFERER_URL
-        self.headers['X-XSRF-TOKEN'] = self.cookies.get('XSRF-TOKEN', '')
+        headers = dict(self.config['headers_template'])
+        headers['Referer'] = REFERER_URL
+        headers['X-XSRF-TOKEN'] = session_cookies.get('XSRF-TOKEN', '')
+
+        #Swapped in at once, requests in flight keep using the previous session until here
+        self.cookies, self.headers, self.expires_at = session_cookies, headers, expires_at
+
+    def is_expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+    def load_session(self) -> bool:
+        '''
+        Load the persisted session, returns False when there is none or it is expired, incomplete or belongs to another account.
+        '''
+        if not os.path.exists(self.session_file):
+            return False
+
+        try:
+            with open(self.session_file, 'r') as f:
+                session = json.load(f)
+        except json.JSONDecodeError:
+            logging.warning(f"Could not decode persisted session {self.session_file}")
+            return False
+
+        if session.get('email') != self.email or time.time() >= session['expires_at']:
+            return False
+        if any(name not in session['cookies'] for name in self.config['required_cookies']):
+            return False
+
+        self.cookies = session['cookies']
+        self.headers = session['headers']
+        self.expires_at = session['expires_at']
+        self.generation += 1
+        return True
+
+    def save_session(self) -> None:
+        os.makedirs(os.path.dirname(self.session_file), exist_ok=True)
+        session = {
+            'email': self.email,
+            'created_at': time.time(),
+            'expires_at': self.expires_at,
+            'cookies': self.cookies,
+            'headers': self.headers
+        }
+
+        #Cookies grant access to the account, keep the file private to the user
+        tmp_path = self.session_file + '.tmp'
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as f:
+            json.dump(session, f)
+        os.replace(tmp_path, self.session_file)
+
+    def clear_session(self) -> None:
+        self.cookies = {}
+        self.headers = {}
+        self.expires_at = 0.0
+        if os.path.exists(self.session_file):
+            os.remove(self.session_file)
+
+    async def relogin(self, generation: int) -> None:
+        '''
+        Replace a session the API rejected. generation is the value the caller saw when its request failed,
+        if another caller has logged in since then the new session is kept.
+        Raises SessionLoginError if the login fails, or failed less than session.relogin_backoff_seconds ago.
+        '''
+        async with self.relogin_lock:
+            if self.generation != generation:
+                return
+            if self.login_error is not None and time.time() - self.login_failed_at < self.config['session']['relogin_backoff_seconds']:
+                raise self.login_error
+
+            logging.warning(f"Session {self.session_file} was rejected, logging in again")
+            try:
+                await asyncio.to_thread(self.start_session)
+            except Exception as e:
+                self.login_error = SessionLoginError(f"Could not log in session {self.session_file}: {e}")
+                self.login_failed_at = time.time()
+                raise self.login_error from e
+            self.login_error = None
+
+    def acquire(self) -> 'SessionManager':
+        '''
+        Return the session to send the next request with, lets a SessionManager stand in for a SessionPool.
+        '''
+        return self
+
+    def close_driver(self) -> None:
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
 
     def handle_exception(self, exception: Exception) -> None:
         logging.error(f"An error occurred: {exception}")
         if self.config['take_screenshot_on_error']:
             self.driver.save_screenshot(f"sessionmanager/error_{self.date}.png")
-        self.driver.quit()
+        self.close_driver()
         raise exception
 
     def get_cookies(self) -> dict:
@@ -102,5 +230,10 @@ class SessionManager:
         return self.headers
 
     def logout(self) -> None:
-        self.driver.get(LOGOUT_URL)
-        self.driver.quit()
+        '''
+        Log out in the browser if one is running and forget the persisted session, so the next run logs in again.
+        '''
+        if self.driver is not None:
+            self.driver.get(LOGOUT_URL)
+            self.close_driver()
+        self.clear_session()
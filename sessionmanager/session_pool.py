@@ -0,0 +1,33 @@
+import json
+import itertools
+
+from sessionmanager.session_manager import SessionManager
+
+
+class SessionPool:
+    '''
+    Several independently authenticated sessions of one account used round-robin, which spreads
+    extraction over more upstream sessions. Every session is persisted and re-logged in on its own.
+    Can be passed wherever a SessionManager is expected as the session of HttpClient requests.
+    '''
+
+    def __init__(self, email: str, password: str, size: int = None) -> None:
+        with open('sessionmanager/config.json') as f:
+            config = json.load(f)
+
+        self.size = size or config['pool_size']
+        self.sessions = [SessionManager(email, password, session_id=session_id) for session_id in range(self.size)]
+        self._sessions = itertools.cycle(self.sessions)
+
+    def acquire(self) -> SessionManager:
+        return next(self._sessions)
+
+    def get_cookies(self) -> dict:
+        return self.sessions[0].get_cookies()
+
+    def get_headers(self) -> dict:
+        return self.sessions[0].get_headers()
+
+    def logout(self) -> None:
+        for session in self.sessions:
+            session.logout()
@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+
+from qdrant_client.models import Record
+
+from models.api_models import Keyword
+
+
+class ActVectorStoreBase(ABC):
+
+    @abstractmethod
+    async def search_acts(self, limit: int, vector: list[float]) -> list[Record]:
+        '''
+        Return the limit most similar act vectors from the whole collection.
+        '''
+
+    @abstractmethod
+    async def search_acts_filtered(self, limit: int, act_nros: list[int], vector: list[float]) -> list[Record]:
+        '''
+        Return the limit most similar act vectors belonging to the given act_nros.
+        '''
+
+    @abstractmethod
+    async def search_acts_keyword_filtered(self, limit: int, act_nros: list[int], keywords: list[Keyword], vector: list[float]) -> list[Record]:
+        '''
+        Return the limit most similar act vectors belonging to the given act_nros and tagged with the given keywords.
+        '''
+
+    @abstractmethod
+    async def retrieve_batch_act_vectors(self, act_vector_ids: list[int]) -> list[Record]:
+        '''
+        Return the act vectors with the given ids.
+        '''
+
+    @abstractmethod
+    async def get_act_vector_count(self) -> int:
+        '''
+        Return the number of act vectors in the store.
+        '''
@@ -0,0 +1,232 @@
+import os
+import json
+import asyncio
+import logging
+import numpy as np
+
+from qdrant_client import models
+from qdrant_client.models import Record
+
+from models.api_models import Keyword
+from models.datamodels.act_vector import keyword_id
+from qdrantdb.collections.qdrant_act_collection import QdrantActCollection
+from vectorstore.act_vector_store_base import ActVectorStoreBase
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LocalActCollection(ActVectorStoreBase):
+    '''
+    In-process exact search over act vectors.
+
+    Vectors are kept L2-normalized in a memory-mapped float16 matrix whose rows are laid out
+    contiguously per act, so a search filtered to a few act_nros is a dot product over a few
+    hundred rows. Payloads live in a jsonl sidecar and are read only for returned hits.
+    '''
+
+    with open("vectorstore/config.json") as f:
+        config = json.load(f)
+        f.close()
+
+    VECTORS_FILE = 'vectors.npy'
+    IDS_FILE = 'ids.npy'
+    PAYLOADS_FILE = 'payloads.jsonl'
+    PAYLOAD_OFFSETS_FILE = 'payload_offsets.npy'
+    ACT_OFFSETS_FILE = 'act_offsets.json'
+
+    def __init__(self, path: str = None) -> None:
+        self.path = path or self.config['local_engine']['path']
+        self.vectors: np.ndarray = None
+        self.ids: np.ndarray = None
+        self.payload_offsets: np.ndarray = None
+        self.act_offsets: dict[int, tuple[int, int]] = {}
+        self.payloads_file = None
+
+    @classmethod
+    def exists(cls, path: str = None) -> bool:
+        path = path or cls.config['local_engine']['path']
+        return os.path.exists(path + cls.ACT_OFFSETS_FILE)
+
+    @classmethod
+    async def create(cls, path: str = None) -> 'LocalActCollection':
+        instance = cls(path)
+        instance.load()
+        return instance
+
+    def load(self) -> None:
+        self.vectors = np.load(self.path + self.VECTORS_FILE, mmap_mode='r')
+        self.ids = np.load(self.path + self.IDS_FILE, mmap_mode='r')
+        self.payload_offsets = np.load(self.path + self.PAYLOAD_OFFSETS_FILE, mmap_mode='r')
+
+        with open(self.path + self.ACT_OFFSETS_FILE, 'r') as f:
+            act_offsets = json.load(f)
+        self.act_offsets = {int(nro): (start, end) for nro, (start, end) in act_offsets.items()}
+
+        if self.payloads_file is not None:
+            self.payloads_file.close()
+        self.payloads_file = open(self.path + self.PAYLOADS_FILE, 'rb')
+
+        logger.info(f"Loaded {len(self.ids)} act vectors for {len(self.act_offsets)} acts from {self.path}")
+
+    def close(self) -> None:
+        if self.payloads_file is not None:
+            self.payloads_file.close()
+            self.payloads_file = None
+
+    @classmethod
+    async def build(cls, qdrant_act_collection: QdrantActCollection, path: str = None) -> 'LocalActCollection':
+        '''
+        Scroll every act vector out of Qdrant and write the per-act contiguous store to path.
+        '''
+        path = path or cls.config['local_engine']['path']
+        batch_size = cls.config['local_engine']['build_batch_size']
+        os.makedirs(path, exist_ok=True)
+
+        total = await qdrant_act_collection.get_act_vector_count()
+        tmp_path = path + 'unsorted_' + cls.VECTORS_FILE
+        unsorted = None
+
+        ids = np.zeros(total, dtype=np.int64)
+        act_nros = np.zeros(total, dtype=np.int64)
+        payloads = []
+
+        row = 0
+        offset = None
+        while row < total:
+            records, offset = await qdrant_act_collection.client.scroll(
+                collection_name=qdrant_act_collection.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            records = records[:total - row]
+            if not records:
+                break
+
+            batch = np.asarray([record.vector for record in records], dtype=np.float32)
+            batch /= np.maximum(np.linalg.norm(batch, axis=1, keepdims=True), 1e-12)
+
+            if unsorted is None:
+                unsorted = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float16, shape=(total, batch.shape[1]))
+
+            unsorted[row:row + len(records)] = batch
+            for record in records:
+                ids[row] = record.id
+                act_nros[row] = record.payload['act_nro']
+                payloads.append(record.payload)
+                row += 1
+
+            if offset is None:
+                break
+
+        if unsorted is None:
+            raise ValueError(f"Collection {qdrant_act_collection.collection_name} has no act vectors to build from.")
+
+        order = np.argsort(act_nros[:row], kind='stable')
+
+        vectors = np.lib.format.open_memmap(path + cls.VECTORS_FILE, mode='w+', dtype=np.float16, shape=(row, unsorted.shape[1]))
+        for start in range(0, row, batch_size):
+            vectors[start:start + batch_size] = unsorted[order[start:start + batch_size]]
+        vectors.flush()
+        del vectors, unsorted
+        os.remove(tmp_path)
+
+        np.save(path + cls.IDS_FILE, ids[order])
+
+        payload_offsets = np.zeros(row, dtype=np.int64)
+        with open(path + cls.PAYLOADS_FILE, 'wb') as f:
+            for i, index in enumerate(order):
+                payload_offsets[i] = f.tell()
+                f.write(json.dumps(payloads[index], ensure_ascii=False).encode('utf-8') + b'\n')
+        np.save(path + cls.PAYLOAD_OFFSETS_FILE, payload_offsets)
+
+        sorted_nros = act_nros[order]
+        nros, starts, counts = np.unique(sorted_nros, return_index=True, return_counts=True)
+        act_offsets = {str(nro): [int(start), int(start + count)] for nro, start, count in zip(nros, starts, counts)}
+        with open(path + cls.ACT_OFFSETS_FILE, 'w') as f:
+            json.dump(act_offsets, f)
+
+        logger.info(f"Built local act store with {row} vectors for {len(act_offsets)} acts in {path}")
+
+        instance = cls(path)
+        instance.load()
+        return instance
+
+    def _read_payload(self, row: int) -> dict:
+        self.payloads_file.seek(int(self.payload_offsets[row]))
+        return json.loads(self.payloads_file.readline())
+
+    def _payload_keyword_ids(self, payload: dict) -> list[str]:
+        if 'keyword_ids' in payload:
+            return payload['keyword_ids']
+        return [keyword_id(keyword['conceptId'], keyword['instanceOfType']) for keyword in payload.get('keywords', [])]
+
+    def _rows_for_acts(self, act_nros: list[int]) -> np.ndarray:
+        ranges = [self.act_offsets[nro] for nro in set(act_nros) if nro in self.act_offsets]
+        if not ranges:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, end) for start, end in ranges])
+
+    def _normalize_query(self, vector: list[float]) -> np.ndarray:
+        query = np.asarray(vector, dtype=np.float32)
+        return query / max(float(np.linalg.norm(query)), 1e-12)
+
+    def _top_k(self, rows: np.ndarray, scores: np.ndarray, limit: int) -> list[models.ScoredPoint]:
+        if len(scores) == 0:
+            return []
+        if len(scores) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind='stable')]
+
+        results = []
+        for i in best:
+            row = int(rows[i])
+            results.append(models.ScoredPoint(id=int(self.ids[row]), version=0, score=float(scores[i]), payload=self._read_payload(row), vector=None))
+        return results
+
+    def _search_rows(self, rows: np.ndarray, limit: int, vector: list[float]) -> list[models.ScoredPoint]:
+        if len(rows) == 0:
+            return []
+        query = self._normalize_query(vector)
+        scores = self.vectors[rows].astype(np.float32) @ query
+        return self._top_k(rows, scores, limit)
+
+    async def search_acts(self, limit: int, vector: list[float]) -> list[Record]:
+        query = self._normalize_query(vector)
+        scores = np.empty(len(self.ids), dtype=np.float32)
+        block = self.config['local_engine']['build_batch_size']
+        for start in range(0, len(self.ids), block):
+            scores[start:start + block] = self.vectors[start:start + block].astype(np.float32) @ query
+        return self._top_k(np.arange(len(self.ids)), scores, limit)
+
+    async def search_acts_filtered(self, limit: int, act_nros: list[int], vector: list[float]) -> list[Record]:
+        return self._search_rows(self._rows_for_acts(act_nros), limit, vector)
+
+    async def search_acts_keyword_filtered(self, limit: int, act_nros: list[int], keywords: list[Keyword], vector: list[float]) -> list[Record]:
+        keyword_ids = set([keyword_id(keyword.conceptId, keyword.instanceOfType) for keyword in keywords])
+
+        rows = [row for row in self._rows_for_acts(act_nros)
+                if not keyword_ids.isdisjoint(self._payload_keyword_ids(self._read_payload(int(row))))]
+
+        return self._search_rows(np.asarray(rows, dtype=np.int64), limit, vector)
+
+    async def retrieve_batch_act_vectors(self, act_vector_ids: list[int]) -> list[Record]:
+        rows = np.nonzero(np.isin(self.ids, np.asarray(act_vector_ids, dtype=np.int64)))[0]
+        return [Record(id=int(self.ids[row]), payload=self._read_payload(int(row)), vector=None) for row in rows]
+
+    async def get_act_vector_count(self) -> int:
+        return len(self.ids)
+
+
+async def main():
+    qdrant_act_collection = await QdrantActCollection.create()
+    await LocalActCollection.build(qdrant_act_collection)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+import logging
+
+from qdrant_client.models import Record
+
+from models.api_models import Keyword
+from qdrantdb.collections.qdrant_act_collection import QdrantActCollection
+from vectorstore.act_vector_store_base import ActVectorStoreBase
+from vectorstore.local_act_collection import LocalActCollection
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RoutedActCollection(ActVectorStoreBase):
+    '''
+    Sends act-filtered searches to the local engine and global searches to Qdrant.
+    Falls back to Qdrant for everything when the local store is disabled or not built.
+    '''
+
+    def __init__(self) -> None:
+        self.qdrant_act_collection: QdrantActCollection = None
+        self.local_act_collection: LocalActCollection = None
+
+    @classmethod
+    async def create(cls) -> 'RoutedActCollection':
+        instance = cls()
+        instance.qdrant_act_collection = await QdrantActCollection.create()
+
+        if LocalActCollection.config['local_engine']['enabled']:
+            if LocalActCollection.exists():
+                instance.local_act_collection = await LocalActCollection.create()
+            else:
+                logger.warning("Local act engine is enabled but no store was built, using Qdrant for all searches.")
+        return instance
+
+    @property
+    def filtered_store(self) -> ActVectorStoreBase:
+        return self.local_act_collection or self.qdrant_act_collection
+
+    async def search_acts(self, limit: int, vector: list[float]) -> list[Record]:
+        return await self.qdrant_act_collection.search_acts(limit=limit, vector=vector)
+
+    async def search_acts_filtered(self, limit: int, act_nros: list[int], vector: list[float]) -> list[Record]:
+        return await self.filtered_store.search_acts_filtered(limit=limit, act_nros=act_nros, vector=vector)
+
+    async def search_acts_keyword_filtered(self, limit: int, act_nros: list[int], keywords: list[Keyword], vector: list[float]) -> list[Record]:
+        return await self.filtered_store.search_acts_keyword_filtered(limit=limit, act_nros=act_nros, keywords=keywords, vector=vector)
+
+    async def retrieve_batch_act_vectors(self, act_vector_ids: list[int]) -> list[Record]:
+        return await self.qdrant_act_collection.retrieve_batch_act_vectors(act_vector_ids)
+
+    async def get_act_vector_count(self) -> int:
+        return await self.qdrant_act_collection.get_act_vector_count()